@@ -1,30 +1,52 @@
-import json
 import os
 import time
 import traceback
+from collections import Counter
 
 from monitor import system_monitor
 from monitor import process_monitor
 from monitor import network_monitor
 from monitor import eventlog_monitor
+from monitor import host_state
 from monitor.traffic_monitor import TrafficMonitor
-from monitor.threat_intel import check_connection_threat
+from monitor.scheduler import Collector, CollectorScheduler
+from monitor.connections import ConnectionSnapshot, take_snapshot
+from monitor.threat_intel import check_connection_threat, get_feed, get_verdict_stats, refresh_feeds
 from detection import rule_engine
 from detection.ml_anomaly import AnomalyDetector
+from detection.suppression import ThreatSuppressor
 from response import self_heal
-from utils.logger import log_event
+from utils.agent_lock import heartbeat
+from utils.config import get_config
+from utils.events import configure_events, emit_event, flush_events
+from utils.logger import configure_logging, flush_logs, get_writer, log_event
 from utils.notifier import notify_user
+from utils.status_block import publish_status
 
-_config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
 _model_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model", "anomaly_model.pkl")
 
 
-def _load_config():
-    try:
-        with open(_config_path, encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+def _build_scheduler(config):
+    """Create the collector scheduler for the per-cycle data sources."""
+    collectors = [
+        Collector(
+            "system",
+            lambda: system_monitor.get_system_metrics(get_config()),
+            default={},
+        ),
+        Collector(
+            "processes",
+            lambda: process_monitor.get_suspicious_processes(get_config()),
+            default=[],
+        ),
+        Collector("connections", take_snapshot, default=ConnectionSnapshot(())),
+        Collector("failed_logins", eventlog_monitor.get_failed_logins, default=0),
+    ]
+    scheduler = CollectorScheduler(
+        collectors, max_workers=config.collectors["max_workers"]
+    )
+    scheduler.configure(config.collectors)
+    return scheduler
 
 
 def start_agent(stop_event=None):
@@ -36,30 +58,80 @@ def start_agent(stop_event=None):
         print("Agent initialized, entering main loop")
 
         traffic_monitor = TrafficMonitor()
-        config = _load_config()
-        ml_cfg = config.get("ml", {})
+        config = get_config()
+        ml_cfg = config.ml
         anomaly_detector = AnomalyDetector(
             model_path=_model_path,
-            min_samples=ml_cfg.get("min_training_samples", 20),
-            retrain_interval=ml_cfg.get("retrain_interval", 50),
-            contamination=ml_cfg.get("contamination", 0.1),
+            window_size=ml_cfg["window_size"],
+            min_samples=ml_cfg["min_training_samples"],
+            retrain_interval=ml_cfg["retrain_interval"],
+            contamination=ml_cfg["contamination"],
+            engine=ml_cfg["engine"],
+            engine_options={key: ml_cfg[key] for key in ("hst_trees", "hst_height", "hst_window")},
+        )
+        scheduler = _build_scheduler(config)
+        suppressor = ThreatSuppressor(
+            config.suppression["window_seconds"], config.suppression["max_records"]
         )
+        try:
+            summary = self_heal.reconcile_blocks(config)
+            log_event(
+                f"Firewall backend {config.response['firewall_backend']}: "
+                f"{summary['blocked']} IPs blocked, {summary['adopted']} adopted, "
+                f"{summary['reapplied']} re-applied, {summary['expired']} expired"
+            )
+        except Exception as e:
+            log_event(f"Could not reconcile firewall blocks: {e}")
+        config_version = config.version
+        started = time.time()
+        cycles = 0
+        threat_counts = Counter()
+        status = {}
 
         while True:
             if stop_event is not None and stop_event.is_set():
                 log_event("Agent stopping gracefully")
                 print("Agent stopping gracefully")
+                scheduler.shutdown()
+                host_state.shutdown()
+                self_heal.shutdown()
+                publish_status(dict(status, running=False, updated=time.time()), threat_counts)
+                flush_events()
+                flush_logs()
                 break
 
             try:
-                # 1. Collect system metrics
-                system_data = system_monitor.get_system_metrics()
-                process_data = process_monitor.get_suspicious_processes()
-                network_data = network_monitor.get_suspicious_connections()
-                failed_logins = eventlog_monitor.get_failed_logins()
+                # 0. Refresh config (one stat() unless the file changed)
+                config = get_config()
+                if config.version != config_version:
+                    config_version = config.version
+                    scheduler.configure(config.collectors)
+                    configure_logging(config)
+                    configure_events(config)
+                    suppressor.window = config.suppression["window_seconds"]
+                    suppressor.max_records = config.suppression["max_records"]
+                    host_state.get_prober(config).configure(config.host_probes)
+                    self_heal.get_block_executor(config)
+                    for error in config.errors:
+                        log_event(f"Config warning: {error}")
+
+                # 1. Run all collectors concurrently (system, processes,
+                # connection table, event log), each at its own cadence
+                collected = scheduler.run_cycle()
+                for name in scheduler.last_late:
+                    log_event(f"Collector late: {name} (using previous result)")
+                for name, error in scheduler.last_errors.items():
+                    log_event(f"Collector error: {name}: {error}")
 
-                # 2. Collect traffic data
-                traffic_data = traffic_monitor.get_traffic_delta()
+                system_data = collected["system"]
+                process_data = collected["processes"]
+                failed_logins = collected["failed_logins"]
+
+                # 2. Derive network and traffic data from the single
+                # connection snapshot taken this cycle
+                snapshot = collected["connections"]
+                network_data = network_monitor.get_suspicious_connections(config, snapshot)
+                traffic_data = traffic_monitor.get_traffic_delta(snapshot)
 
                 data = {
                     "system": system_data,
@@ -67,34 +139,60 @@ def start_agent(stop_event=None):
                     "network": network_data,
                     "failed_logins": failed_logins,
                     "traffic": traffic_data,
+                    "connections": snapshot,
+                    # Cached firewall / DNS probe results (never blocks)
+                    "host_state": host_state.get_host_state(config),
                 }
 
-                # 3. HEARTBEAT (ALWAYS)
+                # 3. HEARTBEAT (ALWAYS); the pid file mtime is what the dashboard checks
+                heartbeat()
                 log_event("Heartbeat: Monitoring active")
                 print("Heartbeat: Monitoring active")
+                emit_event("heartbeat")
 
                 # 4. Optional lightweight visibility
+                verdict_stats = get_verdict_stats()
+                block_stats = self_heal.block_stats()
                 log_event(
                     f"Snapshot | net={len(network_data)} "
-                    f"proc={len(process_data)}"
+                    f"proc={len(process_data)} "
+                    f"verdict_cache={verdict_stats['hit_rate']:.0%} "
+                    f"block_queue={block_stats.get('queue_depth', 0)}"
+                )
+                emit_event(
+                    "metrics",
+                    system=system_data,
+                    traffic=traffic_data,
+                    connections=len(network_data),
+                    processes=len(process_data),
+                    failed_logins=failed_logins,
+                    verdict_cache_hit_rate=verdict_stats["hit_rate"],
+                    block_queue=block_stats.get("queue_depth", 0),
                 )
 
                 # 5. Check threat intelligence for each network connection
+                if refresh_feeds(config):
+                    feed_stats = get_feed(config).stats()
+                    log_event(
+                        f"Threat intel feed loaded: {len(get_feed(config))} ranges, "
+                        f"bloom={'on' if feed_stats['bloom'] else 'off'}, "
+                        f"lookups={feed_stats['lookups']}, filtered={feed_stats['filtered']}, "
+                        f"false_positives={feed_stats['false_positives']}"
+                    )
                 for conn in network_data:
                     ip = conn.get("ip")
                     port = conn.get("port")
                     if ip and port:
-                        level = check_connection_threat(ip, port)
+                        level = check_connection_threat(ip, port, config)
                         if level:
                             log_event(f"Threat intel: {ip}:{port} -> {level}")
 
                 # 6. Analyze threats using rule engine (FAIL-SAFE)
-                threats = rule_engine.analyze(data) or []
+                threats = rule_engine.analyze(data, config) or []
 
                 # 7. ML anomaly detection
-                config = _load_config()
-                ml_cfg = config.get("ml", {})
-                if ml_cfg.get("enabled", True):
+                ml_status = {}
+                if config.ml.get("enabled", True):
                     features = [
                         system_data.get("cpu", 0),
                         system_data.get("memory", 0),
@@ -106,8 +204,9 @@ def start_agent(stop_event=None):
                         failed_logins,
                     ]
                     anomaly_detector.collect(features)
-                    status = anomaly_detector.get_status()
-                    log_event(f"ML status: {status}")
+                    ml_status = anomaly_detector.get_status()
+                    log_event(f"ML status: {ml_status}")
+                    emit_event("ml_status", **ml_status)
                     if anomaly_detector.predict(features):
                         ml_threat = {
                             "type": "ML_ANOMALY",
@@ -120,35 +219,75 @@ def start_agent(stop_event=None):
                         }
                         threats.append(ml_threat)
 
-                # 8. Respond to all threats
-                notif_cfg = config.get("notifications", {})
-                notif_enabled = notif_cfg.get("enabled", True)
-                min_severity = notif_cfg.get("min_severity", "MEDIUM")
-                severity_order = ["INFO", "LOW", "MEDIUM", "HIGH", "CRITICAL"]
+                # 8. Collapse repeats of already reported threats; only new
+                # or escalated ones reach logging, healing and notification
+                raw_count = len(threats)
+                if config.suppression["enabled"] and threats:
+                    threats = suppressor.filter(threats)
+                    if raw_count > len(threats):
+                        log_event(f"Suppressed {raw_count - len(threats)} repeated threat(s)")
 
+                # 9. Respond to new threats
                 if threats:
                     for threat in threats:
                         log_event(f"Threat detected: {threat}")
                         print(f"Threat detected: {threat}")
+                        emit_event("threat", threat=threat)
+                        threat_counts[threat.get("type", "UNKNOWN")] += 1
                         self_heal.heal(threat)
                         # Send notification for high-severity threats
                         sev = threat.get("severity", "INFO")
-                        if notif_enabled and severity_order.index(sev) >= severity_order.index(min_severity):
+                        if config.should_notify(sev):
                             notify_user(
                                 title=f"SHCS: {threat.get('type', 'THREAT')}",
                                 message=threat.get("detail", str(threat)),
                                 severity=sev,
                             )
-                else:
+                elif not raw_count:
                     log_event("No threats detected")
                     print("No threats detected")
 
+                # 10. Lift expired blocks (timer-wheel sweep, cost ~ expired count)
+                for ip in self_heal.expire_blocks():
+                    log_event(f"Block expired: {ip}")
+
+                # Make this cycle's events visible to the dashboard
+                flush_events()
+
+                # 11. Publish live status for the dashboard / tray
+                cycles += 1
+                log_stats = get_writer().stats()
+                status = {
+                    "started": started,
+                    "pid": os.getpid(),
+                    "running": True,
+                    "ml_mode": ml_status.get("mode", "disabled"),
+                    "ml_samples": ml_status.get("samples", 0),
+                    "ml_min_samples": ml_status.get("min_samples", anomaly_detector.min_samples),
+                    "cpu": system_data.get("cpu", 0),
+                    "memory": system_data.get("memory", 0),
+                    "connections": len(network_data),
+                    "processes": len(process_data),
+                    "bytes_sent_per_sec": traffic_data.get("bytes_sent_per_sec", 0),
+                    "bytes_recv_per_sec": traffic_data.get("bytes_recv_per_sec", 0),
+                    "block_queue": block_stats.get("queue_depth", 0),
+                    "block_in_flight": block_stats.get("in_flight", 0),
+                    "log_queue": log_stats["queued"],
+                    "log_dropped": log_stats["dropped"],
+                    "cycles": cycles,
+                    "threats_total": sum(threat_counts.values()),
+                }
+                publish_status(dict(status, updated=time.time()), threat_counts)
+
             except Exception as e:
                 log_event(f"Runtime error: {e}")
                 log_event(traceback.format_exc())
 
-            interval = config.get("monitoring_interval_seconds", 5)
-            time.sleep(interval)
+            if stop_event is not None:
+                # Wake up as soon as a stop is requested
+                stop_event.wait(config.monitoring_interval)
+            else:
+                time.sleep(config.monitoring_interval)
 
     except Exception as e:
         log_event("FATAL AGENT ERROR")
@@ -1,15 +1,64 @@
+import json
+import os
 import subprocess
+import time
+
 import psutil
 
 AGENT_EXE = r"C:\MajorProject\shcs\dist\main.exe"
-AGENT_NAME = "main.exe"
 
+# Written by the agent (utils.agent_lock)
+CONTROL_DIR = r"C:\ProgramData\SHCS"
+PID_FILE = os.path.join(CONTROL_DIR, "agent.pid")
+STOP_FILE = os.path.join(CONTROL_DIR, "agent.stop")
+
+# Pid file mtime older than this: the agent process exists but its loop is stuck
+HEARTBEAT_STALE_SECONDS = 120
+
+
+def read_pid_file(path=None):
+    """Return ``{"pid", "create_time", "started"}`` from the agent's pid file, or None."""
+    try:
+        with open(path or PID_FILE, encoding="utf-8") as f:
+            info = json.load(f)
+        return info if isinstance(info, dict) and "pid" in info else None
+    except (OSError, ValueError):
+        return None
+
+
+def get_agent_process(path=None):
+    """Return the agent's psutil.Process, checking only the pid in the pid file.
+
+    The process create time must match the one the agent recorded, so an
+    unrelated process that reused the pid is not taken for the agent.
+    """
+    info = read_pid_file(path)
+    if info is None:
+        return None
+    try:
+        proc = psutil.Process(info["pid"])
+        if abs(proc.create_time() - info.get("create_time", 0)) > 1.0:
+            return None
+        return proc
+    except (psutil.Error, TypeError, ValueError):
+        return None
 
-def is_agent_running():
-    for p in psutil.process_iter(["name"]):
-        if p.info["name"] == AGENT_NAME:
-            return True
-    return False
+
+def is_agent_running(path=None):
+    return get_agent_process(path) is not None
+
+
+def heartbeat_age(path=None):
+    """Seconds since the agent loop last touched the pid file, or None."""
+    try:
+        return time.time() - os.stat(path or PID_FILE).st_mtime
+    except OSError:
+        return None
+
+
+def is_agent_responsive(path=None):
+    age = heartbeat_age(path)
+    return age is not None and age < HEARTBEAT_STALE_SECONDS and is_agent_running(path)
 
 
 def start_agent():
@@ -20,7 +69,29 @@ def start_agent():
         )
 
 
-def stop_agent():
-    for p in psutil.process_iter(["name"]):
-        if p.info["name"] == AGENT_NAME:
-            p.kill()
+def stop_agent(timeout=10.0, path=None, stop_path=None):
+    """Ask the agent to stop and wait for it; kill it only if it does not exit.
+
+    Returns:
+        ``"stopped"``, ``"killed"`` or ``"not running"``.
+    """
+    proc = get_agent_process(path)
+    if proc is None:
+        return "not running"
+    try:
+        with open(stop_path or STOP_FILE, "w", encoding="utf-8") as f:
+            f.write(str(proc.pid))
+    except OSError:
+        pass
+    try:
+        proc.wait(timeout)
+        return "stopped"
+    except psutil.TimeoutExpired:
+        pass
+    except psutil.Error:
+        return "stopped"
+    try:
+        proc.kill()
+    except psutil.Error:
+        pass
+    return "killed"
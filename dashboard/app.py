@@ -1,10 +1,19 @@
+import queue
+import threading
+
 import customtkinter as ctk
 from theme import COLORS, FONTS
-from agent_control import is_agent_running, start_agent, stop_agent
-from log_reader import read_last_logs
+from agent_control import is_agent_responsive, is_agent_running, start_agent, stop_agent
+from log_feed import LogFeed
+from status_reader import StatusReader, is_live
 
 ctk.set_appearance_mode("dark")
 
+# Threats counted by the status row when the agent writes the event stream
+THREAT_WINDOW_SECONDS = 24 * 3600
+# Lines kept in the log pane; older ones are dropped as new ones arrive
+SCROLLBACK_LINES = 2000
+
 
 class SHCSDashboard(ctk.CTk):
 
@@ -97,7 +106,14 @@ class SHCSDashboard(ctk.CTk):
         )
         self.log_box.pack(pady=(0, 15))
 
+        self._status_reader = StatusReader()
+
+        # Log tailing and parsing run off the Tk thread
+        self._feed = LogFeed(window=THREAT_WINDOW_SECONDS)
+        self._feed.start()
+
         self.refresh()
+        self._drain_feed()
 
     def _toggle_notifications(self):
         self._notifications_enabled = not self._notifications_enabled
@@ -111,11 +127,31 @@ class SHCSDashboard(ctk.CTk):
         self.refresh_status()
 
     def stop_agent(self):
-        stop_agent()
-        self.refresh_status()
+        # Waits for a graceful shutdown (then kills); keep the UI responsive
+        threading.Thread(target=stop_agent, name="shcs-stop-agent", daemon=True).start()
+        self.status_label.configure(text="Status: STOPPING...", text_color=COLORS["danger"])
 
     def refresh_status(self):
-        if is_agent_running():
+        status = self._status_reader.read()
+        if status is None:
+            # Agent without a status block: fall back to the pid file and
+            # its heartbeat, so a hung agent is not shown as running
+            running = is_agent_responsive()
+            if not running and is_agent_running():
+                self.status_label.configure(
+                    text="Status: NOT RESPONDING",
+                    text_color=COLORS.get("warning", "#FFA500")
+                )
+                return
+        else:
+            running = is_live(status)
+        if running and status is not None:
+            self._show_ml_status({
+                "mode": status["ml_mode"],
+                "samples": status["ml_samples"],
+                "min_samples": status["ml_min_samples"],
+            })
+        if running:
             self.status_label.configure(
                 text="Status: RUNNING",
                 text_color=COLORS["success"]
@@ -126,58 +162,54 @@ class SHCSDashboard(ctk.CTk):
                 text_color=COLORS["danger"]
             )
 
-    def _refresh_ml_status(self, logs):
-        """Parse ML status and threat count from log lines."""
-        ml_line = None
-        threat_count = 0
-        for line in reversed(logs.splitlines()):
-            if ml_line is None and "ML status:" in line:
-                ml_line = line
-            if "Threat detected:" in line:
-                threat_count += 1
+    def _show_ml_status(self, status):
+        if status.get("mode") == "learning":
+            if "samples" in status and "min_samples" in status:
+                text = f"ML: Learning ({status['samples']}/{status['min_samples']} samples)"
+            else:
+                text = "ML: Learning"
+            self.ml_status_label.configure(text=text, text_color=COLORS.get("warning", "#FFA500"))
+        elif status.get("mode") == "active":
+            self.ml_status_label.configure(
+                text="ML: Active — Monitoring",
+                text_color=COLORS["success"],
+            )
+
+    def _show_threat_count(self, threat_count):
         self._threat_count = threat_count
         self.threat_count_label.configure(text=f"Threats detected: {threat_count}")
 
-        if ml_line:
-            if "'mode': 'learning'" in ml_line or "\"mode\": \"learning\"" in ml_line:
-                try:
-                    import re
-                    m = re.search(r"'samples': (\d+).*'min_samples': (\d+)", ml_line)
-                    if m:
-                        s, ms = m.group(1), m.group(2)
-                        self.ml_status_label.configure(
-                            text=f"ML: Learning ({s}/{ms} samples)",
-                            text_color=COLORS.get("warning", "#FFA500"),
-                        )
-                        return
-                except Exception:
-                    pass
-                self.ml_status_label.configure(
-                    text="ML: Learning",
-                    text_color=COLORS.get("warning", "#FFA500"),
-                )
-            elif "'mode': 'active'" in ml_line or "\"mode\": \"active\"" in ml_line:
-                self.ml_status_label.configure(
-                    text="ML: Active — Monitoring",
-                    text_color=COLORS["success"],
-                )
-
-    def refresh_logs(self):
+    def _append_logs(self, lines):
+        """Insert new lines at the top (newest first) and trim the scrollback."""
         scroll_pos = self.log_box.yview()
 
-        logs = read_last_logs()
-
         self.log_box.configure(state="normal")
-        self.log_box.delete("1.0", "end")
-        self.log_box.insert("1.0", logs)
+        self.log_box.insert("1.0", "".join(line + "\n" for line in reversed(lines)))
+        self.log_box.delete(f"{SCROLLBACK_LINES + 1}.0", "end")
         self.log_box.configure(state="disabled")
 
         self.log_box.yview_moveto(scroll_pos[0])
-        self._refresh_ml_status(logs)
+
+    def _drain_feed(self):
+        """Apply updates parsed by the log feed; cost follows the new lines only."""
+        lines = []
+        update = None
+        while True:
+            try:
+                update = self._feed.updates.get_nowait()
+            except queue.Empty:
+                break
+            lines.extend(update.lines)
+        if lines:
+            self._append_logs(lines[-SCROLLBACK_LINES:])
+        if update is not None:
+            self._show_threat_count(update.threat_count)
+            if update.ml_status is not None:
+                self._show_ml_status(update.ml_status)
+        self.after(500, self._drain_feed)
 
     def refresh(self):
         self.refresh_status()
-        self.refresh_logs()
         self.after(3000, self.refresh)
 
 
@@ -0,0 +1,155 @@
+import ast
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from log_reader import LogTailer, find_events_file, read_recent_events
+
+_STATUS_EVENTS = ("ml_status", "threat")
+_STATUS_MARKERS = tuple(f'"type":"{t}"' for t in _STATUS_EVENTS)
+
+
+class DashboardState:
+    """Threat counter and ML status, updated from new records only.
+
+    Threats are counted in one bucket per minute over a sliding *window*,
+    so keeping the count current costs O(new records + expired minutes)
+    however many threats the window holds.
+    """
+
+    def __init__(self, window=24 * 3600, clock=time.time):
+        self.window = window
+        self.ml_status = None
+        self._clock = clock
+        self._buckets = deque()  # [minute, threats], oldest first
+        self._count = 0
+
+    @property
+    def threat_count(self):
+        horizon = (self._clock() - self.window) // 60
+        buckets = self._buckets
+        while buckets and buckets[0][0] <= horizon:
+            self._count -= buckets.popleft()[1]
+        return self._count
+
+    def add_threat(self, ts):
+        minute = ts // 60
+        buckets = self._buckets
+        if buckets and buckets[-1][0] >= minute:
+            buckets[-1][1] += 1
+        else:
+            buckets.append([minute, 1])
+        self._count += 1
+
+    def feed_events(self, events):
+        for event in events:
+            if event.get("type") == "threat":
+                self.add_threat(event.get("ts", self._clock()))
+            elif event.get("type") == "ml_status":
+                self.ml_status = event
+
+    def feed_log_lines(self, lines):
+        """Fallback for agents without an event stream: parse text log lines."""
+        now = self._clock()
+        for line in lines:
+            if "Threat detected:" in line:
+                self.add_threat(now)
+            elif "ML status:" in line:
+                try:
+                    status = ast.literal_eval(line.split("ML status:", 1)[1].strip())
+                except (ValueError, SyntaxError):
+                    continue
+                if isinstance(status, dict):
+                    self.ml_status = status
+
+
+class FeedUpdate:
+    __slots__ = ("lines", "threat_count", "ml_status")
+
+    def __init__(self, lines, threat_count, ml_status):
+        self.lines = lines
+        self.threat_count = threat_count
+        self.ml_status = ml_status
+
+
+class LogFeed:
+    """Reads and parses new log lines and events on a background thread.
+
+    Each :meth:`poll` reads only what was appended to ``shcs.log`` and
+    ``events.jsonl`` since the previous one and puts a :class:`FeedUpdate`
+    on :attr:`updates` whenever something changed; the Tk thread just
+    drains that queue. The threat count and ML status come from the event
+    stream when the agent writes one, otherwise from the text log.
+
+    Args:
+        interval: seconds between polls.
+        window: seconds of threats counted by the status row.
+        log_tailer: tailer for the text log (default: the agent's log).
+        events_path: event stream to follow (default: found next to the log).
+    """
+
+    def __init__(self, interval=1.0, window=24 * 3600, log_tailer=None, events_path=None):
+        self.interval = interval
+        self.state = DashboardState(window)
+        self.updates = queue.Queue()
+        self.events_path = events_path
+        self._log = log_tailer or LogTailer()
+        self._events = None
+        self._posted = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="shcs-log-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while True:
+            try:
+                self.poll()
+            except Exception:
+                pass
+            if self._stop.wait(self.interval):
+                return
+
+    def _read_events(self):
+        """Return new status events, or None if there is no event stream."""
+        if self._events is None:
+            path = self.events_path or find_events_file()
+            if path is None or not os.path.exists(path):
+                return None
+            self._events = LogTailer(path)
+            self._events.skip_to_end()
+            # Seed the counters once from the indexed recent past
+            return read_recent_events(self.state.window, _STATUS_EVENTS, path)
+        events = []
+        for line in self._events.read_new():
+            if not any(m in line for m in _STATUS_MARKERS):
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+        return events
+
+    def poll(self):
+        """Read what is new and queue an update if anything changed."""
+        lines = self._log.read_new()
+        events = self._read_events()
+        if events is None:
+            self.state.feed_log_lines(lines)
+        else:
+            self.state.feed_events(events)
+        status = (self.state.threat_count, self.state.ml_status)
+        if lines or status != self._posted:
+            self._posted = status
+            self.updates.put(FeedUpdate(lines, *status))
@@ -1,26 +1,243 @@
-import os
-
-_PRIMARY_LOG_FILE = r"C:\ProgramData\SHCS\shcs.log"
-_FALLBACK_LOG_FILE = os.path.join(
-    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "shcs.log"
-)
-
-
-def read_last_logs():
-    for log_file in [_PRIMARY_LOG_FILE, _FALLBACK_LOG_FILE]:
-        try:
-            if not os.path.exists(log_file):
-                continue
-
-            with open(log_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-
-            lines.reverse()
-
-            return "".join(lines)
-
-        except (OSError, PermissionError):
-            continue
-
-    return ""
-
+import json
+import os
+import struct
+import time
+
+_PRIMARY_LOG_FILE = r"C:\ProgramData\SHCS\shcs.log"
+_FALLBACK_LOG_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "shcs.log"
+)
+_PRIMARY_EVENTS_FILE = r"C:\ProgramData\SHCS\events.jsonl"
+_FALLBACK_EVENTS_FILE = os.path.join(os.path.dirname(_FALLBACK_LOG_FILE), "events.jsonl")
+
+# Must match utils.events.INDEX_ENTRY: record time, byte offset
+_INDEX_ENTRY = struct.Struct("<dQ")
+
+
+# Lines shown when the log is first opened
+DEFAULT_TAIL_LINES = 500
+
+
+def _log_file():
+    """Return the first existing log file (primary, then fallback), or None."""
+    return next((p for p in (_PRIMARY_LOG_FILE, _FALLBACK_LOG_FILE) if os.path.exists(p)), None)
+
+
+def _tail(f, n, block_size=8192):
+    """Read the last *n* complete lines of the open binary file *f*.
+
+    Seeks backwards from the end one block at a time until *n* line breaks
+    have been seen, so the cost depends on *n*, not on the file size.
+
+    Returns:
+        ``(lines, end)`` — the lines (bytes, oldest first) and the offset just
+        past the last complete line.
+    """
+    end = f.seek(0, os.SEEK_END)
+    pos = end
+    data = b""
+    while pos > 0 and data.count(b"\n") <= n:
+        step = min(block_size, pos)
+        pos -= step
+        f.seek(pos)
+        data = f.read(step) + data
+    # Leave a partially written last line for the next read
+    cut = data.rfind(b"\n") + 1
+    lines = data[:cut].splitlines()
+    if pos > 0 and lines:
+        lines = lines[1:]  # the first one may start mid-line
+    return lines[-n:] if n else [], pos + cut
+
+
+def tail_lines(path, n=DEFAULT_TAIL_LINES, block_size=8192):
+    """Return the last *n* lines of *path* (oldest first); ``[]`` if unreadable."""
+    try:
+        with open(path, "rb") as f:
+            lines, _ = _tail(f, n, block_size)
+    except OSError:
+        return []
+    return [line.decode("utf-8", errors="replace") for line in lines]
+
+
+class LogTailer:
+    """Follows a log file, returning only the lines appended since the last read.
+
+    The first :meth:`read_new` returns the last *max_lines* lines; after that
+    only complete lines written since the previous call are read. The file
+    is identified by device and inode: if it changes (the agent rotated
+    ``shcs.log`` to ``shcs.log.1``) the rest of the old file is read from the
+    rotated copy before following the new one from the start. A file that
+    shrank in place was truncated and is re-read from the start. If more
+    than *max_read* bytes were appended since the last call only the last
+    *max_lines* lines are returned, so one call never reads more than that.
+    The file is not held open between calls, so rotation is never blocked.
+
+    Args:
+        path: file to follow; None picks the primary or fallback log file.
+        max_lines: lines returned on the first read or after a skip.
+        max_read: maximum bytes read per call before skipping ahead.
+        block_size: block size for backwards seeks.
+    """
+
+    def __init__(self, path=None, max_lines=DEFAULT_TAIL_LINES, max_read=1 << 20, block_size=8192):
+        self.path = path
+        self.max_lines = max_lines
+        self.max_read = max_read
+        self.block_size = block_size
+        self.rotations = 0
+        self.truncations = 0
+        self._key = None
+        self._offset = None
+
+    def reset(self):
+        """Forget the position; the next read starts from the tail again."""
+        self._key = None
+        self._offset = None
+
+    def skip_to_end(self):
+        """Start following from the current end, without returning old lines."""
+        path = self.path or _log_file()
+        if path is None:
+            return
+        try:
+            with open(path, "rb") as f:
+                st = os.fstat(f.fileno())
+                _, self._offset = _tail(f, 0, self.block_size)
+                self._key = (st.st_dev, st.st_ino)
+        except OSError:
+            pass
+
+    def read_new(self):
+        """Return the complete lines appended since the previous call."""
+        path = self.path or _log_file()
+        if path is None:
+            return []
+        try:
+            with open(path, "rb") as f:
+                st = os.fstat(f.fileno())
+                key = (st.st_dev, st.st_ino)
+                lines = []
+                if self._offset is not None and key != self._key:
+                    lines = self._drain_rotated(path)
+                    self._offset = 0
+                    self.rotations += 1
+                elif self._offset is not None and st.st_size < self._offset:
+                    self._offset = 0
+                    self.truncations += 1
+                self._key = key
+                if self._offset is None or st.st_size - self._offset > self.max_read:
+                    lines, self._offset = _tail(f, self.max_lines, self.block_size)
+                else:
+                    f.seek(self._offset)
+                    data = f.read(st.st_size - self._offset)
+                    cut = data.rfind(b"\n") + 1
+                    lines.extend(data[:cut].splitlines())
+                    self._offset += cut
+        except OSError:
+            return []
+        return [line.decode("utf-8", errors="replace") for line in lines]
+
+    def _drain_rotated(self, path):
+        """Read what was left unread in the file before it was rotated away."""
+        try:
+            with open(f"{path}.1", "rb") as f:
+                st = os.fstat(f.fileno())
+                if (st.st_dev, st.st_ino) != self._key or st.st_size - self._offset > self.max_read:
+                    return []
+                f.seek(self._offset)
+                # The rotated file no longer grows: a trailing partial line is final
+                return f.read().splitlines()
+        except OSError:
+            return []
+
+
+def read_last_logs(n=DEFAULT_TAIL_LINES):
+    """Return the last *n* log lines, newest first, as one string."""
+    path = _log_file()
+    if path is None:
+        return ""
+    lines = tail_lines(path, n)
+    lines.reverse()
+    return "".join(line + "\n" for line in lines)
+
+
+def _index_entries(path):
+    try:
+        with open(f"{path}.idx", "rb") as f:
+            data = f.read()
+    except OSError:
+        return []
+    usable = len(data) - len(data) % _INDEX_ENTRY.size
+    return list(_INDEX_ENTRY.iter_unpack(data[:usable]))
+
+
+def _seek_offset(entries, since, size):
+    """Offset of the last indexed record at or before *since* (0 if none)."""
+    lo, hi = 0, len(entries)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if entries[mid][0] <= since:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo == 0:
+        return 0
+    offset = entries[lo - 1][1]
+    # A stale index (stream truncated or replaced) cannot be trusted
+    return offset if offset <= size else 0
+
+
+def read_events(path, since=None, types=None):
+    """Parse records of the JSONL event stream at *path*.
+
+    With *since* (epoch seconds) the sidecar index is used to skip straight
+    to the right part of the file; *types* limits the result to those event
+    types. A partially written last line is ignored.
+
+    Returns:
+        list of event dicts, oldest first; ``[]`` if *path* does not exist.
+    """
+    markers = None if types is None else [f'"type":"{t}"'.encode() for t in types]
+    events = []
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if since is not None:
+                f.seek(_seek_offset(_index_entries(path), since, size))
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                # Cheap byte check before paying for json.loads
+                if markers is not None and not any(m in raw for m in markers):
+                    continue
+                try:
+                    event = json.loads(raw)
+                except ValueError:
+                    continue
+                if since is not None and event.get("ts", 0) < since:
+                    continue
+                if types is not None and event.get("type") not in types:
+                    continue
+                events.append(event)
+    except OSError:
+        return []
+    return events
+
+
+def read_recent_events(seconds, types=None, path=None):
+    """Return events from the last *seconds*, including the rotated stream if needed."""
+    since = time.time() - seconds
+    if path is None:
+        path = find_events_file()
+        if path is None:
+            return []
+    entries = _index_entries(path)
+    events = []
+    if not entries or entries[0][0] > since:
+        events.extend(read_events(f"{path}.1", since, types))
+    events.extend(read_events(path, since, types))
+    return events
+
+
+def find_events_file():
+    return next((p for p in (_PRIMARY_EVENTS_FILE, _FALLBACK_EVENTS_FILE) if os.path.exists(p)), None)
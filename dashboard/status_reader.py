@@ -0,0 +1,114 @@
+import mmap
+import os
+import struct
+import time
+
+_PRIMARY_STATUS_FILE = r"C:\ProgramData\SHCS\status.bin"
+_FALLBACK_STATUS_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "status.bin"
+)
+
+# Must match utils.status_block (layout version 1)
+_MAGIC = b"SHCSSTA1"
+_HEADER = struct.Struct("<8sIIQ")
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 16
+_BODY = struct.Struct("<ddIBBIIddIIddIIIQQQ")
+_COUNTER = struct.Struct("<24sQ")
+_MAX_COUNTERS = 16
+_SIZE = 4096
+_ML_MODES = ("disabled", "learning", "active")
+_FIELDS = (
+    "updated", "started", "pid", "running", "ml_mode", "ml_samples", "ml_min_samples",
+    "cpu", "memory", "connections", "processes", "bytes_sent_per_sec", "bytes_recv_per_sec",
+    "block_queue", "block_in_flight", "log_queue", "log_dropped", "cycles", "threats_total",
+)
+
+# Status older than this means the agent is gone (or hung)
+STALE_SECONDS = 60
+
+
+def _decode(data):
+    magic, layout, _, _ = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC or layout != 1:
+        return None
+    status = dict(zip(_FIELDS, _BODY.unpack_from(data, _HEADER.size)))
+    status["running"] = bool(status["running"])
+    mode = status["ml_mode"]
+    status["ml_mode"] = _ML_MODES[mode] if mode < len(_ML_MODES) else "disabled"
+    offset = _HEADER.size + _BODY.size
+    (count,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    threats = {}
+    for _ in range(min(count, _MAX_COUNTERS)):
+        name, value = _COUNTER.unpack_from(data, offset)
+        threats[name.rstrip(b"\0").decode("utf-8", errors="replace")] = value
+        offset += _COUNTER.size
+    status["threats"] = threats
+    return status
+
+
+class StatusReader:
+    """Reads the agent's memory-mapped status block.
+
+    The mapping is opened once and kept, so a :meth:`read` is a sequence
+    check, one 4 KiB copy and a few ``struct`` unpacks. The copy is retried
+    while the agent is mid-update (odd sequence number, or the sequence
+    changed during the copy).
+
+    Args:
+        path: status file; None picks the primary or fallback location.
+    """
+
+    def __init__(self, path=None, retries=100):
+        self.path = path
+        self.retries = retries
+        self._file = None
+        self._map = None
+
+    def _open(self):
+        path = self.path or next(
+            (p for p in (_PRIMARY_STATUS_FILE, _FALLBACK_STATUS_FILE) if os.path.exists(p)), None
+        )
+        if path is None:
+            return False
+        try:
+            self._file = open(path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), _SIZE, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.close()
+            return False
+        return True
+
+    def read(self):
+        """Return the latest status dict (with ``threats`` by type), or None."""
+        if self._map is None and not self._open():
+            return None
+        m = self._map
+        try:
+            for _ in range(self.retries):
+                (before,) = _SEQ.unpack_from(m, _SEQ_OFFSET)
+                if before & 1:
+                    continue
+                data = m[:_SIZE]
+                (after,) = _SEQ.unpack_from(m, _SEQ_OFFSET)
+                if before == after:
+                    return _decode(data)
+        except (OSError, ValueError):
+            self.close()
+        return None
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._map = self._file = None
+
+
+def is_live(status, now=None):
+    """True if *status* says the agent is running and was updated recently."""
+    if status is None or not status["running"]:
+        return False
+    now = time.time() if now is None else now
+    return now - status["updated"] < STALE_SECONDS
@@ -5,6 +5,18 @@ try:
 except ImportError:
     _PYSTRAY_AVAILABLE = False
 
+from status_reader import StatusReader, is_live
+
+_status_reader = StatusReader()
+
+
+def status_text():
+    """One-line agent summary from the shared status block (cheap to call)."""
+    status = _status_reader.read()
+    if not is_live(status):
+        return "Agent: stopped"
+    return f"Agent: running — ML {status['ml_mode']}, {status['threats_total']} threats"
+
 
 def _make_icon_image():
     """Create a simple shield icon for the system tray."""
@@ -41,6 +53,8 @@ def create_tray_icon(on_open_dashboard, on_quit):
         on_quit()
 
     menu = pystray.Menu(
+        # Re-read every time the menu opens
+        pystray.MenuItem(lambda item: status_text(), None, enabled=False),
         pystray.MenuItem("Open Dashboard", _open, default=True),
         pystray.Menu.SEPARATOR,
         pystray.MenuItem("Quit", _quit),
@@ -0,0 +1,86 @@
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from detection.engines import score_threshold
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+
+def _read_csv_chunks(path, chunk_size):
+    with open(path, encoding="utf-8") as f:
+        first = f.readline()
+        try:
+            np.array(first.split(","), dtype=np.float64)
+            head = [first]
+        except ValueError:
+            head = []   # header line
+        lines = itertools.chain(head, f)
+        while True:
+            block = list(itertools.islice(lines, chunk_size))
+            if not block:
+                return
+            yield np.loadtxt(block, delimiter=",", ndmin=2)
+
+
+def iter_chunks(data, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield *data* as 2-D float64 arrays of at most *chunk_size* rows.
+
+    *data* is an array (a ``np.memmap`` is read one chunk at a time), the
+    path of a ``.npy`` file (memory-mapped) or of a ``.csv`` file (streamed;
+    a header line is skipped), or an iterable of rows or row blocks.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if isinstance(data, (str, os.PathLike)):
+        if os.fspath(data).endswith(".npy"):
+            data = np.load(data, mmap_mode="r")
+        else:
+            yield from _read_csv_chunks(data, chunk_size)
+            return
+    if isinstance(data, np.ndarray):
+        data = np.atleast_2d(data)
+        for start in range(0, len(data), chunk_size):
+            yield np.asarray(data[start:start + chunk_size], dtype=np.float64)
+        return
+    # Iterable: regroup rows and blocks of any size into chunk_size blocks
+    pending, size = [], 0
+    for block in data:
+        block = np.atleast_2d(np.asarray(block, dtype=np.float64))
+        pending.append(block)
+        size += len(block)
+        while size >= chunk_size:
+            merged = np.concatenate(pending)
+            yield merged[:chunk_size]
+            pending, size = [merged[chunk_size:]], size - chunk_size
+    if size:
+        yield np.concatenate(pending)
+
+
+def score_chunks(model, chunks, n_jobs=None):
+    """Score every chunk with *model*; returns ``(scores, labels)``.
+
+    ``scores`` are the engine's raw scores (lower is more abnormal) and
+    ``labels`` is True for anomalies, exactly as ``model.predict`` would
+    label them. Chunks are scored on a pool of *n_jobs* threads (default:
+    one per core); tree traversal and the NumPy work run without the GIL.
+    At most two chunks per worker are in memory at any time.
+    """
+    n_jobs = (os.cpu_count() or 1) if n_jobs is None else max(1, n_jobs)
+    threshold = score_threshold(model)
+    scores = []
+    if n_jobs == 1:
+        scores = [model.score_samples(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=n_jobs, thread_name_prefix="shcs-ml-batch") as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.submit(model.score_samples, chunk))
+                if len(pending) >= 2 * n_jobs:
+                    scores.append(pending.popleft().result())
+            scores.extend(future.result() for future in pending)
+    scores = np.concatenate(scores) if scores else np.empty(0)
+    return scores, scores < threshold
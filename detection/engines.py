@@ -0,0 +1,230 @@
+import numpy as np
+from sklearn.ensemble import IsolationForest
+
+
+class DetectorEngine:
+    """Interface of the anomaly models behind :class:`AnomalyDetector`.
+
+    Engines follow the scikit-learn outlier-detector conventions, so a plain
+    :class:`~sklearn.ensemble.IsolationForest` is one:
+
+    * ``fit(X)`` — (re)build the model from a batch, returns the engine;
+    * ``score_samples(X)`` — one score per row, lower is more abnormal;
+    * ``predict(X)`` — ``-1`` for anomalies, ``1`` for normal rows.
+
+    Online engines set :attr:`online` and also implement ``partial_fit(X)``,
+    which updates the model in place with new rows; they are never refit.
+    :attr:`ready` is False until the engine can score.
+    """
+
+    online = False
+    ready = True
+
+    def fit(self, X):
+        raise NotImplementedError
+
+    def partial_fit(self, X):
+        raise NotImplementedError
+
+    def score_samples(self, X):
+        raise NotImplementedError
+
+    def predict(self, X):
+        raise NotImplementedError
+
+
+def _squash(X):
+    """Signed log1p: keeps byte rates and counts on a scale comparable to percentages."""
+    X = np.asarray(X, dtype=np.float64)
+    return np.sign(X) * np.log1p(np.abs(X))
+
+
+class HalfSpaceTrees(DetectorEngine):
+    """Streaming Half-Space Trees (Tan, Ting & Liu, 2011).
+
+    *n_trees* random, fully grown binary trees of depth *height* split the
+    feature space in half at every level. Each node counts the samples that
+    pass through it: ``_r`` holds the counts of the previous window (the
+    reference profile used for scoring), ``_l`` those of the current one.
+    Every *window_size* samples ``_l`` becomes the new reference, so the
+    model follows drift without any refit. Updating or scoring one sample
+    walks *n_trees* paths of *height* nodes as a handful of vectorized NumPy
+    operations.
+
+    The work space of the trees is taken from the first window (the trees
+    are built once it is full), after a signed log transform of the
+    features. The anomaly threshold is the *contamination* quantile of the
+    last window's scores.
+
+    Args:
+        n_trees: number of trees.
+        height: depth of every tree.
+        window_size: samples per reference window.
+        contamination: expected fraction of anomalies.
+        size_limit: a path stops at nodes with fewer reference samples than
+            this (default: 10% of *window_size*).
+        seed: random seed for the tree structure.
+    """
+
+    online = True
+
+    def __init__(self, n_trees=25, height=10, window_size=250, contamination=0.1,
+                 size_limit=None, seed=42):
+        self.n_trees = n_trees
+        self.height = height
+        self.window_size = window_size
+        self.contamination = contamination
+        self.size_limit = 0.1 * window_size if size_limit is None else size_limit
+        self.seed = seed
+        self._trees = np.arange(n_trees)
+        self._weights = 2.0 ** np.arange(height + 1)
+        self._reset()
+
+    def _reset(self):
+        self.threshold = None
+        self._rng = np.random.default_rng(self.seed)
+        self._window = None   # rows of the current window (squashed)
+        self._count = 0       # rows in the current window
+        self._split_dim = None
+        self._split_val = None
+        self._r = None
+        self._l = None
+
+    @property
+    def ready(self):
+        return self.threshold is not None
+
+    def _build(self, Z):
+        """Grow the random trees over a work space around the rows of *Z*."""
+        T, H = self.n_trees, self.height
+        d = Z.shape[1]
+        lo, hi = Z.min(axis=0), Z.max(axis=0)
+        # Per tree: a random pivot inside the data range, work range 2x around it
+        s = self._rng.uniform(lo, np.maximum(hi, lo), size=(T, d))
+        r = np.maximum(2.0 * np.maximum(s - lo, hi - s), 1.0)
+        mins, maxs = (s - r)[:, None, :], (s + r)[:, None, :]
+
+        n_internal = 2 ** H - 1
+        self._split_dim = np.zeros((T, n_internal), dtype=np.intp)
+        self._split_val = np.zeros((T, n_internal))
+        for level in range(H):
+            width = 2 ** level
+            first = width - 1
+            dims = self._rng.integers(d, size=(T, width))
+            lo_q = np.take_along_axis(mins, dims[..., None], axis=2)[..., 0]
+            hi_q = np.take_along_axis(maxs, dims[..., None], axis=2)[..., 0]
+            mid = (lo_q + hi_q) / 2.0
+            self._split_dim[:, first:first + width] = dims
+            self._split_val[:, first:first + width] = mid
+            # Children 2j (left, below mid) and 2j + 1 (right) of level node j
+            mins, maxs = np.repeat(mins, 2, axis=1), np.repeat(maxs, 2, axis=1)
+            np.put_along_axis(maxs[:, 0::2], dims[..., None], mid[..., None], axis=2)
+            np.put_along_axis(mins[:, 1::2], dims[..., None], mid[..., None], axis=2)
+
+        n_nodes = 2 ** (H + 1) - 1
+        self._r = np.zeros((T, n_nodes))
+        self._l = np.zeros((T, n_nodes))
+
+    def _paths(self, Z):
+        """Node index at every depth of every tree: shape (rows, trees, height + 1)."""
+        n = len(Z)
+        # Flat indexing into the (trees, internal nodes) split tables
+        split_dim, split_val = self._split_dim.ravel(), self._split_val.ravel()
+        offsets = self._trees * self._split_dim.shape[1]
+        nodes = np.zeros((n, self.n_trees), dtype=np.intp)
+        path = np.zeros((n, self.n_trees, self.height + 1), dtype=np.intp)
+        for level in range(self.height):
+            flat = offsets + nodes
+            values = np.take_along_axis(Z, split_dim[flat], axis=1)
+            nodes = 2 * nodes + 1 + (values > split_val[flat])
+            path[..., level + 1] = nodes
+        return path
+
+    def _add_mass(self, mass, path):
+        if len(path) == 1:
+            # One row visits each node of a tree at most once: plain indexing
+            mass[self._trees[:, None], path[0]] += 1.0
+        else:
+            np.add.at(mass, (self._trees[None, :, None], path), 1.0)
+
+    def _score_paths(self, path):
+        mass = self._r[self._trees[None, :, None], path]
+        # Stop at the first node below the size limit (or at the leaf)
+        stop = mass <= self.size_limit
+        stop[..., -1] = True
+        depth = stop.argmax(axis=2)
+        node_mass = np.take_along_axis(mass, depth[..., None], axis=2)[..., 0]
+        return (node_mass * self._weights[depth]).sum(axis=1)
+
+    def _end_window(self):
+        if self._split_dim is None:
+            self._build(self._window)
+            self._add_mass(self._r, self._paths(self._window))
+        else:
+            self._r, self._l = self._l, self._r
+            self._l.fill(0.0)
+        scores = self._score_paths(self._paths(self._window))
+        self.threshold = float(np.quantile(scores, self.contamination))
+        self._count = 0
+
+    def partial_fit(self, X):
+        Z = np.atleast_2d(_squash(X))
+        if self._window is None:
+            self._window = np.zeros((self.window_size, Z.shape[1]))
+        for z in Z:
+            self._window[self._count] = z
+            self._count += 1
+            if self._split_dim is not None:
+                self._add_mass(self._l, self._paths(z[None, :]))
+            if self._count == self.window_size:
+                self._end_window()
+        return self
+
+    def fit(self, X):
+        self._reset()
+        return self.partial_fit(X)
+
+    def score_samples(self, X):
+        Z = np.atleast_2d(_squash(X))
+        if self._split_dim is None:
+            return np.full(len(Z), np.inf)
+        return self._score_paths(self._paths(Z))
+
+    def predict(self, X):
+        scores = self.score_samples(X)
+        if self.threshold is None:
+            return np.ones(len(scores), dtype=int)
+        return np.where(scores < self.threshold, -1, 1)
+
+
+def score_threshold(model):
+    """Score below which *model* labels a row as an anomaly."""
+    if isinstance(model, DetectorEngine):
+        return model.threshold
+    # IsolationForest.predict: decision_function = score_samples - offset_ < 0
+    return model.offset_
+
+
+def _isolation_forest(contamination=0.1, n_estimators=100, random_state=42, **_):
+    return IsolationForest(contamination=contamination, n_estimators=n_estimators, random_state=random_state)
+
+
+def _half_space_trees(contamination=0.1, hst_trees=25, hst_height=10, hst_window=250, **_):
+    return HalfSpaceTrees(n_trees=hst_trees, height=hst_height, window_size=hst_window,
+                          contamination=contamination)
+
+
+# Engine name (config ml.engine) -> factory(contamination, **ml options)
+ENGINES = {
+    "isolation_forest": _isolation_forest,
+    "half_space_trees": _half_space_trees,
+}
+ENGINE_TYPES = {
+    "isolation_forest": IsolationForest,
+    "half_space_trees": HalfSpaceTrees,
+}
+
+
+def create_engine(name, contamination=0.1, **options):
+    """Instantiate the engine registered as *name*."""
+    return ENGINES[name](contamination=contamination, **options)
@@ -1,12 +1,32 @@
+import copy
 import os
+import threading
+import time
 
 import joblib
 import numpy as np
-from sklearn.ensemble import IsolationForest
+
+from detection.batch import DEFAULT_CHUNK_SIZE, iter_chunks, score_chunks
+from detection.engines import ENGINE_TYPES, create_engine
+from detection.ring_buffer import RingBuffer
 
 
 class AnomalyDetector:
-    """ML-based anomaly detector using Isolation Forest on system/network features."""
+    """ML-based anomaly detector on system/network features.
+
+    The model is a pluggable engine (see :mod:`detection.engines`), chosen
+    by *engine*: ``isolation_forest`` (default) or ``half_space_trees``.
+
+    Batch engines are refit every *retrain_interval* cycles on a background
+    thread: :meth:`collect` only snapshots the sample window and returns.
+    The fitted model replaces :attr:`model` in a single reference
+    assignment, so :meth:`predict` always sees either the previous or the
+    new model, never one in the middle of fitting, and the file on disk is
+    replaced atomically (temp file + rename).
+
+    Online engines are updated in place with every collected sample and
+    never refit; they are only saved every *retrain_interval* cycles.
+    """
 
     FEATURE_NAMES = [
         "cpu_percent",
@@ -20,45 +40,112 @@ class AnomalyDetector:
     ]
 
     def __init__(self, model_path="model/anomaly_model.pkl", window_size=100,
-                 min_samples=20, retrain_interval=50, contamination=0.1):
+                 min_samples=20, retrain_interval=50, contamination=0.1, background=True,
+                 engine="isolation_forest", engine_options=None):
         self.model_path = model_path
         self.window_size = window_size
         self.min_samples = min_samples
         self.retrain_interval = retrain_interval
         self.contamination = contamination
-        self.data_buffer = []
+        # Last window_size feature rows, preallocated (window_size x 8 float64)
+        self.data_buffer = RingBuffer(window_size, len(self.FEATURE_NAMES))
+        self.background = background
+        self.engine = engine
+        self.engine_options = dict(engine_options or {})
         self.model = None
+        self.last_trained = None
+        self.training_seconds = None
+        self.training_error = None
         self._cycles = 0
+        self._trainer = None
         self._load_model()
+        if self.model is None and self.online:
+            self.model = self._new_model()
+
+    @property
+    def online(self):
+        return getattr(ENGINE_TYPES[self.engine], "online", False)
+
+    def _new_model(self):
+        return create_engine(self.engine, self.contamination, **self.engine_options)
 
     def _load_model(self):
         """Try loading an existing persisted model from disk."""
         try:
             if os.path.exists(self.model_path):
-                self.model = joblib.load(self.model_path)
+                model = joblib.load(self.model_path)
+                # A model saved by a different engine is ignored
+                if isinstance(model, ENGINE_TYPES[self.engine]):
+                    self.model = model
         except Exception:
             self.model = None
 
-    def _save_model(self):
-        """Persist the current model to disk."""
+    def _save_model(self, model):
+        """Persist *model* to disk; readers never see a partially written file."""
         try:
             model_dir = os.path.dirname(self.model_path)
             if model_dir:
                 os.makedirs(model_dir, exist_ok=True)
-            joblib.dump(self.model, self.model_path)
+            tmp_path = f"{self.model_path}.tmp"
+            joblib.dump(model, tmp_path)
+            os.replace(tmp_path, self.model_path)
         except Exception:
             pass
 
+    def _fit(self, X):
+        """Fit a new model on *X*, then publish and persist it."""
+        started = time.monotonic()
+        try:
+            model = self._new_model()
+            model.fit(X)
+        except Exception as e:
+            self.training_error = f"{type(e).__name__}: {e}"
+            return
+        # Atomic swap: predict() picks up the new model on its next call
+        self.model = model
+        self.training_seconds = time.monotonic() - started
+        self.last_trained = time.time()
+        self.training_error = None
+        self._save_model(model)
+
+    @property
+    def training(self):
+        return self._trainer is not None and self._trainer.is_alive()
+
     def _train(self):
-        """Fit a new Isolation Forest on the current data buffer."""
-        X = np.array(self.data_buffer)
-        self.model = IsolationForest(
-            contamination=self.contamination,
-            random_state=42,
-            n_estimators=100,
+        """Start fitting on a snapshot of the window (skipped if a fit is running)."""
+        if self.training:
+            return
+        # Copy: the ring buffer keeps changing while the worker fits
+        X = self.data_buffer.view().copy()
+        if not self.background:
+            self._fit(X)
+            return
+        self._trainer = threading.Thread(
+            target=self._fit, args=(X,), name="shcs-ml-trainer", daemon=True
+        )
+        self._trainer.start()
+
+    def _save_snapshot(self):
+        """Persist the online model off the agent loop (from a copy)."""
+        if self.training:
+            return
+        snapshot = copy.deepcopy(self.model)
+        if not self.background:
+            self._save_model(snapshot)
+            return
+        self._trainer = threading.Thread(
+            target=self._save_model, args=(snapshot,), name="shcs-ml-saver", daemon=True
         )
-        self.model.fit(X)
-        self._save_model()
+        self._trainer.start()
+
+    def wait_for_training(self, timeout=None):
+        """Block until a running fit finishes; returns False on timeout."""
+        trainer = self._trainer
+        if trainer is None:
+            return True
+        trainer.join(timeout)
+        return not trainer.is_alive()
 
     def collect(self, features):
         """Add a feature vector to the rolling buffer; retrain when appropriate.
@@ -66,13 +153,18 @@ class AnomalyDetector:
         Args:
             features: list of 8 floats matching FEATURE_NAMES order.
         """
-        self.data_buffer.append(list(features))
-        # Keep only the most recent window_size samples
-        if len(self.data_buffer) > self.window_size:
-            self.data_buffer.pop(0)
+        # Overwrites the oldest sample once window_size samples are held
+        self.data_buffer.append(features)
 
         self._cycles += 1
 
+        if self.online:
+            # O(trees x depth) update in place; no refit ever
+            self.model.partial_fit(self.data_buffer.view()[-1:])
+            if self._cycles % self.retrain_interval == 0:
+                self._save_snapshot()
+            return
+
         # Train once we have enough samples, then retrain every retrain_interval
         n = len(self.data_buffer)
         if n >= self.min_samples:
@@ -84,24 +176,66 @@ class AnomalyDetector:
 
         Returns False when still in learning mode (not enough data).
         """
-        if self.model is None or len(self.data_buffer) < self.min_samples:
+        model = self.model
+        if model is None or not getattr(model, "ready", True) or len(self.data_buffer) < self.min_samples:
             return False
         X = np.array([list(features)])
-        prediction = self.model.predict(X)
+        prediction = model.predict(X)
         # IsolationForest returns -1 for anomalies, 1 for inliers
         return int(prediction[0]) == -1
 
+    def score_batch(self, data, chunk_size=DEFAULT_CHUNK_SIZE, n_jobs=None):
+        """Score recorded feature rows with the current model.
+
+        Args:
+            data: an (N, 8) array, a ``.npy`` (memory-mapped) or ``.csv``
+                path, or an iterable of rows or row blocks; it is read
+                *chunk_size* rows at a time, so it may exceed memory.
+            n_jobs: threads scoring chunks in parallel (default: one per core).
+
+        Returns:
+            ``(scores, labels)``: raw scores (lower is more abnormal) and a
+            boolean array, True for anomalies, matching :meth:`predict`.
+
+        Raises:
+            ValueError: no trained model yet.
+        """
+        model = self.model
+        if model is None or not getattr(model, "ready", True):
+            raise ValueError("the anomaly model is not trained yet")
+        return score_chunks(model, iter_chunks(data, chunk_size), n_jobs)
+
+    def predict_batch(self, data, chunk_size=DEFAULT_CHUNK_SIZE, n_jobs=None):
+        """Return a boolean array, True for the anomalous rows of *data* (see :meth:`score_batch`)."""
+        return self.score_batch(data, chunk_size, n_jobs)[1]
+
     def get_status(self):
         """Return a dict describing the current detector state."""
         n = len(self.data_buffer)
-        if n < self.min_samples:
+        training = {
+            "engine": self.engine,
+            "training": self.training,
+            "last_trained": self.last_trained,
+            "training_seconds": self.training_seconds,
+        }
+        model = self.model
+        samples, min_samples = n, self.min_samples
+        if self.online and not getattr(model, "ready", False):
+            # An online engine scores once its first reference window is
+            # full; that window may be larger than the capped sample buffer
+            samples = self._cycles
+            min_samples = max(min_samples, getattr(model, "window_size", 0))
+        # Learning until a model is published (the first fit may still be running)
+        if n < self.min_samples or model is None or not getattr(model, "ready", True):
             return {
                 "mode": "learning",
-                "samples": n,
-                "min_samples": self.min_samples,
+                "samples": samples,
+                "min_samples": min_samples,
+                **training,
             }
         return {
             "mode": "active",
             "samples": n,
             "cycles": self._cycles,
+            **training,
         }
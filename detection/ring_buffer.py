@@ -0,0 +1,46 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Fixed-capacity FIFO of feature rows in one preallocated float64 array.
+
+    Rows are written twice, at ``i`` and ``i + capacity`` of a
+    ``(2 * capacity, width)`` array, so the last *n* rows are always one
+    contiguous slice in insertion order: :meth:`view` returns it without
+    copying and :meth:`append` is O(1) with no allocation.
+
+    Args:
+        capacity: rows kept; older rows are overwritten.
+        width: values per row.
+    """
+
+    def __init__(self, capacity, width, dtype=np.float64):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.width = width
+        self._data = np.zeros((2 * capacity, width), dtype=dtype)
+        self._next = 0   # slot the next row goes to
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, row):
+        i = self._next
+        self._data[i] = row
+        self._data[i + self.capacity] = row
+        self._next = i + 1 if i + 1 < self.capacity else 0
+        if self._size < self.capacity:
+            self._size += 1
+
+    def view(self):
+        """Return the stored rows, oldest first, as a read-only view (no copy)."""
+        end = self._next + self.capacity
+        view = self._data[end - self._size:end]
+        view.flags.writeable = False
+        return view
+
+    def clear(self):
+        self._next = 0
+        self._size = 0
@@ -1,46 +1,25 @@
-import json
-import os
-import subprocess
-
-_config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")
+from monitor.host_state import get_host_state
+from utils.config import get_config
 
 _BYTES_PER_MB = 1_000_000
 
 
-def _load_config():
-    try:
-        with open(_config_path, encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
-
-
-def _check_firewall_disabled():
-    """Return True if any Windows Firewall profile is reported as OFF."""
-    try:
-        result = subprocess.run(
-            ["netsh", "advfirewall", "show", "allprofiles", "state"],
-            capture_output=True, text=True, timeout=5
-        )
-        return "OFF" in result.stdout.upper()
-    except Exception:
-        return False
-
-
-def analyze(data):
-    config = _load_config()
-    thresholds = config.get("thresholds", {})
-    cpu_threshold = thresholds.get("cpu_percent", 90)
-    memory_threshold = thresholds.get("memory_percent", 95)
-    failed_login_limit = thresholds.get("failed_login_limit", 5)
-    bandwidth_alert_mbps = thresholds.get("bandwidth_alert_mbps", 10)
-    port_scan_threshold = thresholds.get("port_scan_threshold", 5)
-    suspicious_ports = set(config.get("suspicious_ports", [4444, 5555, 6666, 1337, 31337, 8443, 9001]))
+def analyze(data, config=None):
+    if config is None:
+        config = get_config()
+    thresholds = config.thresholds
+    cpu_threshold = thresholds["cpu_percent"]
+    memory_threshold = thresholds["memory_percent"]
+    failed_login_limit = thresholds["failed_login_limit"]
+    bandwidth_alert_mbps = thresholds["bandwidth_alert_mbps"]
+    port_scan_threshold = thresholds["port_scan_threshold"]
+    suspicious_ports = config.suspicious_ports
 
     threats = []
 
     system = data.get("system", {})
-    if system.get("cpu", 0) > cpu_threshold:
+    # p95 over the sampler window catches short spikes the mean smooths out
+    if system.get("cpu_p95", system.get("cpu", 0)) > cpu_threshold:
         threats.append({"type": "HIGH_CPU", "severity": "HIGH"})
 
     if system.get("memory", 0) > memory_threshold:
@@ -48,6 +27,16 @@ def analyze(data):
 
     processes = data.get("processes", [])
     for proc in processes:
+        if proc.get("high_cpu") and not proc.get("match"):
+            # Busy but not matching any signature: compilers, scans, updates
+            threats.append({
+                "type": "HIGH_CPU_PROCESS",
+                "severity": "MEDIUM",
+                "pid": proc.get("pid"),
+                "detail": f"{proc.get('name')} (PID {proc.get('pid')}) using "
+                          f"{proc.get('cpu_percent', 0):.0f}% CPU",
+            })
+            continue
         threats.append({
             "type": "MALICIOUS_PROCESS",
             "severity": "CRITICAL",
@@ -103,12 +92,34 @@ def analyze(data):
             "detail": f"Outbound bandwidth {bytes_sent / _BYTES_PER_MB:.1f} MB/s exceeds threshold",
         })
 
-    # Firewall disabled check
-    if _check_firewall_disabled():
+    # Host state comes from background probes; never spawns a process here
+    host_state = data.get("host_state")
+    if host_state is None:
+        host_state = get_host_state(config)
+
+    firewall = host_state.get("firewall")
+    if firewall and firewall.get("disabled"):
         threats.append({
             "type": "FIREWALL_DISABLED",
             "severity": "CRITICAL",
             "detail": "Windows Firewall is disabled on one or more profiles",
         })
 
+    dns = host_state.get("dns")
+    allowed_dns = config.allowed_dns_servers
+    if dns and allowed_dns:
+        unexpected = [s for s in dns.get("servers", ()) if s not in allowed_dns]
+        if unexpected:
+            interfaces = [
+                name for name, servers in dns.get("interfaces", {}).items()
+                if any(s not in allowed_dns for s in servers)
+            ]
+            threats.append({
+                "type": "DNS_TAMPER",
+                "severity": "CRITICAL",
+                "servers": unexpected,
+                "interfaces": interfaces,
+                "detail": f"Unexpected DNS servers configured: {', '.join(unexpected)}",
+            })
+
     return threats
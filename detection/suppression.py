@@ -0,0 +1,100 @@
+import time
+from collections import OrderedDict
+
+from utils.config import SEVERITY_ORDER
+
+_RANK = {s: i for i, s in enumerate(SEVERITY_ORDER)}
+
+
+def threat_key(threat):
+    """Identity of a threat for deduplication: (type, ip, pid, port)."""
+    return (threat.get("type"), threat.get("ip"), threat.get("pid"), threat.get("port"))
+
+
+class _Record:
+    __slots__ = ("rank", "count", "first_seen", "last_seen", "passed_at", "suppressed")
+
+    def __init__(self, rank, now):
+        self.rank = rank
+        self.count = 1
+        self.first_seen = now
+        self.last_seen = now
+        self.passed_at = now
+        self.suppressed = 0
+
+
+class ThreatSuppressor:
+    """Collapses repeated threats between analysis and response.
+
+    Threats are keyed by :func:`threat_key`. The first occurrence passes and
+    opens a window; repeats inside the window are only counted. A repeat
+    passes again if its severity is higher than anything seen for that key
+    (escalation) or once the window has elapsed, carrying the number of
+    occurrences it stands for. Keys not seen for a whole window are
+    forgotten, so memory follows the set of currently active threats.
+
+    Args:
+        window: seconds during which repeats are suppressed.
+        max_records: cap on tracked keys; the least recently seen go first.
+        clock: time source (seconds).
+    """
+
+    def __init__(self, window=300.0, max_records=10000, clock=time.time):
+        self.window = window
+        self.max_records = max_records
+        self._clock = clock
+        self._records = OrderedDict()
+        self.passed = 0
+        self.suppressed = 0
+
+    def __len__(self):
+        return len(self._records)
+
+    def _prune(self, now):
+        records = self._records
+        while records:
+            key, record = next(iter(records.items()))
+            if now - record.last_seen <= self.window and len(records) <= self.max_records:
+                break
+            del records[key]
+
+    def filter(self, threats):
+        """Return the threats that should reach logging / healing / notifying.
+
+        Passed threats are copies annotated with ``count`` (occurrences since
+        the key was last passed, including this one), ``first_seen`` and
+        ``last_seen`` (epoch seconds).
+        """
+        now = self._clock()
+        self._prune(now)
+        passed = []
+        for threat in threats:
+            key = threat_key(threat)
+            rank = _RANK.get(threat.get("severity"), 0)
+            record = self._records.get(key)
+            if record is None:
+                record = self._records[key] = _Record(rank, now)
+            else:
+                self._records.move_to_end(key)
+                record.count += 1
+                record.last_seen = now
+                escalated = rank > record.rank
+                if not escalated and now - record.passed_at < self.window:
+                    record.suppressed += 1
+                    self.suppressed += 1
+                    continue
+                record.rank = max(rank, record.rank)
+                record.passed_at = now
+
+            out = dict(threat)
+            out["count"] = record.suppressed + 1
+            out["first_seen"] = record.first_seen
+            out["last_seen"] = now
+            record.suppressed = 0
+            passed.append(out)
+            self.passed += 1
+        return passed
+
+    def stats(self):
+        """Return passed / suppressed totals and the number of active keys."""
+        return {"passed": self.passed, "suppressed": self.suppressed, "active": len(self._records)}
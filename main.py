@@ -1,15 +1,12 @@
 import sys
-import os
-import msvcrt
+import threading
 
-# ---------- Single instance lock ----------
-LOCK_FILE = r"C:\ProgramData\SHCS\agent.lock"
-os.makedirs(os.path.dirname(LOCK_FILE), exist_ok=True)
+from utils.agent_lock import acquire_agent_lock
 
-try:
-    lock = open(LOCK_FILE, "w")
-    msvcrt.locking(lock.fileno(), msvcrt.LK_NBLCK, 1)
-except OSError:
+# ---------- Single instance lock ----------
+# Also publishes agent.pid (pid, create time, heartbeat) for the dashboard
+lock = acquire_agent_lock()
+if lock is None:
     sys.exit(0)  # another instance already running
 # ----------------------------------------
 
@@ -18,4 +15,10 @@ from agent import start_agent
 if __name__ == "__main__":
     if "--agent" in sys.argv:
         print("SHCS Agent starting...")
-        start_agent()
+        # The dashboard's Stop button creates agent.stop; stop gracefully
+        stop_event = threading.Event()
+        lock.watch(stop_event)
+        try:
+            start_agent(stop_event)
+        finally:
+            lock.release()
@@ -0,0 +1,80 @@
+import hashlib
+import math
+import os
+import struct
+
+MAGIC = b"SHCSBLM1"
+# magic, bit count, hash count, stamp of the data set, caller metadata
+_HEADER = struct.Struct("<8sQIQI")
+_U64 = (1 << 64) - 1
+
+
+class BloomFilter:
+    """Bit-array Bloom filter over integer keys.
+
+    Uses double hashing of a single BLAKE2b digest, so a membership test
+    costs one hash plus *k* bit probes. False positives are possible, false
+    negatives are not.
+
+    Args:
+        bits: size of the bit array.
+        hashes: number of bit probes per key.
+        data: optional existing bit array (bytes-like).
+        stamp: identifier of the data set the filter was built from.
+        meta: caller-defined 32-bit value persisted with the filter.
+    """
+
+    def __init__(self, bits, hashes, data=None, stamp=0, meta=0):
+        self.bits = max(8, bits)
+        self.hashes = max(1, hashes)
+        self.stamp = stamp
+        self.meta = meta
+        size = (self.bits + 7) // 8
+        self._data = bytearray(size) if data is None else data
+        if len(self._data) < size:
+            raise ValueError("bloom filter data is shorter than its bit count")
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate=0.01, stamp=0, meta=0):
+        """Create a filter sized for *capacity* keys at *error_rate*."""
+        capacity = max(1, capacity)
+        bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        hashes = int(round(bits / capacity * math.log(2)))
+        return cls(bits, hashes, stamp=stamp, meta=meta)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.to_bytes(24, "little"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        bits = self.bits
+        return [((h1 + i * h2) & _U64) % bits for i in range(self.hashes)]
+
+    def add(self, key):
+        data = self._data
+        for pos in self._positions(key):
+            data[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        data = self._data
+        for pos in self._positions(key):
+            if not data[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, self.bits, self.hashes, self.stamp, self.meta))
+            f.write(self._data)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a filter written by :meth:`save`; raises on a bad file."""
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            magic, bits, hashes, stamp, meta = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a bloom filter")
+            data = bytearray(f.read())
+        return cls(bits, hashes, data=data, stamp=stamp, meta=meta)
@@ -0,0 +1,73 @@
+import time
+from collections import Counter, namedtuple
+from functools import cached_property
+from types import MappingProxyType
+
+import psutil
+
+Connection = namedtuple(
+    "Connection", ["local_ip", "local_port", "remote_ip", "remote_port", "status", "pid"]
+)
+
+
+def _group(connections, key):
+    groups = {}
+    for conn in connections:
+        groups.setdefault(key(conn), []).append(conn)
+    return MappingProxyType({k: tuple(v) for k, v in groups.items()})
+
+
+class ConnectionSnapshot:
+    """Immutable view of the system connection table at one point in time.
+
+    The table is enumerated once per cycle and shared by every consumer
+    (network monitor, traffic monitor, threat intel, rule engine). Derived
+    views are computed lazily on first access and then cached.
+    """
+
+    def __init__(self, connections, taken_at=None):
+        self.connections = tuple(connections)
+        self.taken_at = time.time() if taken_at is None else taken_at
+
+    def __len__(self):
+        return len(self.connections)
+
+    def __iter__(self):
+        return iter(self.connections)
+
+    @cached_property
+    def remote(self):
+        """Connections that have a remote address."""
+        return tuple(c for c in self.connections if c.remote_ip)
+
+    @cached_property
+    def count_by_state(self):
+        """Mapping of TCP state (e.g. ``ESTABLISHED``) -> connection count."""
+        return MappingProxyType(dict(Counter(c.status for c in self.connections)))
+
+    @cached_property
+    def by_remote_ip(self):
+        """Mapping of remote IP -> tuple of connections."""
+        return _group(self.remote, lambda c: c.remote_ip)
+
+    @cached_property
+    def by_pid(self):
+        """Mapping of owning pid (may be None) -> tuple of connections."""
+        return _group(self.connections, lambda c: c.pid)
+
+
+def take_snapshot(kind="inet"):
+    """Enumerate the connection table once and return a :class:`ConnectionSnapshot`."""
+    connections = []
+    for conn in psutil.net_connections(kind=kind):
+        laddr = conn.laddr
+        raddr = conn.raddr
+        connections.append(Connection(
+            laddr.ip if laddr else None,
+            laddr.port if laddr else None,
+            raddr.ip if raddr else None,
+            raddr.port if raddr else None,
+            conn.status,
+            conn.pid,
+        ))
+    return ConnectionSnapshot(connections)
@@ -0,0 +1,242 @@
+import subprocess
+import threading
+import time
+
+from utils.config import get_config
+from utils.ip_index import parse_ip
+
+FIREWALL_COMMAND = ("netsh", "advfirewall", "show", "allprofiles", "state")
+DNS_COMMAND = ("netsh", "interface", "ip", "show", "dnsservers")
+
+
+def run_command(args, timeout):
+    """Default command runner: run *args* and return its stdout as text."""
+    result = subprocess.run(list(args), capture_output=True, text=True, timeout=timeout)
+    return result.stdout
+
+
+def parse_firewall_state(output):
+    """Parse ``netsh advfirewall show allprofiles state`` output.
+
+    Returns:
+        dict with ``profiles`` ({"Domain": "ON", ...}) and ``disabled`` —
+        True if any profile is OFF.
+    """
+    profiles = {}
+    profile = None
+    for line in output.splitlines():
+        line = line.strip()
+        if line.endswith("Profile Settings:"):
+            profile = line.split()[0]
+        elif profile and line.upper().startswith("STATE"):
+            profiles[profile] = line.split()[-1].upper()
+            profile = None
+    if profiles:
+        disabled = any(state == "OFF" for state in profiles.values())
+    else:
+        # Unrecognised (e.g. localised) output: fall back to a plain search
+        disabled = "OFF" in output.upper()
+    return {"profiles": profiles, "disabled": disabled}
+
+
+def parse_dns_servers(output):
+    """Parse ``netsh interface ip show dnsservers`` output.
+
+    Returns:
+        dict with ``interfaces`` ({name: [server, ...]}) and ``servers`` —
+        the sorted set of every configured server.
+    """
+    interfaces = {}
+    current = None
+    for line in output.splitlines():
+        text = line.strip()
+        if text.startswith("Configuration for interface"):
+            current = interfaces.setdefault(text.split('"')[1] if '"' in text else text, [])
+            continue
+        if current is None or not text:
+            continue
+        token = text.split()[-1]
+        if parse_ip(token) is not None:
+            current.append(token)
+    servers = sorted({s for found in interfaces.values() for s in found})
+    return {"interfaces": interfaces, "servers": servers}
+
+
+def probe_firewall(runner, timeout):
+    return parse_firewall_state(runner(FIREWALL_COMMAND, timeout))
+
+
+def probe_dns(runner, timeout):
+    return parse_dns_servers(runner(DNS_COMMAND, timeout))
+
+
+class Probe:
+    """A slow host-state check run by :class:`HostStateProber`.
+
+    Args:
+        name: Key under which the result is published.
+        func: Callable ``func(runner, timeout)`` returning the probed state.
+        interval: Seconds between runs.
+        ttl: Seconds a result stays valid; older results read as missing.
+        timeout: Seconds the command runner may take.
+    """
+
+    def __init__(self, name, func, interval=30.0, ttl=90.0, timeout=5.0):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.ttl = ttl
+        self.timeout = timeout
+        self.value = None
+        self.taken_at = None
+        self.next_due = 0.0
+        self.last_error = None
+        self.runs = 0
+        self.errors = 0
+
+
+class HostStateProber:
+    """Runs host-state probes on a background thread and caches the results.
+
+    Each probe has its own interval; readers get the cached value through
+    :meth:`get` / :meth:`state`, which never block on a probe. Results older
+    than the probe's TTL are reported as missing (None) rather than stale.
+
+    Args:
+        probes: iterable of :class:`Probe`.
+        runner: callable ``runner(args, timeout)`` returning command output;
+            defaults to :func:`run_command`. Tests pass a fake.
+        clock: monotonic time source.
+    """
+
+    def __init__(self, probes, runner=run_command, clock=time.monotonic):
+        self._probes = {p.name: p for p in probes}
+        self.runner = runner
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="shcs-host-probes", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def configure(self, settings):
+        """Apply per-probe ``interval``/``ttl``/``timeout`` overrides."""
+        for name, opts in settings.items():
+            probe = self._probes.get(name)
+            if probe is None or not hasattr(opts, "get"):
+                continue
+            probe.interval = opts.get("interval", probe.interval)
+            probe.ttl = opts.get("ttl", probe.ttl)
+            probe.timeout = opts.get("timeout", probe.timeout)
+        self._wake.set()
+
+    def run_due(self):
+        """Run every probe that is due now; returns seconds until the next one."""
+        now = self._clock()
+        for probe in list(self._probes.values()):
+            if now < probe.next_due:
+                continue
+            try:
+                value = probe.func(self.runner, probe.timeout)
+            except Exception as e:
+                with self._lock:
+                    probe.errors += 1
+                    probe.last_error = f"{type(e).__name__}: {e}"
+            else:
+                with self._lock:
+                    probe.value = value
+                    probe.taken_at = self._clock()
+                    probe.last_error = None
+            probe.runs += 1
+            probe.next_due = self._clock() + probe.interval
+        if not self._probes:
+            return 1.0
+        return max(0.0, min(p.next_due for p in self._probes.values()) - self._clock())
+
+    def _loop(self):
+        while not self._stop.is_set():
+            delay = self.run_due()
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def get(self, name):
+        """Return the cached result of probe *name*, or None if missing/expired."""
+        probe = self._probes.get(name)
+        if probe is None:
+            return None
+        with self._lock:
+            value, taken_at = probe.value, probe.taken_at
+        if taken_at is None or self._clock() - taken_at > probe.ttl:
+            return None
+        return value
+
+    def state(self):
+        """Return ``{name: cached result or None}`` for every probe."""
+        return {name: self.get(name) for name in self._probes}
+
+    def stats(self):
+        """Return per-probe run counters, last error and result age."""
+        now = self._clock()
+        with self._lock:
+            return {
+                name: {
+                    "runs": p.runs,
+                    "errors": p.errors,
+                    "last_error": p.last_error,
+                    "age": None if p.taken_at is None else now - p.taken_at,
+                }
+                for name, p in self._probes.items()
+            }
+
+
+_prober = None
+_prober_lock = threading.Lock()
+
+
+def get_prober(config=None):
+    """Return the shared host-state prober, starting it on first use."""
+    global _prober
+    if config is None:
+        config = get_config()
+    with _prober_lock:
+        if _prober is None:
+            _prober = HostStateProber([Probe("firewall", probe_firewall), Probe("dns", probe_dns)])
+            _prober.configure(config.host_probes)
+            _prober.start()
+    return _prober
+
+
+def get_host_state(config=None):
+    """Return the latest cached host state without blocking.
+
+    Returns:
+        ``{"firewall": {...} | None, "dns": {...} | None}``; a probe that has
+        not completed yet, failed, or whose result has expired reads as None.
+    """
+    return get_prober(config).state()
+
+
+def shutdown():
+    """Stop the shared prober thread, if it was started."""
+    global _prober
+    with _prober_lock:
+        if _prober is not None:
+            _prober.stop()
+            _prober = None
@@ -0,0 +1,395 @@
+import bisect
+import ipaddress
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+from monitor.bloom import BloomFilter
+from utils.ip_index import parse_ip
+
+_USAGE = "usage: python -m monitor.intel_feed OUTPUT.bin SOURCE [SOURCE ...]"
+_UNSET = object()
+
+MAGIC = b"SHCSIOC1"
+_HEADER = struct.Struct("<8sIIQ")
+_U64 = (1 << 64) - 1
+
+# Bloom keys are address buckets: a range is inserted at the finest level
+# (IPv4 /24, /16, /8; IPv6 /48, /32, /16) that covers it with at most
+# _MAX_BUCKETS keys. Lookups probe only the levels the feed actually uses.
+_BLOOM_LEVELS = {4: (8, 16, 24), 6: (80, 96, 112)}
+_MAX_BUCKETS = 256
+_BLOOM_ERROR_RATE = 0.01
+
+
+def _bloom_key(version, level, bucket):
+    return (bucket << 8) | (version << 4) | level
+
+
+def _bloom_level(version, start, end):
+    """Return the level index used for a range, or None if too wide."""
+    for level, shift in enumerate(_BLOOM_LEVELS[version]):
+        if (end >> shift) - (start >> shift) < _MAX_BUCKETS:
+            return level
+    return None
+
+
+def _level_bit(version, level):
+    return 1 << (level + (0 if version == 4 else 8))
+
+
+def build_bloom(v4, v6, stamp=0, error_rate=_BLOOM_ERROR_RATE):
+    """Build the pre-filter for merged IPv4 / IPv6 ranges.
+
+    Returns None if a range is too wide to be represented by buckets; the
+    feed is then searched exactly for every lookup.
+    """
+    plan = []
+    count = 0
+    mask = 0
+    for version, ranges in ((4, v4), (6, v6)):
+        for start, end in ranges:
+            level = _bloom_level(version, start, end)
+            if level is None:
+                return None
+            shift = _BLOOM_LEVELS[version][level]
+            plan.append((version, level, start >> shift, end >> shift))
+            count += (end >> shift) - (start >> shift) + 1
+            mask |= _level_bit(version, level)
+
+    bloom = BloomFilter.for_capacity(count, error_rate, stamp=stamp, meta=mask)
+    for version, level, first, last in plan:
+        for bucket in range(first, last + 1):
+            bloom.add(_bloom_key(version, level, bucket))
+    return bloom
+
+
+def _parse_entry(text):
+    """Return ``(version, start, end)`` for an IP, CIDR or range, else None."""
+    text = text.strip().strip('"').strip("'")
+    if not text:
+        return None
+    if "-" in text and "/" not in text:
+        low, _, high = text.partition("-")
+        a, b = parse_ip(low.strip()), parse_ip(high.strip())
+        if a is None or b is None or a[0] != b[0]:
+            return None
+        return a[0], min(a[1], b[1]), max(a[1], b[1])
+    if "/" in text:
+        try:
+            net = ipaddress.ip_network(text, strict=False)
+        except ValueError:
+            return None
+        if net.version == 6 and net.network_address.ipv4_mapped is not None and net.prefixlen >= 96:
+            net = ipaddress.ip_network(f"{net.network_address.ipv4_mapped}/{net.prefixlen - 96}")
+        return net.version, int(net.network_address), int(net.broadcast_address)
+    parsed = parse_ip(text)
+    if parsed is None:
+        return None
+    return parsed[0], parsed[1], parsed[1]
+
+
+def parse_feed_lines(lines):
+    """Yield ``(version, start, end)`` from text or CSV IOC lines.
+
+    Blank lines and ``#`` / ``;`` comments are skipped. For CSV lines the
+    first field that parses as an address, CIDR or range is used.
+    """
+    for line in lines:
+        line = line.split("#", 1)[0].split(";", 1)[0].strip()
+        if not line:
+            continue
+        for field in line.split(","):
+            entry = _parse_entry(field)
+            if entry is not None:
+                yield entry
+                break
+
+
+def merge_ranges(ranges):
+    """Sort and merge overlapping or adjacent ``(start, end)`` ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def compile_feed(sources, out_path):
+    """Compile IOC source files into a binary feed at *out_path*.
+
+    Sources are plain text or CSV, one IP, CIDR or ``start-end`` range per
+    line. Ranges are merged and written as sorted integer arrays:
+
+        header   "<8sIIQ"  magic, IPv4 range count, IPv6 range count, build time (ns)
+        IPv4     starts[n4] uint32, ends[n4] uint32
+        padding  to an 8-byte boundary
+        IPv6     starts_hi[n6], starts_lo[n6], ends_hi[n6], ends_lo[n6] uint64
+
+    A Bloom pre-filter is persisted next to the feed as
+    ``<out_path>.bloom``. The files are written to temporary names and moved
+    into place. On Windows a running agent's memory map prevents replacing
+    the feed; it is then left as ``<out_path>.pending`` and the agent swaps
+    it in on its next :meth:`IntelFeed.refresh`.
+
+    Returns:
+        dict with the number of IPv4 / IPv6 ranges and the path written.
+    """
+    v4, v6 = [], []
+    for source in sources:
+        with open(source, encoding="utf-8", errors="replace") as f:
+            for version, start, end in parse_feed_lines(f):
+                (v4 if version == 4 else v6).append((start, end))
+    v4 = merge_ranges(v4)
+    v6 = merge_ranges(v6)
+
+    n4, n6 = len(v4), len(v6)
+    stamp = time.time_ns()
+    header = _HEADER.pack(MAGIC, n4, n6, stamp)
+    body = bytearray()
+    body += struct.pack(f"<{n4}I", *(r[0] for r in v4))
+    body += struct.pack(f"<{n4}I", *(r[1] for r in v4))
+    body += b"\0" * (-(len(header) + len(body)) % 8)
+    body += struct.pack(f"<{n6}Q", *(r[0] >> 64 for r in v6))
+    body += struct.pack(f"<{n6}Q", *(r[0] & _U64 for r in v6))
+    body += struct.pack(f"<{n6}Q", *(r[1] >> 64 for r in v6))
+    body += struct.pack(f"<{n6}Q", *(r[1] & _U64 for r in v6))
+
+    out_dir = os.path.dirname(out_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    tmp_path = f"{out_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(body)
+    # The filter goes first: it is read into memory rather than mapped, and
+    # a reader that sees it before the new feed just ignores it (stamps differ)
+    bloom = build_bloom(v4, v6, stamp=stamp)
+    bloom_path = f"{out_path}.bloom"
+    if bloom is not None:
+        bloom.save(bloom_path)
+    elif os.path.exists(bloom_path):
+        os.remove(bloom_path)
+
+    written = out_path
+    try:
+        os.replace(tmp_path, out_path)
+    except PermissionError:
+        written = f"{out_path}.pending"
+        os.replace(tmp_path, written)
+    return {"ipv4_ranges": n4, "ipv6_ranges": n6, "path": written, "bloom": bloom is not None}
+
+
+class _U128Sequence:
+    """Read-only sequence of 128-bit ints stored as separate hi/lo arrays."""
+
+    def __init__(self, hi, lo):
+        self._hi = hi
+        self._lo = lo
+
+    def __len__(self):
+        return len(self._hi)
+
+    def __getitem__(self, i):
+        return (self._hi[i] << 64) | self._lo[i]
+
+
+class IntelFeed:
+    """Memory-mapped, binary-searchable view of a compiled IOC feed.
+
+    The file is mapped read-only, so loading is instant, no Python object
+    is created per IOC and the pages are shared by every process mapping
+    the same feed. Lookups are a bisect over the sorted range starts.
+
+    Args:
+        path: compiled feed file; a missing file is an empty feed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.version = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._stamp = _UNSET
+        self._mmap = None
+        self._views = None
+        self._bloom = None
+        self._levels = {}
+        self._stats = dict.fromkeys(("lookups", "filtered", "passed", "hits", "false_positives"), 0)
+        self.refresh()
+
+    def __len__(self):
+        views = self._views
+        if views is None:
+            return 0
+        return len(views[0]) + len(views[2])
+
+    def _close(self):
+        self._bloom = None
+        views, self._views = self._views, None
+        if views is not None:
+            for view in (views[0], views[1], views[2]._hi, views[2]._lo, views[3]._hi, views[3]._lo):
+                view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _open(self):
+        with open(self.path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, n4, n6, stamp = _HEADER.unpack_from(mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a compiled intel feed")
+            buf = memoryview(mm)
+            offset = _HEADER.size
+            v4_starts = buf[offset:offset + 4 * n4].cast("I")
+            offset += 4 * n4
+            v4_ends = buf[offset:offset + 4 * n4].cast("I")
+            offset += 4 * n4
+            offset += -offset % 8
+            arrays = []
+            for _ in range(4):
+                arrays.append(buf[offset:offset + 8 * n6].cast("Q"))
+                offset += 8 * n6
+            buf.release()
+        except Exception:
+            try:
+                mm.close()
+            except BufferError:
+                pass
+            raise
+        self._mmap = mm
+        self._views = (
+            v4_starts, v4_ends,
+            _U128Sequence(arrays[0], arrays[1]), _U128Sequence(arrays[2], arrays[3]),
+        )
+        self._load_bloom(stamp)
+
+    def _load_bloom(self, stamp):
+        try:
+            bloom = BloomFilter.load(f"{self.path}.bloom")
+        except (OSError, ValueError, struct.error):
+            return
+        if bloom.stamp != stamp:
+            # Filter belongs to another build of the feed; search exactly
+            return
+        self._levels = {
+            version: [
+                (level, shift) for level, shift in enumerate(shifts)
+                if bloom.meta & _level_bit(version, level)
+            ]
+            for version, shifts in _BLOOM_LEVELS.items()
+        }
+        self._bloom = bloom
+
+    def _maybe_contains(self, version, value):
+        bloom = self._bloom
+        if bloom is None:
+            return True
+        for level, shift in self._levels[version]:
+            if _bloom_key(version, level, value >> shift) in bloom:
+                return True
+        return False
+
+    def refresh(self):
+        """Re-map the feed if the file changed on disk.
+
+        Returns:
+            True if a new version was loaded.
+        """
+        with self._lock:
+            pending = f"{self.path}.pending"
+            if os.path.exists(pending):
+                self._close()
+                self._stamp = _UNSET
+                try:
+                    os.replace(pending, self.path)
+                except OSError:
+                    pass
+            try:
+                st = os.stat(self.path)
+                stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+            except OSError:
+                stamp = None
+            if stamp == self._stamp:
+                return False
+
+            self._close()
+            self._stamp = stamp
+            self.last_error = None
+            if stamp is not None and st.st_size > 0:
+                try:
+                    self._open()
+                except (OSError, ValueError, struct.error) as e:
+                    # A corrupt or truncated feed is treated as empty
+                    self.last_error = str(e)
+            self.version += 1
+            return True
+
+    def contains(self, ip):
+        """Return True if *ip* falls inside any range of the feed."""
+        views = self._views
+        if views is None:
+            return False
+        parsed = parse_ip(ip)
+        if parsed is None:
+            return False
+        version, value = parsed
+        stats = self._stats
+        stats["lookups"] += 1
+        if not self._maybe_contains(version, value):
+            stats["filtered"] += 1
+            return False
+        stats["passed"] += 1
+
+        starts, ends = (views[0], views[1]) if version == 4 else (views[2], views[3])
+        try:
+            i = bisect.bisect_right(starts, value) - 1
+            hit = i >= 0 and value <= ends[i]
+        except ValueError:
+            # Views were released by a concurrent refresh()
+            return False
+        if hit:
+            stats["hits"] += 1
+        elif self._bloom is not None:
+            stats["false_positives"] += 1
+        return hit
+
+    def stats(self):
+        """Return lookup counters and pre-filter hit / false-positive rates."""
+        stats = dict(self._stats)
+        passed = stats["passed"]
+        stats["bloom"] = self._bloom is not None
+        stats["filter_rate"] = stats["filtered"] / stats["lookups"] if stats["lookups"] else 0.0
+        stats["false_positive_rate"] = stats["false_positives"] / passed if passed else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._close()
+            self._stamp = _UNSET
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 2:
+        print(_USAGE, file=sys.stderr)
+        return 2
+    result = compile_feed(argv[1:], argv[0])
+    print(
+        f"Compiled {result['ipv4_ranges']} IPv4 and {result['ipv6_ranges']} IPv6 "
+        f"ranges into {result['path']}"
+        + ("" if result["bloom"] else " (ranges too wide for a Bloom pre-filter)")
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,62 +1,49 @@
-import json
-import os
-import psutil
+from monitor.connections import take_snapshot
+from utils.config import get_config
+from utils.ip_index import PRIVATE_RANGES, IPClassifier
 
-_config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")
+_private_index = IPClassifier({"private": PRIVATE_RANGES})
 
-_DEFAULT_SAFE_IPS = ["127.0.0.1", "::1"]
-_DEFAULT_TRUSTED_PREFIXES = (
-    "13.", "15.", "20.", "40.", "52.",     # Microsoft / Azure
-    "142.250.", "142.251.",               # Google
-    "104.16.", "104.17.", "104.18.",      # Cloudflare
-)
-
-
-def _load_config():
-    try:
-        with open(_config_path, encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+# Remote addresses carrying any of these labels are never reported
+_IGNORED_LABELS = frozenset({"safe", "private", "trusted"})
 
 
 def is_private_ip(ip):
-    return (
-        ip.startswith("10.") or
-        ip.startswith("192.168.") or
-        ip.startswith("172.")
-    )
-
-
-def is_trusted_ip(ip, trusted_prefixes):
-    return ip.startswith(tuple(trusted_prefixes))
-
+    return _private_index.has(ip, "private")
 
-def get_suspicious_connections():
-    config = _load_config()
-    safe_ips = set(config.get("safe_ips", _DEFAULT_SAFE_IPS))
-    trusted_prefixes = config.get("trusted_ip_prefixes", _DEFAULT_TRUSTED_PREFIXES)
 
-    suspicious = []
+def is_trusted_ip(ip, config=None):
+    if config is None:
+        config = get_config()
+    return config.ip_classifier.has(ip, "trusted")
 
-    for conn in psutil.net_connections(kind="inet"):
-        if not conn.raddr:
-            continue
 
-        ip = conn.raddr.ip
+def get_suspicious_connections(config=None, snapshot=None):
+    """Return remote connections that are not safe, private or trusted.
 
-        if ip in safe_ips:
-            continue
+    Args:
+        config: ConfigView to use; defaults to the current config.
+        snapshot: ConnectionSnapshot shared with the other consumers of
+            this cycle; the connection table is enumerated if omitted.
+    """
+    if config is None:
+        config = get_config()
+    if snapshot is None:
+        snapshot = take_snapshot()
+    classify = config.ip_classifier.classify
 
-        if is_private_ip(ip):
-            continue
+    suspicious = []
 
-        if is_trusted_ip(ip, trusted_prefixes):
+    # Classify each remote address once, however many sockets it has
+    for ip, conns in snapshot.by_remote_ip.items():
+        if classify(ip) & _IGNORED_LABELS:
             continue
 
-        suspicious.append({
-            "ip": ip,
-            "pid": conn.pid
-        })
+        for conn in conns:
+            suspicious.append({
+                "ip": ip,
+                "port": conn.remote_port,
+                "pid": conn.pid
+            })
 
     return suspicious
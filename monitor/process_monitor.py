@@ -1,41 +1,96 @@
-import json
 import os
+import threading
+
 import psutil
 
-_config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.json")
+from monitor.process_tracker import ProcessTracker
+from monitor.signatures import SignatureMatcher
+from utils.config import get_config
 
 CRITICAL_PIDS = {0, 4}
+HIGH_CPU_PERCENT = 80
+
+_tracker = ProcessTracker()
+_lock = threading.Lock()
+_matcher = SignatureMatcher({})
+# (pid, create_time) -> matched signatures; name, exe and cmdline never
+# change, so each process is matched once per config version.
+_signature_matches = {}
+# (pid, create_time) -> TrackedProcess currently considered suspicious
+_flagged = {}
+_config_version = None
 
 
-def _load_config():
+def _read_field(proc, attr):
     try:
-        with open(_config_path, encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+        value = getattr(proc, attr)()
+    except (psutil.AccessDenied, psutil.NoSuchProcess, psutil.ZombieProcess):
+        return ""
+    if isinstance(value, list):
+        return " ".join(value)
+    return value or ""
+
+
+def _match_signatures(tracked):
+    # exe()/cmdline() cost a syscall each; only read them when needed
+    exe = _read_field(tracked.proc, "exe") if "exe" in _matcher.fields else ""
+    cmdline = _read_field(tracked.proc, "cmdline") if "cmdline" in _matcher.fields else ""
+    return tuple(_matcher.match(tracked.name, exe, cmdline))
+
+
+def _examine(tracked):
+    # The agent itself is busy during ML fits; never flag (or kill) it
+    if tracked.pid in CRITICAL_PIDS or tracked.pid == os.getpid():
+        return
+    matches = _signature_matches.get(tracked.key)
+    if matches is None:
+        matches = _signature_matches[tracked.key] = _match_signatures(tracked)
+    if matches or tracked.cpu_percent > HIGH_CPU_PERCENT:
+        _flagged[tracked.key] = tracked
+    else:
+        _flagged.pop(tracked.key, None)
+
+
+def _describe(tracked):
+    info = tracked.info()
+    matches = _signature_matches.get(tracked.key)
+    if matches:
+        info["match"] = [f"{field}:{pattern}" for field, pattern in matches]
+    else:
+        # Flagged for CPU use alone: reported, but not treated as malicious
+        info["high_cpu"] = True
+    return info
 
 
-def get_suspicious_processes():
-    config = _load_config()
-    blacklist = config.get("process_blacklist", ["xmrig", "miner", "hacktool"])
+def get_suspicious_processes(config=None):
+    """Return processes matching a signature or using excessive CPU.
 
-    suspicious = []
+    Processes flagged only for CPU use carry ``high_cpu``; signature hits
+    carry ``match``. The agent's own process is never reported.
 
-    for proc in psutil.process_iter(["pid", "name", "cpu_percent"]):
-        try:
-            pid = proc.info["pid"]
-            name = (proc.info["name"] or "").lower()
-            cpu = proc.info["cpu_percent"] or 0
+    Only processes that spawned or changed since the previous call are
+    re-examined; verdicts for unchanged processes are carried over.
+    """
+    global _config_version, _matcher
+    if config is None:
+        config = get_config()
 
-            if pid in CRITICAL_PIDS:
-                continue
+    with _lock:
+        diff = _tracker.update()
+        for tracked in diff.exited:
+            _signature_matches.pop(tracked.key, None)
+            _flagged.pop(tracked.key, None)
 
-            if any(bad in name for bad in blacklist):
-                suspicious.append(proc.info)
-            elif cpu > 80:
-                suspicious.append(proc.info)
+        if _config_version != config.version:
+            # Signatures may have changed: rebuild and re-examine everything
+            _config_version = config.version
+            _matcher = SignatureMatcher(config.process_signatures)
+            _signature_matches.clear()
+            candidates = _tracker.processes
+        else:
+            candidates = diff.spawned + diff.changed
 
-        except Exception:
-            continue
+        for tracked in candidates:
+            _examine(tracked)
 
-    return suspicious
+        return [_describe(tracked) for tracked in _flagged.values()]
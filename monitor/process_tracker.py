@@ -0,0 +1,126 @@
+from collections import namedtuple
+
+import psutil
+
+ProcessDiff = namedtuple("ProcessDiff", ["spawned", "exited", "changed"])
+
+
+class TrackedProcess:
+    """State kept for one live process between tracker updates."""
+
+    __slots__ = (
+        "key", "pid", "name", "proc", "cpu_percent", "rss",
+        "cpu_delta", "rss_delta", "_cpu_base", "_rss_base",
+    )
+
+    def __init__(self, proc, create_time, name):
+        self.key = (proc.pid, create_time)
+        self.pid = proc.pid
+        self.name = name
+        self.proc = proc
+        self.cpu_percent = 0.0
+        self.rss = 0
+        self.cpu_delta = 0.0
+        self.rss_delta = 0
+        self._cpu_base = 0.0
+        self._rss_base = 0
+
+    def info(self):
+        return {
+            "pid": self.pid,
+            "name": self.name,
+            "cpu_percent": self.cpu_percent,
+            "rss": self.rss,
+        }
+
+
+class ProcessTracker:
+    """Incrementally tracks the process table between cycles.
+
+    Processes are keyed by ``(pid, create_time)`` so a recycled pid is seen
+    as a new process. The ``psutil.Process`` objects are kept between
+    updates, which makes ``cpu_percent`` meaningful from the second sighting
+    onwards (a fresh object always reports 0.0 first).
+
+    A process is reported as *changed* when its CPU usage or RSS has drifted
+    from the value at its last report by more than ``cpu_tolerance``
+    percentage points or ``rss_tolerance`` (fraction), so slow drifts are
+    eventually reported as well.
+    """
+
+    def __init__(self, cpu_tolerance=2.0, rss_tolerance=0.1):
+        self.cpu_tolerance = cpu_tolerance
+        self.rss_tolerance = rss_tolerance
+        self._by_pid = {}
+
+    def __len__(self):
+        return len(self._by_pid)
+
+    @property
+    def processes(self):
+        return list(self._by_pid.values())
+
+    def _sample(self, tracked):
+        proc = tracked.proc
+        try:
+            with proc.oneshot():
+                cpu = proc.cpu_percent(interval=None) or 0.0
+                rss = proc.memory_info().rss
+        except psutil.AccessDenied:
+            # Keep tracking protected processes by name only
+            return
+        tracked.cpu_delta = cpu - tracked.cpu_percent
+        tracked.rss_delta = rss - tracked.rss
+        tracked.cpu_percent = cpu
+        tracked.rss = rss
+
+    def _drifted(self, tracked):
+        if abs(tracked.cpu_percent - tracked._cpu_base) >= self.cpu_tolerance:
+            return True
+        base = tracked._rss_base
+        return base > 0 and abs(tracked.rss - base) >= base * self.rss_tolerance
+
+    def _rebase(self, tracked):
+        tracked._cpu_base = tracked.cpu_percent
+        tracked._rss_base = tracked.rss
+
+    def update(self):
+        """Refresh the table and return a :class:`ProcessDiff`."""
+        spawned, exited, changed = [], [], []
+        current = set(psutil.pids())
+
+        for pid in list(self._by_pid):
+            tracked = self._by_pid[pid]
+            if pid in current:
+                try:
+                    # is_running() compares create_time, so a recycled pid
+                    # is reported as exited here and spawned below
+                    if tracked.proc.is_running():
+                        self._sample(tracked)
+                        if self._drifted(tracked):
+                            self._rebase(tracked)
+                            changed.append(tracked)
+                        continue
+                except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                    pass
+            del self._by_pid[pid]
+            exited.append(tracked)
+
+        for pid in current:
+            if pid in self._by_pid:
+                continue
+            try:
+                proc = psutil.Process(pid)
+                try:
+                    name = proc.name() or ""
+                except psutil.AccessDenied:
+                    name = ""
+                tracked = TrackedProcess(proc, proc.create_time(), name)
+                self._sample(tracked)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            self._rebase(tracked)
+            self._by_pid[pid] = tracked
+            spawned.append(tracked)
+
+        return ProcessDiff(spawned, exited, changed)
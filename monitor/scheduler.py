@@ -0,0 +1,145 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+
+class Collector:
+    """A named data source run by :class:`CollectorScheduler`.
+
+    Args:
+        name: Key under which the result is published.
+        func: Zero-argument callable returning the collected value.
+        interval: Minimum seconds between runs (0 = every cycle).
+        timeout: Seconds a cycle waits for this collector before using the
+            previous value instead.
+        default: Value published until the first successful run.
+    """
+
+    def __init__(self, name, func, interval=0.0, timeout=3.0, default=None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.timeout = timeout
+        self.default = default
+        self.value = default
+        self.next_due = 0.0
+        self.future = None
+        self.started = 0.0
+        self.last_duration = None
+        self.last_error = None
+        self.runs = 0
+        self.late = 0
+        self.errors = 0
+
+
+class CollectorScheduler:
+    """Runs collectors concurrently on a bounded thread pool.
+
+    A cycle submits every collector that is due, then waits for each one
+    until its own deadline. Collectors that miss their deadline keep running
+    in the background; the cycle publishes their previous value and picks up
+    the fresh result on a later cycle. Cycle latency is therefore bounded by
+    the slowest *on-time* collector rather than the sum of all of them.
+    """
+
+    def __init__(self, collectors, max_workers=4, clock=time.monotonic):
+        self._collectors = {c.name: c for c in collectors}
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="shcs-collector"
+        )
+        self.last_late = ()
+        self.last_errors = {}
+
+    def configure(self, settings):
+        """Apply per-collector ``interval``/``timeout`` overrides.
+
+        Args:
+            settings: mapping of collector name -> {"interval": s, "timeout": s}.
+        """
+        for name, opts in settings.items():
+            collector = self._collectors.get(name)
+            if collector is None or not hasattr(opts, "get"):
+                continue
+            collector.interval = opts.get("interval", collector.interval)
+            collector.timeout = opts.get("timeout", collector.timeout)
+
+    def _run(self, collector):
+        started = self._clock()
+        try:
+            return collector.func()
+        finally:
+            collector.last_duration = self._clock() - started
+
+    def _harvest(self, collector):
+        future = collector.future
+        collector.future = None
+        collector.runs += 1
+        error = future.exception()
+        if error is not None:
+            collector.errors += 1
+            collector.last_error = f"{type(error).__name__}: {error}"
+            return collector.last_error
+        collector.value = future.result()
+        collector.last_error = None
+        return None
+
+    def run_cycle(self):
+        """Run one collection cycle and return ``{name: value}``.
+
+        Sets :attr:`last_late` to the names of collectors that missed their
+        deadline and :attr:`last_errors` to ``{name: message}`` for those
+        that raised.
+        """
+        with self._lock:
+            now = self._clock()
+            errors = {}
+            waiting = []
+
+            for collector in self._collectors.values():
+                # Pick up results from collectors that were late last cycle
+                if collector.future is not None and collector.future.done():
+                    error = self._harvest(collector)
+                    if error:
+                        errors[collector.name] = error
+
+                if collector.future is None and now >= collector.next_due:
+                    collector.next_due = now + collector.interval
+                    collector.started = now
+                    collector.future = self._pool.submit(self._run, collector)
+                    waiting.append(collector)
+
+            late = []
+            for collector in sorted(waiting, key=lambda c: c.timeout):
+                remaining = collector.started + collector.timeout - self._clock()
+                try:
+                    collector.future.exception(timeout=max(0.0, remaining))
+                except FutureTimeoutError:
+                    collector.late += 1
+                    late.append(collector.name)
+                    continue
+                error = self._harvest(collector)
+                if error:
+                    errors[collector.name] = error
+
+            self.last_late = tuple(late)
+            self.last_errors = errors
+            return {name: c.value for name, c in self._collectors.items()}
+
+    def stats(self):
+        """Return per-collector run counters and last durations."""
+        return {
+            name: {
+                "runs": c.runs,
+                "late": c.late,
+                "errors": c.errors,
+                "running": c.future is not None,
+                "last_duration": c.last_duration,
+            }
+            for name, c in self._collectors.items()
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,101 @@
+from collections import deque
+
+FIELDS = ("name", "exe", "cmdline")
+_SEPARATOR = "\x00"
+
+
+class SignatureMatcher:
+    """Aho-Corasick automaton matching many substring signatures at once.
+
+    Every signature is tagged with the process fields it applies to
+    (``name``, ``exe`` or ``cmdline``). The fields of a process are joined
+    into one string and scanned in a single pass, so the cost is linear in
+    the length of the text regardless of how many signatures are loaded.
+    Matching is case-insensitive.
+
+    Args:
+        signatures: mapping of field name -> iterable of substrings.
+    """
+
+    def __init__(self, signatures):
+        # Trie as parallel lists: goto transitions, failure links, outputs
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self.patterns = []
+        seen = set()
+        for field in FIELDS:
+            for pattern in signatures.get(field, ()):
+                pattern = pattern.lower()
+                if not pattern or _SEPARATOR in pattern or (field, pattern) in seen:
+                    continue
+                seen.add((field, pattern))
+                self._insert(pattern, len(self.patterns))
+                self.patterns.append((field, pattern))
+        self.fields = frozenset(field for field, _ in self.patterns)
+        self._build()
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def _insert(self, pattern, index):
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._goto[node][ch] = nxt
+            node = nxt
+        self._out[node] = self._out[node] + (index,)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def match(self, name="", exe="", cmdline=""):
+        """Return the ``(field, pattern)`` signatures found, in pattern order.
+
+        Fields for which no signature is configured are skipped entirely.
+        """
+        if not self.patterns:
+            return []
+        parts = {"name": name or "", "exe": exe or "", "cmdline": cmdline or ""}
+        text_parts = []
+        bounds = []
+        offset = 0
+        for field in FIELDS:
+            value = parts[field].lower() if field in self.fields else ""
+            text_parts.append(value)
+            offset += len(value)
+            bounds.append(offset)
+            offset += 1
+        text = _SEPARATOR.join(text_parts)
+
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        node = 0
+        for pos, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                field_index = 0
+                while pos >= bounds[field_index]:
+                    field_index += 1
+                field = FIELDS[field_index]
+                for index in out[node]:
+                    if self.patterns[index][0] == field:
+                        found.add(index)
+        return [self.patterns[i] for i in sorted(found)]
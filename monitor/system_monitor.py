@@ -1,8 +1,143 @@
+import math
+import threading
+import time
+from collections import deque
+
 import psutil
 
-def get_system_metrics():
-    return {
-        "cpu": psutil.cpu_percent(interval=1),
-        "memory": psutil.virtual_memory().percent,
-        "disk": psutil.disk_usage('/').percent
-    }
+from utils.config import get_config
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+class SystemSampler:
+    """Samples CPU, per-core load and memory on a background thread.
+
+    Samples are kept in a fixed-size ring buffer so callers can read the
+    latest value and window statistics (mean / max / p95) without blocking,
+    and short spikes between agent cycles are still visible.
+
+    Args:
+        interval: Seconds between samples.
+        buffer_size: Number of samples kept in the ring buffer.
+    """
+
+    def __init__(self, interval=0.25, buffer_size=240):
+        self.interval = interval
+        self._samples = deque(maxlen=buffer_size)
+        self._stop = threading.Event()
+        self._thread = None
+        # Prime psutil's internal counters; the first non-blocking reading
+        # is always 0.0 and is discarded.
+        psutil.cpu_percent(interval=None)
+        psutil.cpu_percent(interval=None, percpu=True)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="shcs-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 4)
+        self._thread = None
+
+    def resize(self, buffer_size):
+        if buffer_size != self._samples.maxlen:
+            self._samples = deque(self._samples, maxlen=buffer_size)
+
+    def sample_once(self):
+        """Take one non-blocking sample and append it to the ring buffer."""
+        sample = (
+            time.monotonic(),
+            psutil.cpu_percent(interval=None),
+            psutil.virtual_memory().percent,
+            tuple(psutil.cpu_percent(interval=None, percpu=True)),
+        )
+        self._samples.append(sample)
+        return sample
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample_once()
+            except Exception:
+                continue
+
+    def stats(self, window=None):
+        """Return CPU/memory statistics over the last *window* seconds.
+
+        Args:
+            window: Seconds to aggregate over; ``None`` uses the whole buffer.
+
+        Returns:
+            dict with cpu (mean), cpu_latest, cpu_max, cpu_p95, memory
+            (latest), memory_max, per_core (latest) and samples, or an empty
+            dict if nothing has been sampled yet.
+        """
+        samples = list(self._samples)
+        if window is not None and samples:
+            cutoff = samples[-1][0] - window
+            samples = [s for s in samples if s[0] >= cutoff]
+        if not samples:
+            return {}
+
+        cpu = sorted(s[1] for s in samples)
+        latest = samples[-1]
+        return {
+            "cpu": sum(cpu) / len(cpu),
+            "cpu_latest": latest[1],
+            "cpu_max": cpu[-1],
+            "cpu_p95": _percentile(cpu, 95),
+            "memory": latest[2],
+            "memory_max": max(s[2] for s in samples),
+            "per_core": list(latest[3]),
+            "samples": len(samples),
+        }
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler(config=None):
+    """Return the shared background sampler, starting it on first use."""
+    global _sampler
+    if config is None:
+        config = get_config()
+    opts = config.sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = SystemSampler(opts["interval_seconds"], int(opts["buffer_size"]))
+        else:
+            _sampler.interval = opts["interval_seconds"]
+            _sampler.resize(int(opts["buffer_size"]))
+        _sampler.start()
+    return _sampler
+
+
+def get_system_metrics(config=None):
+    """Return CPU and memory statistics over the configured sample window.
+
+    Never blocks: values come from the background sampler's ring buffer.
+    """
+    if config is None:
+        config = get_config()
+    sampler = get_sampler(config)
+    metrics = sampler.stats(config.sampler["window_seconds"])
+    if not metrics:
+        # Sampler has just started; a CPU reading taken this soon after
+        # priming would be meaningless, so report memory only.
+        metrics = {"memory": psutil.virtual_memory().percent, "samples": 0}
+    return metrics
@@ -1,3 +1,11 @@
+import threading
+import time
+
+from monitor.intel_feed import IntelFeed
+from utils.config import get_config
+from utils.ip_index import IPClassifier, prefix_to_cidr
+from utils.verdict_cache import VerdictCache
+
 # Known malicious / high-risk ports (common RAT, C2, and malware ports)
 KNOWN_MALICIOUS_PORTS = {4444, 5555, 6666, 1337, 31337, 8443, 9001}
 
@@ -15,30 +23,106 @@ TOR_EXIT_NODE_PREFIXES = {
     "185.130.44.",
 }
 
+# Built-in Tor ranges; more can be added under ip_ranges.tor in config.json
+_tor_index = IPClassifier({"tor": [prefix_to_cidr(p) for p in TOR_EXIT_NODE_PREFIXES]})
 
-def check_connection_threat(ip, port):
-    """Return the threat level for a given remote IP and port.
+_feed = None
+_feed_lock = threading.Lock()
+_last_refresh = 0.0
+_verdicts = VerdictCache()
+
+
+def get_feed(config=None):
+    """Return the memory-mapped IOC feed configured in threat_intel.feed_path."""
+    global _feed
+    if config is None:
+        config = get_config()
+    path = config.threat_intel["feed_path"]
+    feed = _feed
+    if feed is None or feed.path != path:
+        with _feed_lock:
+            if _feed is None or _feed.path != path:
+                if _feed is not None:
+                    _feed.close()
+                _feed = IntelFeed(path)
+            feed = _feed
+    return feed
+
+
+def refresh_feeds(config=None, force=False):
+    """Reload the IOC feed if it changed on disk.
+
+    Checks the file at most once every threat_intel.refresh_seconds.
 
     Returns:
-        None   — no threat detected
-        'LOW'  — mildly suspicious (unusual inbound port)
-        'MEDIUM' — suspicious (Tor exit node)
-        'HIGH'   — known malicious port
+        True if a new feed version was loaded.
     """
-    if ip is None:
-        return None
+    global _last_refresh
+    if config is None:
+        config = get_config()
+    now = time.monotonic()
+    if not force and now - _last_refresh < config.threat_intel["refresh_seconds"]:
+        return False
+    _last_refresh = now
+    return get_feed(config).refresh()
+
+
+def get_feed_stats(config=None):
+    """Return lookup counters of the IOC feed and its Bloom pre-filter."""
+    return get_feed(config).stats()
+
+
+def get_verdict_stats():
+    """Return hit / miss counters of the connection verdict cache."""
+    return _verdicts.stats()
 
+
+def is_tor_exit_node(ip, config=None):
+    if config is None:
+        config = get_config()
+    return _tor_index.has(ip, "tor") or config.ip_classifier.has(ip, "tor")
+
+
+def _evaluate(ip, port, config, feed):
     # Check for known malicious port first (highest priority)
     if port in KNOWN_MALICIOUS_PORTS:
         return "HIGH"
 
+    # Check the compiled IOC feed
+    if feed.contains(ip):
+        return "HIGH"
+
     # Check for Tor exit node
-    for prefix in TOR_EXIT_NODE_PREFIXES:
-        if ip.startswith(prefix):
-            return "MEDIUM"
+    if is_tor_exit_node(ip, config):
+        return "MEDIUM"
 
     # Check for unexpectedly exposed management/service ports
     if port in SUSPICIOUS_PORTS:
         return "LOW"
 
     return None
+
+
+def check_connection_threat(ip, port, config=None):
+    """Return the threat level for a given remote IP and port.
+
+    Verdicts are cached per (ip, port) until the config or the IOC feed
+    changes, so long-lived connections are evaluated once.
+
+    Returns:
+        None   — no threat detected
+        'LOW'  — mildly suspicious (unusual inbound port)
+        'MEDIUM' — suspicious (Tor exit node)
+        'HIGH'   — known malicious port or IP listed in the IOC feed
+    """
+    if ip is None:
+        return None
+    if config is None:
+        config = get_config()
+    feed = get_feed(config)
+    settings = config.threat_intel
+    if (_verdicts.maxsize, _verdicts.ttl) != (settings["verdict_cache_size"], settings["verdict_ttl_seconds"]):
+        _verdicts.configure(settings["verdict_cache_size"], settings["verdict_ttl_seconds"])
+    return _verdicts.get_or_compute(
+        (ip, port), (config, feed.path, feed.version), lambda: _evaluate(ip, port, config, feed)
+    )
@@ -10,9 +10,14 @@ class TrafficMonitor:
         self._last = psutil.net_io_counters()
         self._last_time = time.time()
 
-    def get_traffic_delta(self):
+    def get_traffic_delta(self, snapshot=None):
         """Return per-second network traffic metrics since the last call.
 
+        Args:
+            snapshot: optional ConnectionSnapshot for this cycle; its size is
+                reported as total_connections instead of enumerating the
+                connection table again.
+
         Returns:
             dict with bytes_sent_per_sec, bytes_recv_per_sec,
             packets_sent_per_sec, packets_recv_per_sec, total_connections.
@@ -31,10 +36,13 @@ class TrafficMonitor:
         self._last = current
         self._last_time = now
 
-        try:
-            total_connections = len(psutil.net_connections())
-        except Exception:
-            total_connections = 0
+        if snapshot is not None:
+            total_connections = len(snapshot)
+        else:
+            try:
+                total_connections = len(psutil.net_connections())
+            except Exception:
+                total_connections = 0
 
         return {
             "bytes_sent_per_sec": max(0.0, bytes_sent_per_sec),
@@ -0,0 +1,199 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class BlockExecutor:
+    """Applies IP blocks on a background thread in coalesced batches.
+
+    :meth:`submit` only records the address and returns immediately. The
+    worker waits up to *window* seconds after the first pending address so a
+    burst (port scan, botnet) collects into one batch, then hands up to
+    *batch_size* addresses at once to *apply*. Unblock requests are batched
+    the same way and handed to *remove*. Failed batches are retried with
+    exponential backoff.
+
+    Args:
+        apply: callable ``apply(ips, timeout)`` that blocks a list of
+            addresses; raising marks the attempt as failed.
+        window: seconds to wait for more addresses before applying a batch.
+        batch_size: maximum addresses per *apply* call.
+        timeout: seconds passed to *apply* for each attempt.
+        retries: extra attempts after a failure.
+        backoff: seconds before the first retry; doubled on each retry.
+        remove: optional callable ``remove(ips, timeout)`` that unblocks a
+            list of addresses.
+        on_result: optional ``on_result(ips, error)`` called after each block
+            batch, with *error* None on success.
+        on_unblock: like *on_result*, for unblock batches.
+        clock: monotonic time source.
+    """
+
+    def __init__(self, apply, window=0.5, batch_size=100, timeout=10.0, retries=3,
+                 backoff=1.0, remove=None, on_result=None, on_unblock=None, clock=time.monotonic):
+        self.apply = apply
+        self.remove = remove
+        self.window = window
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.on_result = on_result
+        self.on_unblock = on_unblock
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._pending = OrderedDict()
+        self._in_flight = 0
+        self._flushing = False
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {
+            "submitted": 0, "batches": 0, "blocked": 0, "unblocked": 0, "failed": 0, "retries": 0,
+            "last_latency": None, "max_latency": 0.0, "total_latency": 0.0,
+        }
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="shcs-block-executor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """Apply whatever is still queued, then stop the worker."""
+        self.flush(timeout)
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def submit(self, ip, unblock=False):
+        """Queue *ip* for blocking (or unblocking).
+
+        A request replaces a still-queued opposite request for the same
+        address. Returns False if the same request is already queued.
+        """
+        with self._cond:
+            queued = self._pending.get(ip)
+            if queued is not None:
+                if queued[1] == unblock:
+                    return False
+                del self._pending[ip]
+            self._pending[ip] = (self._clock(), unblock)
+            self._stats["submitted"] += 1
+            self._cond.notify_all()
+        return True
+
+    def flush(self, timeout=None):
+        """Wait until every queued address has been applied (or has failed).
+
+        Returns:
+            True if the queue drained within *timeout* seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            # Skip the coalescing window for what is already queued
+            self._flushing = True
+            self._cond.notify_all()
+            try:
+                while self._pending or self._in_flight:
+                    if not self.running:
+                        return False
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining if remaining is not None else 0.1)
+                return True
+            finally:
+                self._flushing = False
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending:
+                if self._stop.is_set():
+                    return None
+                self._cond.wait()
+            first = next(iter(self._pending.values()))[0]
+            while len(self._pending) < self.batch_size and not self._flushing and not self._stop.is_set():
+                remaining = first + self.window - self._clock()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            # One batch holds requests of a single kind, in queue order
+            unblock = next(iter(self._pending.values()))[1]
+            batch = []
+            for ip, (queued_at, kind) in self._pending.items():
+                if kind == unblock:
+                    batch.append((ip, queued_at))
+                    if len(batch) >= self.batch_size:
+                        break
+            for ip, _ in batch:
+                del self._pending[ip]
+            self._in_flight = len(batch)
+            return batch, unblock
+
+    def _apply_batch(self, func, ips):
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self._stats["retries"] += 1
+                if self._stop.wait(self.backoff * 2 ** (attempt - 1)):
+                    break
+            try:
+                func(ips, self.timeout)
+                return None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        return error
+
+    def _loop(self):
+        while True:
+            item = self._next_batch()
+            if item is None:
+                return
+            batch, unblock = item
+            ips = [ip for ip, _ in batch]
+            if unblock:
+                error = self._apply_batch(self.remove, ips) if self.remove is not None else None
+                callback = self.on_unblock
+            else:
+                error = self._apply_batch(self.apply, ips)
+                callback = self.on_result
+            now = self._clock()
+            stats = self._stats
+            stats["batches"] += 1
+            if error is None and unblock:
+                stats["unblocked"] += len(ips)
+            elif error is None:
+                stats["blocked"] += len(ips)
+                for _, queued_at in batch:
+                    latency = now - queued_at
+                    stats["total_latency"] += latency
+                    stats["max_latency"] = max(stats["max_latency"], latency)
+                stats["last_latency"] = now - batch[0][1]
+            else:
+                stats["failed"] += len(ips)
+            if callback is not None:
+                try:
+                    callback(ips, error)
+                except Exception:
+                    pass
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def stats(self):
+        """Return queue depth, batch counters and enqueue-to-applied latency."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats["queue_depth"] = len(self._pending)
+            stats["in_flight"] = self._in_flight
+        total = stats.pop("total_latency")
+        stats["mean_latency"] = total / stats["blocked"] if stats["blocked"] else None
+        return stats
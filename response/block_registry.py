@@ -0,0 +1,273 @@
+import heapq
+import ipaddress
+import itertools
+import os
+import struct
+import time
+
+from utils.config import SEVERITY_ORDER
+
+MAGIC = b"SHCSBLK1"
+_HEADER = struct.Struct("<8sI")
+# family, packed address (v4 left-aligned), severity rank, created, expires
+_RECORD = struct.Struct("<B16sBdd")
+_RANK = {s: i for i, s in enumerate(SEVERITY_ORDER)}
+
+
+def _is_address(text):
+    try:
+        ipaddress.ip_address(text)
+    except ValueError:
+        return False
+    return True
+
+
+class TimerWheel:
+    """Hashed timing wheel for coarse expiry deadlines.
+
+    Keys are dropped into the slot of their deadline tick; advancing the
+    clock visits only the slots between the previous and the current tick,
+    so the cost of a sweep is proportional to elapsed time plus the keys
+    found there, not to the number of scheduled keys. A slot may hold keys
+    due in a later revolution; callers re-check and reschedule them.
+
+    Args:
+        resolution: seconds per tick.
+        slots: number of slots in the wheel.
+        now: current time, used as the starting tick.
+    """
+
+    def __init__(self, resolution=1.0, slots=4096, now=0.0):
+        self.resolution = resolution
+        self._slots = [set() for _ in range(slots)]
+        self._tick = int(now // resolution)
+
+    def schedule(self, key, when):
+        tick = max(int(when // self.resolution), self._tick + 1)
+        self._slots[tick % len(self._slots)].add(key)
+
+    def advance(self, now):
+        """Move to *now* and return the keys from every slot passed over."""
+        target = int(now // self.resolution)
+        if target <= self._tick:
+            return []
+        count = len(self._slots)
+        ticks = range(self._tick + 1, target + 1) if target - self._tick < count else range(count)
+        self._tick = target
+        due = []
+        for tick in ticks:
+            index = tick % count
+            slot = self._slots[index]
+            if slot:
+                self._slots[index] = set()
+                due.extend(slot)
+        return due
+
+    def clear(self):
+        for slot in self._slots:
+            slot.clear()
+
+
+class BlockEntry:
+    __slots__ = ("ip", "rank", "created", "expires")
+
+    def __init__(self, ip, rank, created, expires):
+        self.ip = ip
+        self.rank = rank
+        self.created = created
+        self.expires = expires
+
+    @property
+    def severity(self):
+        return SEVERITY_ORDER[self.rank]
+
+
+class BlockRegistry:
+    """Bounded set of blocked addresses with per-entry expiry.
+
+    Every entry carries the severity of the threat that caused the block
+    and an expiry time (wall clock, so it survives restarts). When
+    *max_entries* is reached the least severe entry is evicted, oldest
+    first among equals. Expiry is driven by a :class:`TimerWheel`; the
+    registry round-trips through a compact fixed-size binary file.
+
+    Args:
+        max_entries: hard cap on the number of blocked addresses.
+        default_ttl: seconds a block lasts when :meth:`add` gets no *ttl*.
+        clock: wall-clock time source.
+    """
+
+    def __init__(self, max_entries=10000, default_ttl=86400.0, clock=time.time):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._entries = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._wheel = TimerWheel(now=clock())
+        self.dirty = False
+
+    def __contains__(self, ip):
+        return ip in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def get(self, ip):
+        return self._entries.get(ip)
+
+    def clear(self):
+        self._entries.clear()
+        self._heap.clear()
+        self._wheel.clear()
+        self.dirty = True
+
+    def _insert(self, entry):
+        self._entries[entry.ip] = entry
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            # Drop stale heap items left by removals and refreshes
+            self._heap = [item for item in self._heap if self._entries.get(item[3].ip) is item[3]]
+            heapq.heapify(self._heap)
+        heapq.heappush(self._heap, (entry.rank, entry.created, next(self._seq), entry))
+        if entry.expires:
+            self._wheel.schedule(entry.ip, entry.expires)
+
+    def add(self, ip, severity="MEDIUM", ttl=None):
+        """Block *ip*, or refresh its expiry / raise its severity if present.
+
+        Returns:
+            list of addresses evicted to respect :attr:`max_entries`; contains
+            *ip* itself if it ranked below everything already blocked.
+        """
+        now = self._clock()
+        ttl = self.default_ttl if ttl is None else ttl
+        expires = now + ttl if ttl else 0.0
+        rank = _RANK.get(severity, _RANK["MEDIUM"])
+        entry = self._entries.get(ip)
+        if entry is not None:
+            rank = max(rank, entry.rank)
+            expires = max(expires, entry.expires) if expires and entry.expires else 0.0
+            if (rank, expires) != (entry.rank, entry.expires):
+                self._insert(BlockEntry(ip, rank, entry.created, expires))
+                self.dirty = True
+            return []
+        self._insert(BlockEntry(ip, rank, now, expires))
+        self.dirty = True
+        return self._evict()
+
+    def _evict(self):
+        evicted = []
+        while len(self._entries) > self.max_entries and self._heap:
+            _, _, _, entry = heapq.heappop(self._heap)
+            if self._entries.get(entry.ip) is entry:
+                del self._entries[entry.ip]
+                evicted.append(entry.ip)
+        return evicted
+
+    def remove(self, ip):
+        if self._entries.pop(ip, None) is None:
+            return False
+        self.dirty = True
+        return True
+
+    def expire(self, now=None):
+        """Remove and return every address whose block has expired."""
+        now = self._clock() if now is None else now
+        expired = []
+        for ip in self._wheel.advance(now):
+            entry = self._entries.get(ip)
+            if entry is None or not entry.expires:
+                continue
+            if entry.expires <= now:
+                del self._entries[ip]
+                expired.append(ip)
+            else:
+                self._wheel.schedule(ip, entry.expires)
+        if expired:
+            self.dirty = True
+        return expired
+
+    def reconcile(self, firewall_addresses, severity="LOW"):
+        """Align the registry with what the firewall actually blocks.
+
+        Single addresses blocked in the firewall but unknown here are
+        adopted with the default TTL so they expire like any other block;
+        ranges are left alone.
+
+        Returns:
+            ``(adopted, missing, evicted)`` — addresses adopted from the
+            firewall, registry entries the firewall no longer blocks, and
+            entries evicted to make room for the adopted ones.
+        """
+        firewall_addresses = set(firewall_addresses)
+        adopted = []
+        evicted = []
+        for ip in firewall_addresses:
+            if ip in self._entries or not _is_address(ip):
+                continue
+            adopted.append(ip)
+            evicted.extend(self.add(ip, severity))
+        missing = [ip for ip in self._entries if ip not in firewall_addresses]
+        return adopted, missing, evicted
+
+    def save(self, path):
+        """Write the registry to *path* (temp file + rename)."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        records = []
+        for entry in self._entries.values():
+            addr = ipaddress.ip_address(entry.ip)
+            records.append(_RECORD.pack(addr.version, addr.packed, entry.rank, entry.created, entry.expires))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, len(records)))
+            f.write(b"".join(records))
+        os.replace(tmp_path, path)
+        self.dirty = False
+
+    def load(self, path):
+        """Replace the contents with the entries saved at *path*.
+
+        Entries that expired while the agent was not running (or no longer
+        fit under :attr:`max_entries`) are dropped and returned so their
+        firewall blocks can be removed.
+
+        Returns:
+            list of dropped addresses; ``[]`` if *path* does not exist.
+        """
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        if len(data) < _HEADER.size:
+            raise ValueError(f"{path} is not a block registry")
+        magic, count = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or len(data) < _HEADER.size + count * _RECORD.size:
+            raise ValueError(f"{path} is not a block registry")
+        # Validate every record before touching the current contents
+        records = []
+        for family, packed, rank, created, expires in _RECORD.iter_unpack(
+            data[_HEADER.size:_HEADER.size + count * _RECORD.size]
+        ):
+            if family not in (4, 6) or rank >= len(SEVERITY_ORDER):
+                raise ValueError(f"{path} has a corrupt block record")
+            ip = str(ipaddress.ip_address(packed[:4] if family == 4 else packed))
+            records.append((ip, rank, created, expires))
+
+        now = self._clock()
+        self._entries.clear()
+        self._heap.clear()
+        self._wheel.clear()
+        expired = []
+        for ip, rank, created, expires in records:
+            if expires and expires <= now:
+                expired.append(ip)
+                continue
+            self._insert(BlockEntry(ip, rank, created, expires))
+        # The cap may have been lowered since the file was written
+        expired.extend(self._evict())
+        self.dirty = bool(expired)
+        return expired
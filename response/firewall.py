@@ -0,0 +1,362 @@
+import subprocess
+
+from utils.ip_index import parse_ip
+
+RULE_PREFIX = "SHCS_Block_"
+
+
+def run_command(args, timeout, input=None):
+    """Default command runner: run *args*, raise on failure, return stdout."""
+    result = subprocess.run(
+        list(args), capture_output=True, text=True, timeout=timeout, check=True, input=input,
+    )
+    return result.stdout
+
+
+class FirewallBackend:
+    """Set of blocked addresses mirrored into the host firewall.
+
+    Membership is tracked in memory, so :meth:`contains` never touches the
+    firewall. :meth:`add_many` / :meth:`remove_many` take whole batches and
+    apply them with as few firewall commands as the backend allows; both
+    ignore addresses that are already in the wanted state.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._addresses = set()
+
+    def __len__(self):
+        return len(self._addresses)
+
+    def contains(self, ip):
+        return ip in self._addresses
+
+    def addresses(self):
+        return frozenset(self._addresses)
+
+    def add_many(self, ips, timeout=None):
+        """Block every address in *ips*; returns the ones newly added."""
+        new = [ip for ip in dict.fromkeys(ips) if ip not in self._addresses]
+        if new:
+            self._apply(new, [], timeout)
+            self._addresses.update(new)
+        return new
+
+    def remove_many(self, ips, timeout=None):
+        """Unblock every address in *ips*; returns the ones removed."""
+        gone = [ip for ip in dict.fromkeys(ips) if ip in self._addresses]
+        if gone:
+            self._apply([], gone, timeout)
+            self._addresses.difference_update(gone)
+        return gone
+
+    def load(self, timeout=None):
+        """Replace the in-memory set with what the firewall currently holds."""
+        self._addresses = set(self._query(timeout))
+        return self.addresses()
+
+    def _apply(self, added, removed, timeout):
+        raise NotImplementedError
+
+    def _query(self, timeout):
+        return self._addresses
+
+
+class MemoryBackend(FirewallBackend):
+    """In-memory backend for tests and dry runs; records every batch."""
+
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def _apply(self, added, removed, timeout):
+        self.batches.append((tuple(added), tuple(removed)))
+
+
+def _normalize_address(text):
+    """Strip the /32, /128 or dotted-mask suffix netsh prints on single hosts."""
+    addr, _, mask = text.strip().partition("/")
+    if mask in ("", "32", "128", "255.255.255.255"):
+        return addr
+    return text.strip()
+
+
+def parse_netsh_rules(output, prefix=RULE_PREFIX):
+    """Parse ``netsh advfirewall firewall show rule`` output.
+
+    Returns:
+        dict of rule name -> list of remote addresses, for rules whose name
+        starts with *prefix*.
+    """
+    rules = {}
+    current = None
+    for line in output.splitlines():
+        key, sep, value = line.partition(":")
+        if not sep:
+            continue
+        key = key.strip().lower()
+        value = value.strip()
+        if key == "rule name":
+            current = value if value.startswith(prefix) else None
+            if current is not None:
+                rules.setdefault(current, [])
+        elif key == "remoteip" and current is not None and value.lower() != "any":
+            rules[current].extend(_normalize_address(v) for v in value.split(",") if v.strip())
+    return rules
+
+
+# Windows caps a whole command line at 32767 characters; keep each
+# remoteip= list well below that so 1000 IPv6 addresses are split up
+MAX_REMOTEIP_CHARS = 30_000
+
+
+def _joined_length(addresses):
+    """Length of ``",".join(addresses)`` plus one (counts one comma per address)."""
+    return sum(len(ip) + 1 for ip in addresses)
+
+
+class NetshSetBackend(FirewallBackend):
+    """Windows Firewall backend that keeps addresses in a few managed rules.
+
+    Instead of one rule per address, addresses are packed into rules named
+    ``SHCS_Block_set_<n>`` holding up to *rule_size* addresses each (fewer
+    if their ``remoteip`` list would exceed *max_remoteip_chars*). A batch
+    only rewrites the ``remoteip`` list of the rules it touched, so the
+    firewall's rule table stays small however many addresses are blocked.
+    Other ``SHCS_Block_*`` rules (one rule per address, from older agents)
+    are picked up by :meth:`load`; addresses are removed from them but new
+    ones always go to the managed rules.
+
+    Args:
+        runner: ``runner(args, timeout)`` command runner.
+        rule_size: maximum addresses per managed rule.
+        max_remoteip_chars: maximum length of a rule's ``remoteip`` list.
+    """
+
+    name = "netsh"
+    _SET_PREFIX = f"{RULE_PREFIX}set_"
+
+    def __init__(self, runner=run_command, rule_size=1000, max_remoteip_chars=MAX_REMOTEIP_CHARS):
+        super().__init__()
+        self.runner = runner
+        self.rule_size = rule_size
+        self.max_remoteip_chars = max_remoteip_chars
+        self._rules = {}          # rule name -> set of addresses
+        self._rule_of = {}        # address -> rule name
+        self._existing = set()    # rule names present in the firewall
+        self._managed = 0         # number of SHCS_Block_set_<n> slots in use
+
+    def _free_rule(self, pending, chars, managed, ip):
+        """Pick the managed rule for *ip*; returns ``(name, managed)``."""
+        def fits(name):
+            if name not in pending:
+                return len(self._rules.get(name, ())) < self.rule_size and (
+                    _joined_length(self._rules.get(name, ())) + len(ip) + 1 <= self.max_remoteip_chars
+                )
+            return len(pending[name]) < self.rule_size and chars[name] + len(ip) + 1 <= self.max_remoteip_chars
+
+        for name in sorted(pending):
+            if name.startswith(self._SET_PREFIX) and fits(name):
+                return name, managed
+        for index in range(managed):
+            name = f"{self._SET_PREFIX}{index}"
+            if fits(name):
+                return name, managed
+        return f"{self._SET_PREFIX}{managed}", managed + 1
+
+    def _apply(self, added, removed, timeout):
+        # New contents of the touched rules are built on copies and only
+        # committed once every netsh command succeeded, so a failed batch
+        # leaves the in-memory state as it was and can simply be retried.
+        pending = {}
+        chars = {}   # rule name -> length of its joined remoteip list (+1 per address)
+        managed = self._managed
+
+        def contents(name):
+            if name not in pending:
+                pending[name] = set(self._rules.get(name, ()))
+                chars[name] = _joined_length(pending[name])
+            return pending[name]
+
+        for ip in removed:
+            name = self._rule_of.get(ip)
+            if name is not None and ip in contents(name):
+                pending[name].discard(ip)
+                chars[name] -= len(ip) + 1
+        placed = {}
+        for ip in added:
+            name, managed = self._free_rule(pending, chars, managed, ip)
+            contents(name).add(ip)
+            chars[name] += len(ip) + 1
+            placed[ip] = name
+        for name in sorted(pending):
+            self._write_rule(name, pending[name], timeout)
+
+        self._rules.update(pending)
+        for ip in removed:
+            self._rule_of.pop(ip, None)
+        self._rule_of.update(placed)
+        self._managed = managed
+
+    def _write_rule(self, name, addresses, timeout):
+        addresses = ",".join(sorted(addresses))
+        if not addresses:
+            if name in self._existing:
+                self.runner(["netsh", "advfirewall", "firewall", "delete", "rule", f"name={name}"], timeout)
+                self._existing.discard(name)
+        elif name in self._existing:
+            self.runner(
+                ["netsh", "advfirewall", "firewall", "set", "rule", f"name={name}",
+                 "new", f"remoteip={addresses}"],
+                timeout,
+            )
+        else:
+            self.runner(
+                ["netsh", "advfirewall", "firewall", "add", "rule", f"name={name}",
+                 "dir=in", "action=block", f"remoteip={addresses}"],
+                timeout,
+            )
+            self._existing.add(name)
+
+    def load(self, timeout=None):
+        """Read every ``SHCS_Block_*`` rule with one ``show rule`` query."""
+        rules = parse_netsh_rules(
+            self.runner(["netsh", "advfirewall", "firewall", "show", "rule", "name=all", "dir=in"], timeout)
+        )
+        self._rules, self._rule_of, self._existing, self._managed = {}, {}, set(), 0
+        for name, addresses in rules.items():
+            self._rules[name] = set(addresses)
+            self._existing.add(name)
+            for ip in addresses:
+                self._rule_of.setdefault(ip, name)
+            suffix = name[len(self._SET_PREFIX):]
+            if name.startswith(self._SET_PREFIX) and suffix.isdigit():
+                self._managed = max(self._managed, int(suffix) + 1)
+        self._addresses = set(self._rule_of)
+        return self.addresses()
+
+
+def _split_families(ips):
+    v4, v6 = [], []
+    for ip in ips:
+        parsed = parse_ip(ip)
+        (v6 if parsed is not None and parsed[0] == 6 else v4).append(ip)
+    return v4, v6
+
+
+class NftablesBackend(FirewallBackend):
+    """Linux nftables backend using one named set per address family.
+
+    Creates ``table inet shcs`` with sets ``blocklist4`` / ``blocklist6`` and
+    an input-hook chain dropping their members; each batch is a single
+    ``nft add element`` / ``nft delete element`` per family.
+    """
+
+    name = "nftables"
+
+    def __init__(self, runner=run_command, table="shcs"):
+        super().__init__()
+        self.runner = runner
+        self.table = table
+        self._ready = False
+
+    def _setup(self, timeout):
+        if self._ready:
+            return
+        t = self.table
+        script = (
+            f"add table inet {t}\n"
+            f"add set inet {t} blocklist4 {{ type ipv4_addr; }}\n"
+            f"add set inet {t} blocklist6 {{ type ipv6_addr; }}\n"
+            f"add chain inet {t} input {{ type filter hook input priority 0; }}\n"
+            f"flush chain inet {t} input\n"
+            f"add rule inet {t} input ip saddr @blocklist4 drop\n"
+            f"add rule inet {t} input ip6 saddr @blocklist6 drop\n"
+        )
+        self.runner(["nft", "-f", "-"], timeout, input=script)
+        self._ready = True
+
+    def _apply(self, added, removed, timeout):
+        self._setup(timeout)
+        for verb, ips in (("add", added), ("delete", removed)):
+            for set_name, family in zip(("blocklist4", "blocklist6"), _split_families(ips)):
+                if family:
+                    self.runner(
+                        ["nft", verb, "element", "inet", self.table, set_name,
+                         "{ " + ", ".join(family) + " }"],
+                        timeout,
+                    )
+
+    def _query(self, timeout):
+        self._setup(timeout)
+        addresses = []
+        for set_name in ("blocklist4", "blocklist6"):
+            output = self.runner(["nft", "list", "set", "inet", self.table, set_name], timeout)
+            _, _, body = output.partition("elements = {")
+            body = body.partition("}")[0]
+            addresses.extend(e.strip() for e in body.split(",") if e.strip())
+        return addresses
+
+
+class IpsetBackend(FirewallBackend):
+    """Linux ipset backend; each batch is one ``ipset restore`` call.
+
+    Expects iptables rules referencing the ``shcs_block4`` / ``shcs_block6``
+    sets (``-m set --match-set shcs_block4 src -j DROP``); the sets
+    themselves are created on first use.
+    """
+
+    name = "ipset"
+
+    def __init__(self, runner=run_command, set_name="shcs_block"):
+        super().__init__()
+        self.runner = runner
+        self.set_name = set_name
+        self._ready = False
+
+    def _setup(self, timeout):
+        if self._ready:
+            return
+        script = (
+            f"create {self.set_name}4 hash:ip family inet -exist\n"
+            f"create {self.set_name}6 hash:ip family inet6 -exist\n"
+        )
+        self.runner(["ipset", "restore"], timeout, input=script)
+        self._ready = True
+
+    def _apply(self, added, removed, timeout):
+        self._setup(timeout)
+        lines = []
+        for verb, ips in (("add", added), ("del", removed)):
+            for suffix, family in zip("46", _split_families(ips)):
+                lines.extend(f"{verb} {self.set_name}{suffix} {ip} -exist" for ip in family)
+        self.runner(["ipset", "restore"], timeout, input="\n".join(lines) + "\n")
+
+    def _query(self, timeout):
+        self._setup(timeout)
+        addresses = []
+        for suffix in "46":
+            output = self.runner(["ipset", "list", f"{self.set_name}{suffix}"], timeout)
+            _, _, members = output.partition("Members:")
+            addresses.extend(line.strip() for line in members.splitlines() if line.strip())
+        return addresses
+
+
+BACKENDS = {
+    "netsh": NetshSetBackend,
+    "nftables": NftablesBackend,
+    "ipset": IpsetBackend,
+    "memory": MemoryBackend,
+}
+
+
+def create_backend(name, runner=run_command):
+    """Instantiate the backend registered as *name*."""
+    cls = BACKENDS[name]
+    if cls is MemoryBackend:
+        return cls()
+    return cls(runner=runner)
@@ -1,11 +1,246 @@
 import subprocess
+import threading
+import time
+
+from response.block_executor import BlockExecutor
+from response.block_registry import BlockRegistry
+from response.firewall import create_backend
+from utils.config import get_config
+from utils.events import emit_event
 from utils.logger import log_event
 
 CRITICAL_PIDS = {0, 4}
-SAFE_IPS = {"127.0.0.1", "::1"}
 
-# Memory of already blocked IPs (runtime)
-BLOCKED_IPS = set()
+# Blocked (or queued) IPs with expiry and a size cap; persisted once
+# reconcile_blocks() has attached it to response.block_registry_path
+BLOCKED_IPS = BlockRegistry()
+
+_SAVE_INTERVAL = 30
+
+# Seconds a netsh repair command (DNS reset, firewall enable) may run
+_REPAIR_TIMEOUT = 15
+
+_executor = None
+_backend = None
+_executor_lock = threading.RLock()
+_registry_path = None
+_last_save = 0.0
+
+
+def get_firewall_backend(config=None):
+    """Return the shared firewall backend selected by response.firewall_backend."""
+    global _backend
+    if config is None:
+        config = get_config()
+    name = config.response["firewall_backend"]
+    with _executor_lock:
+        if _backend is None or _backend.name != name:
+            _backend = create_backend(name)
+        return _backend
+
+
+def _apply_blocks(ips, timeout):
+    get_firewall_backend().add_many(ips, timeout)
+
+
+def _remove_blocks(ips, timeout):
+    get_firewall_backend().remove_many(ips, timeout)
+
+
+def _on_block_result(ips, error):
+    if error is None:
+        log_event(f"Blocked IP {', '.join(ips)}")
+        emit_event("heal", action="block", ips=ips)
+        return
+    # Forget failed addresses so a later detection queues them again
+    with _executor_lock:
+        for ip in ips:
+            BLOCKED_IPS.remove(ip)
+    log_event(f"Failed to block {len(ips)} IP(s) {', '.join(ips)}: {error}")
+    emit_event("heal", action="block_failed", ips=ips, error=error)
+
+
+def _on_unblock_result(ips, error):
+    if error is None:
+        log_event(f"Unblocked IP {', '.join(ips)}")
+        emit_event("heal", action="unblock", ips=ips)
+    else:
+        log_event(f"Failed to unblock {len(ips)} IP(s) {', '.join(ips)}: {error}")
+
+
+def get_block_executor(config=None):
+    """Return the shared block executor, starting it on first use."""
+    global _executor
+    if config is None:
+        config = get_config()
+    opts = config.response
+    with _executor_lock:
+        if _executor is None:
+            _executor = BlockExecutor(
+                _apply_blocks, remove=_remove_blocks,
+                on_result=_on_block_result, on_unblock=_on_unblock_result,
+            )
+        _executor.window = opts["block_window_seconds"]
+        _executor.batch_size = opts["block_batch_size"]
+        _executor.timeout = opts["block_timeout_seconds"]
+        _executor.retries = opts["block_retries"]
+        BLOCKED_IPS.max_entries = opts["block_max_entries"]
+        BLOCKED_IPS.default_ttl = opts["block_ttl_seconds"]
+        _executor.start()
+    return _executor
+
+
+def flush_blocks(timeout=None):
+    """Wait for queued blocks to be applied; True if the queue drained."""
+    executor = _executor
+    return True if executor is None else executor.flush(timeout)
+
+
+def block_stats():
+    """Return queue depth / latency counters of the block executor."""
+    executor = _executor
+    stats = {} if executor is None else executor.stats()
+    stats["registry_size"] = len(BLOCKED_IPS)
+    return stats
+
+
+def save_blocks(force=False):
+    """Persist the block registry if it changed (at most every 30 s)."""
+    global _last_save
+    now = time.monotonic()
+    with _executor_lock:
+        if _registry_path is None or not BLOCKED_IPS.dirty:
+            return False
+        if not force and now - _last_save < _SAVE_INTERVAL:
+            return False
+        BLOCKED_IPS.save(_registry_path)
+        _last_save = now
+        return True
+
+
+def reconcile_blocks(config=None, timeout=30):
+    """Load the saved block registry and align it with the firewall.
+
+    The firewall is read with a single bulk query. Saved blocks that
+    expired while the agent was down are removed, blocks the firewall lost
+    are re-applied, and unknown ``SHCS_Block_*`` addresses are adopted so
+    they expire normally.
+
+    Returns:
+        dict with the number of blocked, adopted, reapplied and expired IPs.
+    """
+    global _registry_path
+    if config is None:
+        config = get_config()
+    backend = get_firewall_backend(config)
+    executor = get_block_executor(config)
+    with _executor_lock:
+        _registry_path = config.response["block_registry_path"]
+        try:
+            dropped = BLOCKED_IPS.load(_registry_path)
+        except (OSError, ValueError) as e:
+            log_event(f"Block registry unreadable, starting empty: {e}")
+            BLOCKED_IPS.clear()
+            dropped = []
+        firewall = backend.load(timeout)
+        adopted, missing, evicted = BLOCKED_IPS.reconcile(firewall - set(dropped))
+    for ip in dropped + evicted:
+        if backend.contains(ip):
+            executor.submit(ip, unblock=True)
+    for ip in missing:
+        executor.submit(ip)
+    save_blocks(force=True)
+    return {
+        "blocked": len(BLOCKED_IPS),
+        "adopted": len(adopted),
+        "reapplied": len(missing),
+        "expired": len(dropped) + len(evicted),
+    }
+
+
+def expire_blocks():
+    """Queue unblocks for expired entries (timer-wheel sweep) and persist.
+
+    Returns:
+        list of addresses whose block expired.
+    """
+    with _executor_lock:
+        expired = BLOCKED_IPS.expire()
+    if expired:
+        executor = get_block_executor()
+        for ip in expired:
+            executor.submit(ip, unblock=True)
+    save_blocks()
+    return expired
+
+
+def shutdown(timeout=5.0):
+    """Apply outstanding blocks, save the registry and stop the executor."""
+    global _executor, _backend, _registry_path
+    with _executor_lock:
+        executor, _executor = _executor, None
+    # Outside the lock: the worker needs it to reach the backend while draining
+    if executor is not None:
+        executor.stop(timeout)
+    save_blocks(force=True)
+    with _executor_lock:
+        _backend = None
+        _registry_path = None
+
+
+def _queue_block(ip, severity="MEDIUM"):
+    """Queue *ip* for blocking unless it is safe or already blocked.
+
+    A repeat detection refreshes the block's expiry (and raises its
+    severity) instead of touching the firewall again.
+    """
+    if ip is None or is_safe_ip(ip):
+        return False
+    with _executor_lock:
+        known = ip in BLOCKED_IPS
+        evicted = BLOCKED_IPS.add(ip, severity)
+    if known or ip in evicted:
+        return False
+    executor = get_block_executor()
+    for other in evicted:
+        executor.submit(other, unblock=True)
+    executor.submit(ip)
+    return True
+
+
+def is_safe_ip(ip):
+    """Return True if *ip* is covered by safe_ips / ip_ranges.safe."""
+    return get_config().ip_classifier.has(ip, "safe")
+
+
+def _run_repair(args):
+    """Run one repair command; returns None on success or the error text."""
+    try:
+        subprocess.run(args, capture_output=True, timeout=_REPAIR_TIMEOUT, check=True)
+    except (OSError, subprocess.SubprocessError) as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def _reset_dns(interfaces):
+    """Point every tampered interface back at host_probes.allowed_dns_servers."""
+    servers = get_config().allowed_dns_servers
+    if not servers or not interfaces:
+        log_event("CRITICAL: DNS tampering detected — no allowed DNS servers or interfaces to reset")
+        return
+    log_event(f"CRITICAL: DNS tampering detected — resetting DNS to {' / '.join(servers)}")
+    for interface in interfaces:
+        commands = [["netsh", "interface", "ip", "set", "dns", f"name={interface}", "static", servers[0]]]
+        commands += [
+            ["netsh", "interface", "ip", "add", "dns", f"name={interface}", server, f"index={i}"]
+            for i, server in enumerate(servers[1:], start=2)
+        ]
+        error = next(filter(None, map(_run_repair, commands)), None)
+        if error is None:
+            emit_event("heal", action="reset_dns", interface=interface, servers=list(servers))
+        else:
+            log_event(f"Failed to reset DNS on {interface}: {error}")
+            emit_event("heal", action="reset_dns_failed", interface=interface, error=error)
 
 
 def heal(threat):
@@ -20,29 +255,19 @@ def heal(threat):
 
         subprocess.run(["taskkill", "/PID", str(pid), "/F"], capture_output=True)
         log_event(f"Terminated process PID {pid}")
+        emit_event("heal", action="terminate_process", pid=pid)
+
+    elif t == "HIGH_CPU_PROCESS":
+        # No signature matched: report only, never kill
+        log_event(f"WARNING: High CPU process — {threat.get('detail', '')}")
 
     # -------- Network handling --------
     elif t == "SUSPICIOUS_IP":
         ip = threat.get("ip")
 
-        if ip is None or ip in SAFE_IPS:
-            return
-
-        # Prevent repeated blocking
-        if ip in BLOCKED_IPS:
-            return
-
-        subprocess.run(
-            [
-                "netsh", "advfirewall", "firewall", "add", "rule",
-                f"name=SHCS_Block_{ip}",
-                "dir=in", "action=block", f"remoteip={ip}",
-            ],
-            capture_output=True,
-        )
-
-        BLOCKED_IPS.add(ip)
-        log_event(f"Blocked IP {ip}")
+        # Queued and applied in batches off the agent loop; repeats are ignored
+        if _queue_block(ip, threat.get("severity", "MEDIUM")):
+            log_event(f"Queued block for IP {ip}")
 
     # -------- CPU handling --------
     elif t == "HIGH_CPU":
@@ -64,13 +289,8 @@ def heal(threat):
     # -------- Port scan handling --------
     elif t == "PORT_SCAN":
         ip = threat.get("ip")
-        if ip and ip not in SAFE_IPS and ip not in BLOCKED_IPS:
-            os.system(
-                f'netsh advfirewall firewall add rule name="SHCS_Block_{ip}" '
-                f'dir=in action=block remoteip={ip}'
-            )
-            BLOCKED_IPS.add(ip)
-            log_event(f"Blocked port-scanning IP {ip}")
+        if _queue_block(ip, threat.get("severity", "HIGH")):
+            log_event(f"Queued block for port-scanning IP {ip}")
 
     # -------- Data exfiltration handling --------
     elif t == "DATA_EXFILTRATION":
@@ -81,21 +301,19 @@ def heal(threat):
     elif t == "SUSPICIOUS_PORT":
         ip = threat.get("ip")
         port = threat.get("port")
-        if ip and ip not in SAFE_IPS and ip not in BLOCKED_IPS:
-            os.system(
-                f'netsh advfirewall firewall add rule name="SHCS_Block_{ip}" '
-                f'dir=in action=block remoteip={ip}'
-            )
-            BLOCKED_IPS.add(ip)
+        _queue_block(ip, threat.get("severity", "HIGH"))
         log_event(f"Blocked connection on suspicious port {port} from {ip}")
 
     # -------- DNS tamper handling --------
     elif t == "DNS_TAMPER":
-        log_event("CRITICAL: DNS tampering detected — resetting DNS to 8.8.8.8 / 1.1.1.1")
-        os.system('netsh interface ip set dns "Local Area Connection" static 8.8.8.8')
-        os.system('netsh interface ip add dns "Local Area Connection" 1.1.1.1 index=2')
+        _reset_dns(threat.get("interfaces", ()))
 
     # -------- Firewall disabled handling --------
     elif t == "FIREWALL_DISABLED":
         log_event("CRITICAL: Windows Firewall is disabled — re-enabling all profiles")
-        os.system("netsh advfirewall set allprofiles state on")
+        error = _run_repair(["netsh", "advfirewall", "set", "allprofiles", "state", "on"])
+        if error is None:
+            emit_event("heal", action="enable_firewall")
+        else:
+            log_event(f"Failed to enable Windows Firewall: {error}")
+            emit_event("heal", action="enable_firewall_failed", error=error)
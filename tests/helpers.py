@@ -0,0 +1,36 @@
+"""Test doubles shared by the unit tests."""
+
+
+class FakeClock:
+    """Injectable clock: call it for the time, set or advance :attr:`now`."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRunner:
+    """Stand-in for a ``runner(args, timeout, input=None)`` command runner.
+
+    Records every call as ``(args list, input)``. Returns *output*, or the
+    entry of *outputs* keyed by the command tuple (an exception there is
+    raised). The next :attr:`failures` calls raise ``RuntimeError``.
+    """
+
+    def __init__(self, output="", outputs=None):
+        self.output = output
+        self.outputs = outputs or {}
+        self.calls = []
+        self.failures = 0
+
+    def __call__(self, args, timeout, input=None):
+        self.calls.append((list(args), input))
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("command failed")
+        output = self.outputs.get(tuple(args), self.output)
+        if isinstance(output, Exception):
+            raise output
+        return output
@@ -0,0 +1,102 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import threading
+import time
+import unittest
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+
+from dashboard import agent_control
+from utils.agent_lock import AgentLock
+
+
+class TestAgentLock(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.lock = AgentLock(self.tmp)
+        self.addCleanup(self.lock.release)
+
+    def test_single_instance(self):
+        self.assertTrue(self.lock.acquire())
+        other = AgentLock(self.tmp)
+        self.assertFalse(other.acquire())
+        self.lock.release()
+        self.assertTrue(other.acquire())
+        other.release()
+
+    def test_pid_file_identifies_this_process(self):
+        self.assertTrue(self.lock.acquire())
+        with open(self.lock.pid_path, encoding="utf-8") as f:
+            info = json.load(f)
+        self.assertEqual(info["pid"], os.getpid())
+        self.assertTrue(agent_control.is_agent_running(self.lock.pid_path))
+
+    def test_reused_pid_is_not_the_agent(self):
+        self.assertTrue(self.lock.acquire())
+        with open(self.lock.pid_path, "w", encoding="utf-8") as f:
+            json.dump({"pid": os.getpid(), "create_time": 1.0}, f)
+        self.assertFalse(agent_control.is_agent_running(self.lock.pid_path))
+
+    def test_heartbeat_touches_pid_file(self):
+        self.assertTrue(self.lock.acquire())
+        os.utime(self.lock.pid_path, (time.time() - 1000, time.time() - 1000))
+        self.assertGreater(agent_control.heartbeat_age(self.lock.pid_path), 900)
+        self.lock.heartbeat()
+        self.assertLess(agent_control.heartbeat_age(self.lock.pid_path), 5)
+        self.assertTrue(agent_control.is_agent_responsive(self.lock.pid_path))
+
+    def test_stop_file_sets_stop_event(self):
+        self.assertTrue(self.lock.acquire())
+        stop_event = threading.Event()
+        self.lock.watch(stop_event, interval=0.01)
+        open(self.lock.stop_path, "w").close()
+        self.assertTrue(stop_event.wait(5))
+
+    def test_release_removes_control_files(self):
+        self.assertTrue(self.lock.acquire())
+        open(self.lock.stop_path, "w").close()
+        self.lock.release()
+        self.assertFalse(os.path.exists(self.lock.pid_path))
+        self.assertFalse(os.path.exists(self.lock.stop_path))
+        self.assertIsNone(agent_control.read_pid_file(self.lock.pid_path))
+
+    def test_stale_stop_request_cleared_on_start(self):
+        os.makedirs(self.tmp, exist_ok=True)
+        open(self.lock.stop_path, "w").close()
+        self.assertTrue(self.lock.acquire())
+        self.assertFalse(self.lock.stop_requested())
+
+    def test_graceful_stop_of_agent_process(self):
+        script = textwrap.dedent(f"""
+            import sys, threading
+            sys.path.insert(0, {os.path.abspath(ROOT)!r})
+            from utils.agent_lock import AgentLock
+            lock = AgentLock({self.tmp!r})
+            assert lock.acquire()
+            stop = threading.Event()
+            lock.watch(stop, interval=0.01)
+            stop.wait(30)
+            lock.release()
+        """)
+        proc = subprocess.Popen([sys.executable, "-c", script])
+        self.addCleanup(proc.kill)
+        pid_path = os.path.join(self.tmp, "agent.pid")
+        deadline = time.time() + 10
+        while not agent_control.is_agent_running(pid_path) and time.time() < deadline:
+            time.sleep(0.02)
+        result = agent_control.stop_agent(
+            timeout=10, path=pid_path, stop_path=os.path.join(self.tmp, "agent.stop"),
+        )
+        self.assertEqual(result, "stopped")
+        self.assertEqual(proc.wait(5), 0)
+        self.assertFalse(os.path.exists(pid_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from detection.batch import iter_chunks
+from detection.ml_anomaly import AnomalyDetector
+
+_ANOMALY = [99.9, 99.9, 500.0, 10.0, 100_000_000.0, 100_000_000.0, 200.0, 100.0]
+
+
+def _normal(rng, n):
+    return np.column_stack([
+        rng.normal(10.0, 3.0, n),
+        rng.normal(50.0, 5.0, n),
+        rng.normal(20.0, 5.0, n),
+        rng.uniform(0.0, 1.0, n),
+        rng.normal(1024.0, 200.0, n),
+        rng.normal(2048.0, 400.0, n),
+        rng.normal(3.0, 1.0, n),
+        rng.uniform(0.0, 2.0, n),
+    ])
+
+
+class TestIterChunks(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.data = np.arange(23 * 8, dtype=np.float64).reshape(23, 8)
+
+    def _assert_chunks(self, chunks):
+        self.assertEqual([len(c) for c in chunks], [10, 10, 3])
+        np.testing.assert_array_equal(np.concatenate(chunks), self.data)
+
+    def test_array(self):
+        self._assert_chunks(list(iter_chunks(self.data, 10)))
+
+    def test_npy_file_is_memory_mapped(self):
+        path = os.path.join(self.tmp, "features.npy")
+        np.save(path, self.data)
+        self._assert_chunks(list(iter_chunks(path, 10)))
+
+    def test_csv_file_with_header(self):
+        path = os.path.join(self.tmp, "features.csv")
+        np.savetxt(path, self.data, delimiter=",", header="a,b,c,d,e,f,g,h", comments="")
+        self._assert_chunks(list(iter_chunks(path, 10)))
+
+    def test_csv_file_without_header(self):
+        path = os.path.join(self.tmp, "features.csv")
+        np.savetxt(path, self.data, delimiter=",")
+        self._assert_chunks(list(iter_chunks(path, 10)))
+
+    def test_iterable_of_rows_and_blocks(self):
+        source = [self.data[0], self.data[1:15], self.data[15:16], self.data[16:]]
+        self._assert_chunks(list(iter_chunks(source, 10)))
+
+    def test_rejects_empty_chunks(self):
+        with self.assertRaises(ValueError):
+            list(iter_chunks(self.data, 0))
+
+
+class TestScoreBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.rng = np.random.default_rng(11)
+        self.probe = np.vstack([_normal(self.rng, 200), [_ANOMALY]])
+
+    def _trained(self, **kwargs):
+        detector = AnomalyDetector(
+            model_path=os.path.join(self.tmp, "model.pkl"), window_size=300,
+            min_samples=300, background=False, **kwargs,
+        )
+        for row in _normal(self.rng, 300):
+            detector.collect(row.tolist())
+        detector.wait_for_training(timeout=30)
+        return detector
+
+    def _assert_matches_predict(self, detector):
+        scores, labels = detector.score_batch(self.probe, chunk_size=64, n_jobs=4)
+        self.assertEqual(scores.shape, (201,))
+        self.assertEqual(labels.dtype, bool)
+        self.assertEqual(labels.tolist(), [detector.predict(row) for row in self.probe])
+        self.assertTrue(labels[-1])
+        np.testing.assert_array_equal(scores, detector.model.score_samples(self.probe))
+
+    def test_isolation_forest_matches_predict(self):
+        self._assert_matches_predict(self._trained())
+
+    def test_half_space_trees_matches_predict(self):
+        self._assert_matches_predict(
+            self._trained(engine="half_space_trees", engine_options={"hst_window": 100})
+        )
+
+    def test_serial_and_parallel_agree(self):
+        detector = self._trained()
+        serial = detector.score_batch(self.probe, chunk_size=50, n_jobs=1)
+        parallel = detector.score_batch(iter(self.probe), chunk_size=50, n_jobs=3)
+        np.testing.assert_array_equal(serial[0], parallel[0])
+        np.testing.assert_array_equal(detector.predict_batch(self.probe), serial[1])
+
+    def test_empty_input(self):
+        scores, labels = self._trained().score_batch(np.empty((0, 8)))
+        self.assertEqual((len(scores), len(labels)), (0, 0))
+
+    def test_untrained_model_raises(self):
+        detector = AnomalyDetector(model_path=os.path.join(self.tmp, "none.pkl"))
+        with self.assertRaises(ValueError):
+            detector.score_batch(self.probe)
+
+
+if __name__ == "__main__":
+    unittest.main()
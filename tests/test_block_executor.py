@@ -0,0 +1,89 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from response.block_executor import BlockExecutor
+
+
+class _Recorder:
+
+    def __init__(self, failures=0):
+        self.batches = []
+        self.failures = failures
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, ips, timeout):
+        self.gate.wait(5)
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("netsh failed")
+        self.batches.append(list(ips))
+
+
+class TestBlockExecutor(unittest.TestCase):
+
+    def _executor(self, apply, **kwargs):
+        executor = BlockExecutor(apply, **kwargs)
+        executor.start()
+        self.addCleanup(executor.stop, 5)
+        return executor
+
+    def test_burst_is_coalesced_and_deduplicated(self):
+        apply = _Recorder()
+        executor = self._executor(apply, window=10)
+        for ip in ("1.1.1.1", "2.2.2.2", "1.1.1.1", "3.3.3.3"):
+            executor.submit(ip)
+        self.assertEqual(executor.stats()["queue_depth"], 3)
+        self.assertTrue(executor.flush(5))
+        self.assertEqual(apply.batches, [["1.1.1.1", "2.2.2.2", "3.3.3.3"]])
+        stats = executor.stats()
+        self.assertEqual((stats["batches"], stats["blocked"], stats["queue_depth"]), (1, 3, 0))
+        self.assertIsNotNone(stats["mean_latency"])
+
+    def test_batches_are_capped(self):
+        apply = _Recorder()
+        executor = self._executor(apply, window=10, batch_size=2)
+        for i in range(5):
+            executor.submit(f"10.0.0.{i}")
+        self.assertTrue(executor.flush(5))
+        self.assertEqual([len(b) for b in apply.batches], [2, 2, 1])
+
+    def test_failed_batch_is_retried(self):
+        apply = _Recorder(failures=2)
+        results = []
+        executor = self._executor(apply, window=0, retries=2, backoff=0.01,
+                                  on_result=lambda ips, error: results.append(error))
+        executor.submit("4.4.4.4")
+        self.assertTrue(executor.flush(5))
+        self.assertEqual(apply.batches, [["4.4.4.4"]])
+        self.assertEqual(results, [None])
+        self.assertEqual(executor.stats()["retries"], 2)
+
+    def test_gives_up_after_retries(self):
+        apply = _Recorder(failures=5)
+        results = []
+        executor = self._executor(apply, window=0, retries=1, backoff=0.01,
+                                  on_result=lambda ips, error: results.append((ips, error)))
+        executor.submit("4.4.4.4")
+        self.assertTrue(executor.flush(5))
+        self.assertEqual(results, [(["4.4.4.4"], "RuntimeError: netsh failed")])
+        self.assertEqual(executor.stats()["failed"], 1)
+
+    def test_submit_does_not_wait_for_apply(self):
+        apply = _Recorder()
+        apply.gate.clear()
+        executor = self._executor(apply, window=0)
+        executor.submit("5.5.5.5")
+        executor.submit("6.6.6.6")  # queued while the first batch is stuck
+        self.assertFalse(executor.flush(0.05))
+        apply.gate.set()
+        self.assertTrue(executor.flush(5))
+        self.assertEqual(sum(len(b) for b in apply.batches), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from response import self_heal
+from response.block_registry import BlockRegistry, TimerWheel
+from tests.helpers import FakeClock
+from utils.config import ConfigView
+
+
+class TestTimerWheel(unittest.TestCase):
+
+    def test_keys_returned_once_their_slot_passes(self):
+        wheel = TimerWheel(resolution=1.0, slots=8, now=0)
+        wheel.schedule("a", 3)
+        wheel.schedule("b", 20)  # lands in a slot visited before it is due
+        self.assertEqual(wheel.advance(2), [])
+        self.assertEqual(wheel.advance(3), ["a"])
+        self.assertEqual(wheel.advance(100), ["b"])
+
+
+class TestBlockRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock(1_000_000.0)
+
+    def test_entries_expire(self):
+        registry = BlockRegistry(default_ttl=60, clock=self.clock)
+        registry.add("1.1.1.1")
+        registry.add("2.2.2.2", ttl=600)
+        self.clock.now += 61
+        self.assertEqual(registry.expire(), ["1.1.1.1"])
+        self.assertNotIn("1.1.1.1", registry)
+        self.assertIn("2.2.2.2", registry)
+
+    def test_repeat_detection_extends_block(self):
+        registry = BlockRegistry(default_ttl=60, clock=self.clock)
+        registry.add("1.1.1.1")
+        self.clock.now += 50
+        registry.add("1.1.1.1", "HIGH")
+        self.clock.now += 50
+        self.assertEqual(registry.expire(), [])
+        self.assertEqual(registry.get("1.1.1.1").severity, "HIGH")
+        self.clock.now += 11
+        self.assertEqual(registry.expire(), ["1.1.1.1"])
+
+    def test_cap_evicts_least_severe_then_oldest(self):
+        registry = BlockRegistry(max_entries=2, clock=self.clock)
+        registry.add("1.1.1.1", "HIGH")
+        self.clock.now += 1
+        registry.add("2.2.2.2", "MEDIUM")
+        self.clock.now += 1
+        self.assertEqual(registry.add("3.3.3.3", "MEDIUM"), ["2.2.2.2"])
+        self.assertEqual(registry.add("4.4.4.4", "LOW"), ["4.4.4.4"])
+        self.assertEqual(set(registry), {"1.1.1.1", "3.3.3.3"})
+
+    def test_save_and_load_round_trip(self):
+        path = os.path.join(tempfile.mkdtemp(), "blocks.bin")
+        registry = BlockRegistry(default_ttl=60, clock=self.clock)
+        registry.add("1.1.1.1", "CRITICAL", ttl=0)
+        registry.add("2001:db8::1")
+        registry.add("2.2.2.2", ttl=10)
+        registry.save(path)
+        self.assertEqual(os.path.getsize(path), 12 + 3 * 34)
+
+        self.clock.now += 30
+        loaded = BlockRegistry(clock=self.clock)
+        self.assertEqual(loaded.load(path), ["2.2.2.2"])
+        self.assertEqual(set(loaded), {"1.1.1.1", "2001:db8::1"})
+        self.assertEqual(loaded.get("1.1.1.1").expires, 0.0)
+        self.assertEqual(loaded.get("1.1.1.1").severity, "CRITICAL")
+
+    def test_corrupt_files_raise_value_error(self):
+        path = os.path.join(tempfile.mkdtemp(), "blocks.bin")
+        registry = BlockRegistry(clock=self.clock)
+        registry.add("1.1.1.1")
+        registry.save(path)
+        with open(path, "rb") as f:
+            data = f.read()
+        loaded = BlockRegistry(clock=self.clock)
+        loaded.add("9.9.9.9")
+        bad_rank = bytearray(data)
+        bad_rank[12 + 17] = 200
+        for corrupt in (data[:5], data[:-1], bytes(bad_rank)):
+            with open(path, "wb") as f:
+                f.write(corrupt)
+            with self.assertRaises(ValueError):
+                loaded.load(path)
+        self.assertEqual(set(loaded), {"9.9.9.9"})
+
+    def test_reconcile(self):
+        registry = BlockRegistry(clock=self.clock)
+        registry.add("1.1.1.1")
+        registry.add("2.2.2.2")
+        adopted, missing, evicted = registry.reconcile({"2.2.2.2", "3.3.3.3", "10.0.0.0/24"})
+        self.assertEqual((adopted, missing, evicted), (["3.3.3.3"], ["1.1.1.1"], []))
+
+
+class TestSelfHealRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.config = ConfigView({"response": {
+            "firewall_backend": "memory",
+            "block_registry_path": os.path.join(self.tmp, "blocks.bin"),
+            "block_window_seconds": 0,
+        }})
+        self_heal.shutdown()
+        self_heal.BLOCKED_IPS.clear()
+        self.addCleanup(self_heal.shutdown)
+        self.addCleanup(self_heal.BLOCKED_IPS.clear)
+        patcher = patch("response.self_heal.get_config", return_value=self.config)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        log_patcher = patch("response.self_heal.log_event")
+        log_patcher.start()
+        self.addCleanup(log_patcher.stop)
+
+    def test_restart_reconciles_with_one_bulk_query(self):
+        backend = self_heal.get_firewall_backend(self.config)
+        backend.add_many(["9.9.9.9"])  # left behind by an earlier agent
+        summary = self_heal.reconcile_blocks(self.config)
+        self.assertEqual(summary["adopted"], 1)
+
+        self_heal.heal({"type": "PORT_SCAN", "ip": "5.5.5.5", "severity": "HIGH"})
+        self.assertTrue(self_heal.flush_blocks(5))
+        self_heal.shutdown()
+        self.assertTrue(os.path.exists(self.config.response["block_registry_path"]))
+
+        # New process: empty registry, firewall still holds both addresses
+        self_heal.BLOCKED_IPS.clear()
+        fresh = self_heal.get_firewall_backend(self.config)
+        fresh.add_many(["9.9.9.9", "5.5.5.5"])
+        fresh.batches.clear()
+        summary = self_heal.reconcile_blocks(self.config)
+        self.assertEqual((summary["blocked"], summary["adopted"], summary["reapplied"]), (2, 0, 0))
+        self.assertTrue(self_heal.flush_blocks(5))
+        self.assertEqual(fresh.batches, [])
+        self.assertEqual(self_heal.BLOCKED_IPS.get("5.5.5.5").severity, "HIGH")
+
+    def test_expired_blocks_are_removed_from_firewall(self):
+        self_heal.reconcile_blocks(self.config)
+        self_heal.heal({"type": "SUSPICIOUS_IP", "ip": "6.6.6.6"})
+        self.assertTrue(self_heal.flush_blocks(5))
+        backend = self_heal.get_firewall_backend(self.config)
+        self.assertTrue(backend.contains("6.6.6.6"))
+
+        with patch.object(self_heal.BLOCKED_IPS, "_clock", return_value=10 ** 12):
+            self.assertEqual(self_heal.expire_blocks(), ["6.6.6.6"])
+        self.assertTrue(self_heal.flush_blocks(5))
+        self.assertFalse(backend.contains("6.6.6.6"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from monitor.bloom import BloomFilter
+from monitor.intel_feed import IntelFeed, build_bloom, compile_feed
+
+
+class TestBloomFilter(unittest.TestCase):
+
+    def test_no_false_negatives_and_low_false_positive_rate(self):
+        bloom = BloomFilter.for_capacity(1000, 0.01)
+        for key in range(0, 2000, 2):
+            bloom.add(key)
+        self.assertTrue(all(key in bloom for key in range(0, 2000, 2)))
+        false_positives = sum(key in bloom for key in range(1, 20001, 2))
+        self.assertLess(false_positives / 10000, 0.03)
+
+    def test_save_and_load_round_trip(self):
+        path = os.path.join(tempfile.mkdtemp(), "f.bloom")
+        bloom = BloomFilter.for_capacity(10, stamp=42, meta=7)
+        bloom.add(123)
+        bloom.save(path)
+        loaded = BloomFilter.load(path)
+        self.assertEqual((loaded.stamp, loaded.meta), (42, 7))
+        self.assertIn(123, loaded)
+
+    def test_too_wide_range_has_no_filter(self):
+        self.assertIsNone(build_bloom([], [(0, (1 << 128) - 1)]))
+
+
+class TestFeedPrefilter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.source = os.path.join(self.tmp, "blocklist.txt")
+        self.out = os.path.join(self.tmp, "ioc.bin")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("1.2.3.4\n198.51.100.0/24\n10.0.0.0/12\n2001:db8::/64\n")
+        compile_feed([self.source], self.out)
+        self.feed = IntelFeed(self.out)
+        self.addCleanup(self.feed.close)
+
+    def test_filter_persisted_and_used(self):
+        self.assertTrue(os.path.exists(self.out + ".bloom"))
+        for ip in ("1.2.3.4", "198.51.100.7", "10.15.255.255", "2001:db8::1"):
+            self.assertTrue(self.feed.contains(ip), ip)
+        for i in range(200):
+            self.assertFalse(self.feed.contains(f"203.0.{i}.1"))
+        stats = self.feed.stats()
+        self.assertTrue(stats["bloom"])
+        self.assertEqual(stats["lookups"], 204)
+        self.assertEqual(stats["hits"], 4)
+        self.assertEqual(stats["filtered"] + stats["false_positives"], 200)
+        self.assertGreater(stats["filtered"], 190)
+
+    def test_stale_filter_is_ignored(self):
+        BloomFilter.for_capacity(1, stamp=1).save(self.out + ".bloom")
+        self.feed.close()
+        feed = IntelFeed(self.out)
+        self.addCleanup(feed.close)
+        self.assertTrue(feed.contains("1.2.3.4"))
+        self.assertFalse(feed.stats()["bloom"])
+
+
+if __name__ == "__main__":
+    unittest.main()
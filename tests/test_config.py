@@ -0,0 +1,103 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.config import ConfigStore, ConfigView
+
+
+def _write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+class TestConfigView(unittest.TestCase):
+
+    def test_defaults_when_empty(self):
+        view = ConfigView({})
+        self.assertEqual(view.thresholds["cpu_percent"], 90)
+        self.assertIn(4444, view.suspicious_ports)
+        self.assertIn("127.0.0.1", view.safe_ips)
+        self.assertEqual(view.monitoring_interval, 5)
+        self.assertEqual(view.errors, ())
+
+    def test_precompiled_collections(self):
+        view = ConfigView({"suspicious_ports": [1, 2], "process_blacklist": ["XMRig"]})
+        self.assertIsInstance(view.suspicious_ports, frozenset)
+        self.assertEqual(view.process_blacklist, ("xmrig",))
+
+    def test_view_is_read_only(self):
+        view = ConfigView({"thresholds": {"cpu_percent": 50}})
+        with self.assertRaises(TypeError):
+            view.thresholds["cpu_percent"] = 10
+        with self.assertRaises(AttributeError):
+            view.new_attr = 1
+
+    def test_invalid_values_fall_back_with_errors(self):
+        view = ConfigView({
+            "thresholds": {"cpu_percent": "high"},
+            "suspicious_ports": "4444",
+            "monitoring_interval_seconds": 0,
+        })
+        self.assertEqual(view.thresholds["cpu_percent"], 90)
+        self.assertIn(4444, view.suspicious_ports)
+        self.assertEqual(view.monitoring_interval, 5)
+        self.assertEqual(len(view.errors), 3)
+
+    def test_unknown_ml_engine_falls_back(self):
+        view = ConfigView({"ml": {"engine": "svm", "hst_window": 0}})
+        self.assertEqual(view.ml["engine"], "isolation_forest")
+        self.assertEqual(view.ml["hst_window"], 250)
+        self.assertEqual(len(view.errors), 2)
+
+    def test_should_notify_uses_severity_rank(self):
+        view = ConfigView({"notifications": {"enabled": True, "min_severity": "HIGH"}})
+        self.assertFalse(view.should_notify("MEDIUM"))
+        self.assertTrue(view.should_notify("CRITICAL"))
+        disabled = ConfigView({"notifications": {"enabled": False}})
+        self.assertFalse(disabled.should_notify("CRITICAL"))
+
+
+class TestConfigStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "config.json")
+        _write(self.path, {"monitoring_interval_seconds": 1})
+
+    def test_unchanged_file_is_not_reparsed(self):
+        store = ConfigStore(self.path)
+        first = store.get()
+        with patch("utils.config.json.load") as mock_load:
+            second = store.get()
+        mock_load.assert_not_called()
+        self.assertIs(first, second)
+
+    def test_reload_on_change(self):
+        store = ConfigStore(self.path)
+        first = store.get()
+        _write(self.path, {"monitoring_interval_seconds": 10, "safe_ips": ["1.1.1.1"]})
+        os.utime(self.path, ns=(0, 1))
+        second = store.get()
+        self.assertGreater(second.version, first.version)
+        self.assertEqual(second.monitoring_interval, 10)
+
+    def test_invalid_json_keeps_last_good_view(self):
+        store = ConfigStore(self.path)
+        first = store.get()
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("{ not json")
+        os.utime(self.path, ns=(0, 1))
+        self.assertIs(store.get(), first)
+
+    def test_missing_file_uses_defaults(self):
+        store = ConfigStore(os.path.join(self.tmp, "missing.json"))
+        self.assertEqual(store.get().monitoring_interval, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+from collections import namedtuple
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from monitor import network_monitor
+from monitor.connections import Connection, ConnectionSnapshot, take_snapshot
+from utils.config import ConfigView
+
+_Addr = namedtuple("_Addr", ["ip", "port"])
+_SConn = namedtuple("_SConn", ["laddr", "raddr", "status", "pid"])
+
+
+def _snapshot():
+    return ConnectionSnapshot([
+        Connection("10.0.0.2", 50000, "1.2.3.4", 443, "ESTABLISHED", 100),
+        Connection("10.0.0.2", 50001, "1.2.3.4", 8080, "ESTABLISHED", 100),
+        Connection("10.0.0.2", 50002, "192.168.1.5", 22, "TIME_WAIT", 200),
+        Connection("127.0.0.1", 80, "127.0.0.1", 50003, "ESTABLISHED", 300),
+        Connection("0.0.0.0", 135, None, None, "LISTEN", None),
+    ])
+
+
+class TestConnectionSnapshot(unittest.TestCase):
+
+    def test_derived_views(self):
+        snap = _snapshot()
+        self.assertEqual(len(snap), 5)
+        self.assertEqual(snap.count_by_state["ESTABLISHED"], 3)
+        self.assertEqual(snap.count_by_state["LISTEN"], 1)
+        self.assertEqual(len(snap.by_remote_ip["1.2.3.4"]), 2)
+        self.assertNotIn(None, snap.by_remote_ip)
+        self.assertEqual(len(snap.by_pid[100]), 2)
+
+    def test_views_are_cached_and_read_only(self):
+        snap = _snapshot()
+        self.assertIs(snap.by_remote_ip, snap.by_remote_ip)
+        with self.assertRaises(TypeError):
+            snap.by_pid[1] = ()
+
+    @patch("monitor.connections.psutil.net_connections")
+    def test_take_snapshot_enumerates_once(self, mock_conns):
+        mock_conns.return_value = [
+            _SConn(_Addr("10.0.0.2", 5000), _Addr("8.8.8.8", 53), "ESTABLISHED", 1),
+            _SConn(_Addr("0.0.0.0", 445), (), "LISTEN", 4),
+        ]
+        snap = take_snapshot()
+        mock_conns.assert_called_once_with(kind="inet")
+        self.assertEqual(snap.connections[0].remote_ip, "8.8.8.8")
+        self.assertIsNone(snap.connections[1].remote_ip)
+
+
+class TestNetworkMonitorSnapshot(unittest.TestCase):
+
+    def test_suspicious_connections_from_snapshot(self):
+        config = ConfigView({})
+        with patch("monitor.network_monitor.take_snapshot") as mock_take:
+            result = network_monitor.get_suspicious_connections(config, _snapshot())
+        mock_take.assert_not_called()
+        self.assertEqual(
+            sorted((r["ip"], r["port"], r["pid"]) for r in result),
+            [("1.2.3.4", 443, 100), ("1.2.3.4", 8080, 100)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
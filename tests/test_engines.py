@@ -0,0 +1,137 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from detection.engines import HalfSpaceTrees, create_engine
+from detection.ml_anomaly import AnomalyDetector
+
+_ANOMALY = [99.9, 99.9, 500.0, 10.0, 100_000_000.0, 100_000_000.0, 200.0, 100.0]
+
+
+def _normal(rng, n):
+    """Return *n* normal feature rows (same profile as test_ml_anomaly)."""
+    return np.column_stack([
+        rng.normal(10.0, 3.0, n),
+        rng.normal(50.0, 5.0, n),
+        rng.normal(20.0, 5.0, n),
+        rng.uniform(0.0, 1.0, n),
+        rng.normal(1024.0, 200.0, n),
+        rng.normal(2048.0, 400.0, n),
+        rng.normal(3.0, 1.0, n),
+        rng.uniform(0.0, 2.0, n),
+    ])
+
+
+class TestHalfSpaceTrees(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(7)
+        self.model = HalfSpaceTrees(n_trees=25, height=8, window_size=100, contamination=0.1)
+
+    def test_not_ready_before_first_window(self):
+        self.model.partial_fit(_normal(self.rng, 99))
+        self.assertFalse(self.model.ready)
+        self.assertEqual(self.model.predict([_ANOMALY]).tolist(), [1])
+        self.model.partial_fit(_normal(self.rng, 1))
+        self.assertTrue(self.model.ready)
+
+    def test_extreme_anomaly_flagged(self):
+        for row in _normal(self.rng, 300):
+            self.model.partial_fit(row)
+        self.assertEqual(self.model.predict([_ANOMALY]).tolist(), [-1])
+
+    def test_flags_about_contamination_of_normal_rows(self):
+        self.model.partial_fit(_normal(self.rng, 300))
+        flagged = (self.model.predict(_normal(self.rng, 1000)) == -1).mean()
+        self.assertLess(flagged, 0.25)
+
+    def test_row_by_row_matches_batch_update(self):
+        rows = _normal(self.rng, 250)
+        other = HalfSpaceTrees(n_trees=25, height=8, window_size=100, contamination=0.1)
+        self.model.partial_fit(rows)
+        for row in rows:
+            other.partial_fit(row)
+        probe = _normal(self.rng, 20)
+        np.testing.assert_array_equal(self.model.score_samples(probe), other.score_samples(probe))
+
+    def test_create_engine(self):
+        model = create_engine("half_space_trees", 0.05, hst_trees=5, hst_window=50, window_size=100)
+        self.assertIsInstance(model, HalfSpaceTrees)
+        self.assertEqual((model.n_trees, model.window_size, model.contamination), (5, 50, 0.05))
+        with self.assertRaises(KeyError):
+            create_engine("nope")
+
+
+class TestDetectorWithOnlineEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.model_path = os.path.join(self.tmp, "model.pkl")
+        self.rng = np.random.default_rng(3)
+
+    def _detector(self):
+        return AnomalyDetector(
+            model_path=self.model_path, window_size=100, min_samples=20, retrain_interval=50,
+            engine="half_space_trees", engine_options={"hst_height": 8, "hst_window": 100},
+        )
+
+    def test_learns_online_without_refit(self):
+        detector = self._detector()
+        self.assertIsInstance(detector.model, HalfSpaceTrees)
+        model = detector.model
+        for row in _normal(self.rng, 60):
+            detector.collect(row.tolist())
+        status = detector.get_status()
+        self.assertEqual(status["mode"], "learning")
+        self.assertEqual(status["min_samples"], 100)
+        self.assertFalse(detector.predict(_ANOMALY))
+
+        for row in _normal(self.rng, 90):
+            detector.collect(row.tolist())
+        self.assertIs(detector.model, model)
+        self.assertEqual(detector.get_status()["mode"], "active")
+        self.assertEqual(detector.get_status()["engine"], "half_space_trees")
+        self.assertTrue(detector.predict(_ANOMALY))
+
+    def test_default_window_sizes_reach_active(self):
+        # Shipped config: ml.window_size 100 < ml.hst_window 250
+        detector = AnomalyDetector(model_path=self.model_path, engine="half_space_trees")
+        for row in _normal(self.rng, 249):
+            detector.collect(row.tolist())
+        status = detector.get_status()
+        self.assertEqual((status["mode"], status["samples"], status["min_samples"]), ("learning", 249, 250))
+        self.assertFalse(detector.predict(_ANOMALY))
+
+        detector.collect(_normal(self.rng, 1)[0].tolist())
+        self.assertEqual(detector.get_status()["mode"], "active")
+        self.assertTrue(detector.predict(_ANOMALY))
+
+    def test_saves_and_reloads_the_online_model(self):
+        detector = self._detector()
+        for row in _normal(self.rng, 150):
+            detector.collect(row.tolist())
+        self.assertTrue(detector.wait_for_training(timeout=30))
+        self.assertTrue(os.path.exists(self.model_path))
+
+        reloaded = self._detector()
+        self.assertTrue(reloaded.model.ready)
+        self.assertIsNot(reloaded.model, detector.model)
+
+    def test_model_of_another_engine_is_ignored(self):
+        batch = AnomalyDetector(model_path=self.model_path, min_samples=20, background=False)
+        for row in _normal(self.rng, 50):
+            batch.collect(row.tolist())
+        self.assertTrue(os.path.exists(self.model_path))
+
+        detector = self._detector()
+        self.assertIsInstance(detector.model, HalfSpaceTrees)
+        self.assertFalse(detector.model.ready)
+
+
+if __name__ == "__main__":
+    unittest.main()
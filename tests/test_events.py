@@ -0,0 +1,150 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dashboard.log_reader import _index_entries, _seek_offset, read_events, read_recent_events
+from tests.helpers import FakeClock
+from utils.events import EventStream, index_path
+
+
+class TestEventStream(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "events.jsonl")
+        self.clock = FakeClock(1_000_000.0)
+
+    def _stream(self, **kwargs):
+        stream = EventStream(self.path, clock=self.clock, **kwargs)
+        self.addCleanup(stream.close)
+        return stream
+
+    def _emit_minutes(self, stream, minutes):
+        for _ in range(minutes):
+            stream.emit("heartbeat")
+            stream.emit("ml_status", mode="learning", samples=3, min_samples=20)
+            self.clock.now += 60
+        stream.flush()
+
+    def test_records_round_trip(self):
+        stream = self._stream()
+        stream.emit("threat", threat={"type": "PORT_SCAN", "ip": "203.0.113.5"})
+        stream.emit("heal", action="block", ips=["203.0.113.5"])
+        stream.flush()
+        events = read_events(self.path)
+        self.assertEqual([e["type"] for e in events], ["threat", "heal"])
+        self.assertEqual(events[0]["threat"]["ip"], "203.0.113.5")
+        self.assertEqual(events[0]["ts"], self.clock.now)
+
+    def test_index_is_sparse(self):
+        stream = self._stream(index_interval=300)
+        self._emit_minutes(stream, 30)
+        entries = _index_entries(self.path)
+        self.assertEqual(len(entries), 6)
+        self.assertEqual(entries[0][1], 0)
+
+    def test_since_seeks_past_older_records(self):
+        stream = self._stream(index_interval=60)
+        self._emit_minutes(stream, 60)
+        since = self.clock.now - 10 * 60
+        offset = _seek_offset(_index_entries(self.path), since, os.path.getsize(self.path))
+        self.assertGreater(offset, os.path.getsize(self.path) // 2)
+        events = read_events(self.path, since=since, types=("ml_status",))
+        self.assertEqual(len(events), 10)
+        self.assertTrue(all(e["ts"] >= since for e in events))
+
+    def test_partial_last_line_ignored(self):
+        stream = self._stream()
+        stream.emit("heartbeat")
+        stream.flush()
+        with open(self.path, "ab") as f:
+            f.write(b'{"ts":1,"type":"heart')
+        self.assertEqual(len(read_events(self.path)), 1)
+
+    def test_stale_index_falls_back_to_start(self):
+        stream = self._stream(index_interval=60)
+        self._emit_minutes(stream, 5)
+        stream.close()
+        with open(self.path, "wb") as f:
+            f.write(b'{"ts":2000000000,"type":"heartbeat"}\n')
+        self.assertEqual(len(read_events(self.path, since=self.clock.now)), 1)
+
+    def test_rotation_moves_stream_and_index(self):
+        stream = self._stream(max_bytes=2000, backup_count=1, index_interval=0)
+        self._emit_minutes(stream, 40)
+        self.assertTrue(os.path.exists(self.path + ".1"))
+        self.assertTrue(os.path.exists(index_path(self.path + ".1")))
+        self.assertFalse(os.path.exists(self.path + ".2"))
+        self.assertLessEqual(os.path.getsize(self.path), 2000 + 200)
+        self.assertEqual(_index_entries(self.path)[0][1], 0)
+
+    def test_failed_rotation_keeps_every_record(self):
+        stream = self._stream(max_bytes=200, backup_count=1)
+        with patch("utils.events.os.replace", side_effect=PermissionError("in use")) as replace:
+            for _ in range(20):
+                stream.emit("heartbeat")
+                self.clock.now += 0.1
+        stream.flush()
+        self.assertEqual(stream.written, 20)
+        self.assertEqual(len(read_events(self.path)), 20)
+        self.assertEqual(replace.call_count, 1)
+        self.assertIn("rotation failed", stream.last_error)
+
+        self.clock.now += 600
+        stream.emit("heartbeat")
+        stream.flush()
+        self.assertEqual(len(read_events(self.path + ".1")), 20)
+        self.assertEqual(len(read_events(self.path)), 1)
+
+    def test_index_rotates_before_stream(self):
+        stream = self._stream(max_bytes=200, backup_count=1, index_interval=0)
+        real_replace = os.replace
+
+        def replace(src, dst):
+            if src == self.path:
+                raise PermissionError("in use")
+            real_replace(src, dst)
+
+        with patch("utils.events.os.replace", side_effect=replace):
+            for _ in range(10):
+                stream.emit("heartbeat")
+                self.clock.now += 0.1
+        stream.flush()
+        size = os.path.getsize(self.path)
+        self.assertTrue(all(offset <= size for _, offset in _index_entries(self.path)))
+        self.assertEqual(len(read_events(self.path, since=self.clock.now - 60)), 10)
+
+    def test_stale_index_is_dropped_on_open(self):
+        stream = self._stream(index_interval=0)
+        self._emit_minutes(stream, 5)
+        stream.close()
+        os.remove(self.path)   # e.g. a crash between the stream and index renames
+        stream = self._stream(index_interval=0)
+        stream.emit("heartbeat")
+        stream.flush()
+        self.assertEqual(_index_entries(self.path), [(self.clock.now, 0)])
+
+    def test_recent_events_span_rotated_stream(self):
+        stream = self._stream(max_bytes=2000, backup_count=1, index_interval=0)
+        self.clock.now = time.time() - 40 * 60
+        self._emit_minutes(stream, 40)
+        current = read_events(self.path, types=("heartbeat",))
+        events = read_recent_events(60 * 60, types=("heartbeat",), path=self.path)
+        self.assertGreater(len(events), len(current))
+        ts = [e["ts"] for e in events]
+        self.assertEqual(ts, sorted(ts))
+
+    def test_disabled_stream_writes_nothing(self):
+        stream = EventStream(None)
+        stream.emit("heartbeat")
+        stream.flush()
+        self.assertEqual(stream.written, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import os
+import subprocess
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from response.firewall import (
+    IpsetBackend,
+    MemoryBackend,
+    NetshSetBackend,
+    NftablesBackend,
+    parse_netsh_rules,
+)
+from tests.helpers import FakeRunner
+
+NETSH_RULES = """
+Rule Name:                            SHCS_Block_set_0
+----------------------------------------------------------------------
+Enabled:                              Yes
+Direction:                            In
+RemoteIP:                             1.2.3.4/32,5.6.7.8/255.255.255.255
+Action:                               Block
+
+Rule Name:                            SHCS_Block_9.9.9.9
+----------------------------------------------------------------------
+RemoteIP:                             9.9.9.9/32
+Action:                               Block
+
+Rule Name:                            Core Networking - DNS (UDP-Out)
+----------------------------------------------------------------------
+RemoteIP:                             Any
+Ok.
+"""
+
+
+class TestMemoryBackend(unittest.TestCase):
+
+    def test_batched_add_remove_contains(self):
+        backend = MemoryBackend()
+        self.assertEqual(backend.add_many(["1.1.1.1", "2.2.2.2", "1.1.1.1"]), ["1.1.1.1", "2.2.2.2"])
+        self.assertEqual(backend.add_many(["2.2.2.2"]), [])
+        self.assertTrue(backend.contains("1.1.1.1"))
+        backend.remove_many(["1.1.1.1", "3.3.3.3"])
+        self.assertFalse(backend.contains("1.1.1.1"))
+        self.assertEqual(backend.batches, [(("1.1.1.1", "2.2.2.2"), ()), ((), ("1.1.1.1",))])
+        self.assertEqual(len(backend), 1)
+
+
+class TestNetshSetBackend(unittest.TestCase):
+
+    def test_addresses_packed_into_managed_rules(self):
+        runner = FakeRunner()
+        backend = NetshSetBackend(runner=runner, rule_size=2)
+        backend.add_many(["1.1.1.1", "2.2.2.2", "3.3.3.3"])
+        self.assertEqual([c[0][3] for c in runner.calls], ["add", "add"])
+        self.assertEqual(runner.calls[0][0][-1], "remoteip=1.1.1.1,2.2.2.2")
+        self.assertEqual(runner.calls[1][0][5], "name=SHCS_Block_set_1")
+
+        runner.calls.clear()
+        backend.remove_many(["1.1.1.1"])
+        backend.add_many(["4.4.4.4"])
+        self.assertEqual(
+            [c[0][3:] for c in runner.calls],
+            [["set", "rule", "name=SHCS_Block_set_0", "new", "remoteip=2.2.2.2"],
+             ["set", "rule", "name=SHCS_Block_set_0", "new", "remoteip=2.2.2.2,4.4.4.4"]],
+        )
+
+        runner.calls.clear()
+        backend.remove_many(["3.3.3.3"])
+        self.assertEqual(runner.calls[0][0][3:], ["delete", "rule", "name=SHCS_Block_set_1"])
+
+    def test_long_ipv6_batches_stay_under_command_line_limit(self):
+        runner = FakeRunner()
+        backend = NetshSetBackend(runner=runner)
+        ips = [f"2001:0db8:85a3:{i >> 16:04x}:{i & 0xffff:04x}:8a2e:0370:7334" for i in range(1000)]
+        self.assertEqual(len(backend.add_many(ips)), 1000)
+        self.assertGreater(len(runner.calls), 1)
+        for args, _ in runner.calls:
+            self.assertLess(len(subprocess.list2cmdline(args)), 32767)
+        placed = [ip for args, _ in runner.calls for ip in args[-1][len("remoteip="):].split(",")]
+        self.assertEqual(sorted(placed), sorted(ips))
+
+        # Removing and re-adding keeps every rewritten rule under the limit too
+        runner.calls.clear()
+        backend.remove_many(ips[:10])
+        backend.add_many([ip.replace("7334", "7335") for ip in ips[:20]])
+        for args, _ in runner.calls:
+            self.assertLess(len(subprocess.list2cmdline(args)), 32767)
+
+    def test_failed_add_leaves_state_unchanged_and_retries(self):
+        runner = FakeRunner()
+        backend = NetshSetBackend(runner=runner, rule_size=2)
+        backend.add_many(["1.1.1.1"])
+        runner.failures = 1
+        with self.assertRaises(RuntimeError):
+            backend.add_many(["2.2.2.2", "3.3.3.3"])
+        self.assertFalse(backend.contains("2.2.2.2"))
+        self.assertEqual(backend._rules["SHCS_Block_set_0"], {"1.1.1.1"})
+
+        runner.calls.clear()
+        self.assertEqual(backend.add_many(["2.2.2.2", "3.3.3.3"]), ["2.2.2.2", "3.3.3.3"])
+        self.assertEqual(
+            [c[0][5:] for c in runner.calls],
+            [["name=SHCS_Block_set_0", "new", "remoteip=1.1.1.1,2.2.2.2"],
+             ["name=SHCS_Block_set_1", "dir=in", "action=block", "remoteip=3.3.3.3"]],
+        )
+        self.assertEqual(backend._rule_of, {
+            "1.1.1.1": "SHCS_Block_set_0", "2.2.2.2": "SHCS_Block_set_0", "3.3.3.3": "SHCS_Block_set_1",
+        })
+
+    def test_failed_remove_leaves_state_unchanged_and_retries(self):
+        runner = FakeRunner()
+        backend = NetshSetBackend(runner=runner)
+        backend.add_many(["1.1.1.1", "2.2.2.2"])
+        runner.failures = 1
+        with self.assertRaises(RuntimeError):
+            backend.remove_many(["1.1.1.1"])
+        self.assertTrue(backend.contains("1.1.1.1"))
+
+        self.assertEqual(backend.remove_many(["1.1.1.1"]), ["1.1.1.1"])
+        self.assertFalse(backend.contains("1.1.1.1"))
+        self.assertEqual(runner.calls[-1][0][-1], "remoteip=2.2.2.2")
+        self.assertEqual(backend._rules["SHCS_Block_set_0"], {"2.2.2.2"})
+
+    def test_load_reads_existing_rules_in_one_query(self):
+        runner = FakeRunner(NETSH_RULES)
+        backend = NetshSetBackend(runner=runner)
+        self.assertEqual(backend.load(), {"1.2.3.4", "5.6.7.8", "9.9.9.9"})
+        self.assertEqual(len(runner.calls), 1)
+        backend.add_many(["7.7.7.7"])
+        self.assertEqual(runner.calls[-1][0][3:6], ["set", "rule", "name=SHCS_Block_set_0"])
+
+    def test_legacy_per_address_rule_is_deleted_on_removal(self):
+        runner = FakeRunner(NETSH_RULES)
+        backend = NetshSetBackend(runner=runner)
+        backend.load()
+        backend.remove_many(["9.9.9.9"])
+        self.assertEqual(runner.calls[-1][0][3:], ["delete", "rule", "name=SHCS_Block_9.9.9.9"])
+
+    def test_parse_netsh_rules(self):
+        rules = parse_netsh_rules(NETSH_RULES)
+        self.assertEqual(rules, {
+            "SHCS_Block_set_0": ["1.2.3.4", "5.6.7.8"],
+            "SHCS_Block_9.9.9.9": ["9.9.9.9"],
+        })
+
+
+class TestLinuxBackends(unittest.TestCase):
+
+    def test_nftables_one_command_per_family(self):
+        runner = FakeRunner()
+        backend = NftablesBackend(runner=runner)
+        backend.add_many(["1.1.1.1", "2001:db8::1", "2.2.2.2"])
+        self.assertEqual(runner.calls[0][0], ["nft", "-f", "-"])
+        self.assertEqual(runner.calls[1][0][-1], "{ 1.1.1.1, 2.2.2.2 }")
+        self.assertEqual(runner.calls[2][0][-2:], ["blocklist6", "{ 2001:db8::1 }"])
+        backend.remove_many(["1.1.1.1"])
+        self.assertEqual(runner.calls[3][0][1], "delete")
+
+    def test_ipset_single_restore_per_batch(self):
+        runner = FakeRunner()
+        backend = IpsetBackend(runner=runner)
+        backend.add_many(["1.1.1.1", "2001:db8::1"])
+        self.assertEqual(len(runner.calls), 2)
+        self.assertEqual(
+            runner.calls[1][1],
+            "add shcs_block4 1.1.1.1 -exist\nadd shcs_block6 2001:db8::1 -exist\n",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
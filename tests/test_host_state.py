@@ -0,0 +1,129 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from detection import rule_engine
+from monitor.host_state import (
+    DNS_COMMAND,
+    FIREWALL_COMMAND,
+    HostStateProber,
+    Probe,
+    parse_dns_servers,
+    parse_firewall_state,
+    probe_dns,
+    probe_firewall,
+)
+from tests.helpers import FakeClock, FakeRunner
+from utils.config import ConfigView
+
+FIREWALL_ON = """
+Domain Profile Settings:
+----------------------------------------------------------------------
+State                                 ON
+
+Private Profile Settings:
+----------------------------------------------------------------------
+State                                 ON
+
+Public Profile Settings:
+----------------------------------------------------------------------
+State                                 ON
+Ok.
+"""
+
+DNS_OUTPUT = """
+Configuration for interface "Ethernet"
+    Statically Configured DNS Servers:    8.8.8.8
+                                          1.1.1.1
+    Register with which suffix:           Primary only
+
+Configuration for interface "Loopback Pseudo-Interface 1"
+    Statically Configured DNS Servers:    None
+"""
+
+
+class TestParsers(unittest.TestCase):
+
+    def test_firewall_profiles(self):
+        state = parse_firewall_state(FIREWALL_ON.rsplit("ON", 1)[0] + "OFF\nOk.\n")
+        self.assertEqual(state["profiles"], {"Domain": "ON", "Private": "ON", "Public": "OFF"})
+        self.assertTrue(state["disabled"])
+        self.assertFalse(parse_firewall_state(FIREWALL_ON)["disabled"])
+
+    def test_dns_servers(self):
+        state = parse_dns_servers(DNS_OUTPUT)
+        self.assertEqual(state["interfaces"]["Ethernet"], ["8.8.8.8", "1.1.1.1"])
+        self.assertEqual(state["servers"], ["1.1.1.1", "8.8.8.8"])
+
+
+class TestHostStateProber(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.runner = FakeRunner(outputs={FIREWALL_COMMAND: FIREWALL_ON, DNS_COMMAND: DNS_OUTPUT})
+        self.prober = HostStateProber(
+            [Probe("firewall", probe_firewall, interval=30, ttl=90),
+             Probe("dns", probe_dns, interval=60, ttl=180)],
+            runner=self.runner, clock=self.clock,
+        )
+
+    def test_probes_run_on_their_own_schedule(self):
+        self.assertEqual(self.prober.state(), {"firewall": None, "dns": None})
+        self.assertEqual(self.prober.run_due(), 30)
+        self.assertEqual(len(self.runner.calls), 2)
+
+        self.clock.now = 30
+        self.prober.run_due()
+        self.assertEqual(self.runner.calls[-1][0], list(FIREWALL_COMMAND))
+        self.assertEqual(len(self.runner.calls), 3)
+        self.assertFalse(self.prober.get("firewall")["disabled"])
+
+    def test_expired_and_failed_results_read_as_missing(self):
+        self.prober.run_due()
+        self.runner.outputs[FIREWALL_COMMAND] = FileNotFoundError("netsh")
+        for now in (30, 60, 91):
+            self.clock.now = now
+            self.prober.run_due()
+        self.assertIsNone(self.prober.get("firewall"))
+        self.assertIsNotNone(self.prober.get("dns"))
+        stats = self.prober.stats()["firewall"]
+        self.assertEqual(stats["errors"], 3)
+        self.assertIn("FileNotFoundError", stats["last_error"])
+
+    def test_background_thread_populates_cache(self):
+        prober = HostStateProber([Probe("firewall", probe_firewall)], runner=self.runner)
+        prober.start()
+        self.addCleanup(prober.stop)
+        for _ in range(100):
+            if prober.get("firewall") is not None:
+                break
+            time.sleep(0.01)
+        self.assertEqual(prober.get("firewall")["profiles"]["Domain"], "ON")
+
+
+class TestRuleEngineHostState(unittest.TestCase):
+
+    def test_firewall_disabled_from_cached_state(self):
+        data = {"host_state": {"firewall": {"disabled": True}, "dns": None}}
+        types = [t["type"] for t in rule_engine.analyze(data, ConfigView({}))]
+        self.assertIn("FIREWALL_DISABLED", types)
+
+    def test_unexpected_dns_server(self):
+        data = {"host_state": {"firewall": None, "dns": {"servers": ["8.8.8.8", "6.6.6.6"]}}}
+        config = ConfigView({"host_probes": {"allowed_dns_servers": ["8.8.8.8"]}})
+        threat = next(t for t in rule_engine.analyze(data, config) if t["type"] == "DNS_TAMPER")
+        self.assertEqual(threat["servers"], ["6.6.6.6"])
+        self.assertEqual(threat["interfaces"], [])
+        data["host_state"]["dns"]["interfaces"] = {"Ethernet": ["6.6.6.6"], "Wi-Fi": ["8.8.8.8"]}
+        threat = next(t for t in rule_engine.analyze(data, config) if t["type"] == "DNS_TAMPER")
+        self.assertEqual(threat["interfaces"], ["Ethernet"])
+        # No allow-list configured: DNS settings are only reported
+        types = [t["type"] for t in rule_engine.analyze(data, ConfigView({}))]
+        self.assertNotIn("DNS_TAMPER", types)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from monitor.intel_feed import IntelFeed, compile_feed, merge_ranges, parse_feed_lines
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+class TestFeedParsing(unittest.TestCase):
+
+    def test_text_and_csv_lines(self):
+        lines = [
+            "# comment",
+            "1.2.3.4",
+            "10.0.0.0/30 ; inline comment",
+            "first_seen,ip,tag",
+            "2024-01-01,5.6.7.8,botnet",
+            "9.9.9.1-9.9.9.3",
+            "2001:db8::/126",
+            "garbage",
+        ]
+        entries = list(parse_feed_lines(lines))
+        self.assertIn((4, 0x01020304, 0x01020304), entries)
+        self.assertIn((4, 0x0A000000, 0x0A000003), entries)
+        self.assertIn((4, 0x05060708, 0x05060708), entries)
+        self.assertIn((4, 0x09090901, 0x09090903), entries)
+        self.assertEqual(len(entries), 5)
+
+    def test_merge_ranges(self):
+        self.assertEqual(
+            merge_ranges([(5, 10), (1, 3), (4, 4), (20, 30), (25, 26)]),
+            [[1, 10], [20, 30]],
+        )
+
+
+class TestIntelFeed(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.source = os.path.join(self.tmp, "blocklist.txt")
+        self.out = os.path.join(self.tmp, "ioc.bin")
+        _write(self.source, "1.2.3.4\n198.51.100.0/24\n2001:db8::/64\n")
+        self.feeds = []
+
+    def tearDown(self):
+        for feed in self.feeds:
+            feed.close()
+
+    def _feed(self):
+        feed = IntelFeed(self.out)
+        self.feeds.append(feed)
+        return feed
+
+    def test_compile_and_lookup(self):
+        result = compile_feed([self.source], self.out)
+        self.assertEqual((result["ipv4_ranges"], result["ipv6_ranges"]), (2, 1))
+        feed = self._feed()
+        self.assertEqual(len(feed), 3)
+        self.assertTrue(feed.contains("1.2.3.4"))
+        self.assertFalse(feed.contains("1.2.3.5"))
+        self.assertTrue(feed.contains("198.51.100.255"))
+        self.assertFalse(feed.contains("198.51.101.0"))
+        self.assertTrue(feed.contains("2001:db8::ffff"))
+        self.assertFalse(feed.contains("2001:db9::1"))
+        self.assertFalse(feed.contains("0.0.0.0"))
+        self.assertFalse(feed.contains("not-an-ip"))
+
+    def test_missing_feed_is_empty(self):
+        feed = self._feed()
+        self.assertEqual(len(feed), 0)
+        self.assertFalse(feed.contains("1.2.3.4"))
+
+    def test_corrupt_feed_is_empty(self):
+        _write(self.out, "this is not a feed")
+        feed = self._feed()
+        self.assertFalse(feed.contains("1.2.3.4"))
+        self.assertIsNotNone(feed.last_error)
+
+    def test_refresh_picks_up_recompiled_feed(self):
+        compile_feed([self.source], self.out)
+        feed = self._feed()
+        self.assertFalse(feed.refresh())
+        self.assertFalse(feed.contains("203.0.113.9"))
+
+        _write(self.source, "203.0.113.0/24\n")
+        feed.close()  # Windows cannot replace a mapped file
+        compile_feed([self.source], self.out)
+        self.assertTrue(feed.refresh())
+        self.assertTrue(feed.contains("203.0.113.9"))
+        self.assertFalse(feed.contains("1.2.3.4"))
+
+    def test_pending_feed_is_swapped_in(self):
+        compile_feed([self.source], self.out)
+        feed = self._feed()
+        _write(self.source, "203.0.113.0/24\n")
+        compile_feed([self.source], self.out + ".pending")
+        self.assertTrue(feed.refresh())
+        self.assertTrue(feed.contains("203.0.113.9"))
+        self.assertFalse(os.path.exists(self.out + ".pending"))
+
+
+if __name__ == "__main__":
+    unittest.main()
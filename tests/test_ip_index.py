@@ -0,0 +1,85 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from monitor import network_monitor
+from utils.config import ConfigView
+from utils.ip_index import IPClassifier, parse_ip, prefix_to_cidr
+
+
+class TestParsing(unittest.TestCase):
+
+    def test_parse_ipv4_and_ipv6(self):
+        self.assertEqual(parse_ip("1.2.3.4"), (4, 0x01020304))
+        self.assertEqual(parse_ip("::1"), (6, 1))
+        self.assertIsNone(parse_ip("not-an-ip"))
+
+    def test_ipv4_mapped_and_zone_id(self):
+        self.assertEqual(parse_ip("::ffff:10.0.0.1"), parse_ip("10.0.0.1"))
+        self.assertEqual(parse_ip("fe80::1%eth0")[0], 6)
+
+    def test_prefix_to_cidr(self):
+        self.assertEqual(prefix_to_cidr("13."), "13.0.0.0/8")
+        self.assertEqual(prefix_to_cidr("142.250."), "142.250.0.0/16")
+        self.assertIsNone(prefix_to_cidr("2001:db8:"))
+
+
+class TestIPClassifier(unittest.TestCase):
+
+    def setUp(self):
+        self.index = IPClassifier({
+            "private": ["10.0.0.0/8", "172.16.0.0/12"],
+            "trusted": ["13.0.0.0/8", "2001:db8::/32"],
+            "watch": ["10.1.0.0/16"],
+        })
+
+    def test_all_matching_labels_returned(self):
+        self.assertEqual(self.index.classify("10.1.2.3"), {"private", "watch"})
+        self.assertEqual(self.index.classify("10.2.0.1"), {"private"})
+
+    def test_cidr_boundaries_are_exact(self):
+        self.assertTrue(self.index.has("172.31.255.255", "private"))
+        self.assertFalse(self.index.has("172.32.0.1", "private"))
+        self.assertTrue(self.index.has("13.1.1.1", "trusted"))
+        self.assertFalse(self.index.has("130.1.1.1", "trusted"))
+
+    def test_ipv6_ranges(self):
+        self.assertTrue(self.index.has("2001:db8::5", "trusted"))
+        self.assertFalse(self.index.has("2001:db9::5", "trusted"))
+
+    def test_invalid_entries_collected(self):
+        index = IPClassifier({"x": ["300.1.1.1/8", "1.2.3.0/24"]})
+        self.assertEqual(index.invalid, [("x", "300.1.1.1/8")])
+        self.assertTrue(index.has("1.2.3.9", "x"))
+
+    def test_unparseable_address_has_no_labels(self):
+        self.assertEqual(self.index.classify("bogus"), frozenset())
+
+
+class TestConfigClassifier(unittest.TestCase):
+
+    def test_legacy_prefixes_and_safe_ips(self):
+        view = ConfigView({"trusted_ip_prefixes": ["13."], "safe_ips": ["8.8.8.8"]})
+        labels = view.ip_classifier
+        self.assertTrue(labels.has("13.5.5.5", "trusted"))
+        self.assertFalse(labels.has("130.5.5.5", "trusted"))
+        self.assertTrue(labels.has("8.8.8.8", "safe"))
+        self.assertTrue(labels.has("192.168.1.1", "private"))
+
+    def test_custom_labels(self):
+        view = ConfigView({"ip_ranges": {"tor": ["185.220.101.0/24"], "lab": ["203.0.113.0/24"]}})
+        self.assertEqual(view.ip_classifier.classify("203.0.113.7"), {"lab"})
+        self.assertTrue(view.ip_classifier.has("185.220.101.9", "tor"))
+
+
+class TestNetworkMonitorPrivate(unittest.TestCase):
+
+    def test_only_rfc1918_172_range_is_private(self):
+        self.assertTrue(network_monitor.is_private_ip("172.20.0.1"))
+        self.assertFalse(network_monitor.is_private_ip("172.217.0.1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
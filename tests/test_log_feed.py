@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "dashboard"))
+
+from log_feed import DashboardState, LogFeed
+from log_reader import LogTailer
+from tests.helpers import FakeClock
+
+
+class TestDashboardState(unittest.TestCase):
+
+    def test_threat_count_slides_with_window(self):
+        clock = FakeClock(1_000_000.0)
+        state = DashboardState(window=3600, clock=clock)
+        for i in range(5):
+            state.add_threat(clock.now + i)
+        self.assertEqual(state.threat_count, 5)
+        clock.now += 1800
+        state.add_threat(clock.now)
+        clock.now += 1900
+        self.assertEqual(state.threat_count, 1)
+
+    def test_log_lines_fallback(self):
+        state = DashboardState()
+        state.feed_log_lines([
+            "2026-01-01 00:00:00 - ML status: {'mode': 'learning', 'samples': 4, 'min_samples': 20}",
+            "2026-01-01 00:00:01 - Threat detected: {'type': 'PORT_SCAN'}",
+            "2026-01-01 00:00:02 - ML status: not a dict(",
+        ])
+        self.assertEqual(state.threat_count, 1)
+        self.assertEqual(state.ml_status["samples"], 4)
+
+
+class TestLogFeed(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.tmp, "shcs.log")
+        self.events_path = os.path.join(self.tmp, "events.jsonl")
+        open(self.log_path, "w").close()
+
+    def _log(self, *lines):
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
+
+    def _event(self, kind, **fields):
+        with open(self.events_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"ts": time.time(), "type": kind, **fields}, separators=(",", ":")) + "\n")
+
+    def _feed(self):
+        return LogFeed(log_tailer=LogTailer(self.log_path), events_path=self.events_path)
+
+    def _drain(self, feed):
+        updates = []
+        while not feed.updates.empty():
+            updates.append(feed.updates.get_nowait())
+        return updates
+
+    def test_only_new_lines_are_posted(self):
+        self._log("first")
+        feed = self._feed()
+        feed.poll()
+        self.assertEqual(self._drain(feed)[0].lines, ["first"])
+        feed.poll()
+        self.assertEqual(self._drain(feed), [])
+        self._log("second", "third")
+        feed.poll()
+        self.assertEqual(self._drain(feed)[0].lines, ["second", "third"])
+
+    def test_counters_follow_event_stream(self):
+        self._event("threat", threat={"type": "PORT_SCAN"})
+        self._event("heartbeat")
+        feed = self._feed()
+        feed.poll()
+        self.assertEqual(self._drain(feed)[-1].threat_count, 1)
+        self._event("threat", threat={"type": "BRUTE_FORCE"})
+        self._event("ml_status", mode="active", samples=30)
+        self._log("Threat detected: {'type': 'BRUTE_FORCE'}")
+        feed.poll()
+        update = self._drain(feed)[-1]
+        self.assertEqual(update.threat_count, 2)
+        self.assertEqual(update.ml_status["mode"], "active")
+
+    def test_text_log_used_without_event_stream(self):
+        feed = self._feed()
+        self._log("Threat detected: {'type': 'PORT_SCAN'}")
+        feed.poll()
+        self.assertEqual(self._drain(feed)[-1].threat_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dashboard.log_reader import LogTailer, tail_lines
+
+
+class TestLogTail(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "shcs.log")
+
+    def _append(self, text, path=None):
+        with open(path or self.path, "a", encoding="utf-8") as f:
+            f.write(text)
+
+    def _write_lines(self, start, stop):
+        self._append("".join(f"line {i}\n" for i in range(start, stop)))
+
+    def test_tail_lines_seeks_from_the_end(self):
+        self._write_lines(0, 5000)
+        self.assertEqual(tail_lines(self.path, 3, block_size=64), ["line 4997", "line 4998", "line 4999"])
+        self.assertEqual(len(tail_lines(self.path, 10000, block_size=64)), 5000)
+
+    def test_tail_lines_short_or_missing_file(self):
+        self.assertEqual(tail_lines(self.path, 5), [])
+        self._write_lines(0, 2)
+        self.assertEqual(tail_lines(self.path, 5), ["line 0", "line 1"])
+
+    def test_tailer_returns_only_new_lines(self):
+        self._write_lines(0, 1000)
+        tailer = LogTailer(self.path, max_lines=10, block_size=128)
+        self.assertEqual(tailer.read_new(), [f"line {i}" for i in range(990, 1000)])
+        self.assertEqual(tailer.read_new(), [])
+        self._write_lines(1000, 1003)
+        self.assertEqual(tailer.read_new(), ["line 1000", "line 1001", "line 1002"])
+
+    def test_partial_line_waits_for_newline(self):
+        tailer = LogTailer(self.path)
+        self._append("")
+        tailer.read_new()
+        self._append("half")
+        self.assertEqual(tailer.read_new(), [])
+        self._append(" done\n")
+        self.assertEqual(tailer.read_new(), ["half done"])
+
+    def test_truncation_restarts_from_the_beginning(self):
+        self._write_lines(0, 50)
+        tailer = LogTailer(self.path)
+        tailer.read_new()
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("fresh\n")
+        self.assertEqual(tailer.read_new(), ["fresh"])
+        self.assertEqual(tailer.truncations, 1)
+
+    def test_rotation_drains_the_rotated_file(self):
+        self._write_lines(0, 5)
+        tailer = LogTailer(self.path)
+        tailer.read_new()
+        self._write_lines(5, 7)
+        os.replace(self.path, self.path + ".1")
+        self._write_lines(7, 9)
+        self.assertEqual(tailer.read_new(), ["line 5", "line 6", "line 7", "line 8"])
+        self.assertEqual(tailer.rotations, 1)
+
+    def test_large_backlog_is_skipped(self):
+        self._write_lines(0, 10)
+        tailer = LogTailer(self.path, max_lines=5, max_read=1000)
+        tailer.read_new()
+        self._write_lines(10, 2000)
+        self.assertEqual(tailer.read_new(), [f"line {i}" for i in range(1995, 2000)])
+
+
+if __name__ == "__main__":
+    unittest.main()
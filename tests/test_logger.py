@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.logger import ROTATE_RETRY_MIN_SECONDS, AsyncLogWriter
+
+
+class TestAsyncLogWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "shcs.log")
+
+    def _writer(self, **kwargs):
+        kwargs.setdefault("console", False)
+        writer = AsyncLogWriter(self.path, **kwargs)
+        self.addCleanup(writer.close)
+        return writer
+
+    def _lines(self, path=None):
+        with open(path or self.path, encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def test_lines_written_in_order_with_timestamp(self):
+        writer = self._writer()
+        for i in range(50):
+            writer.write(f"message {i}")
+        self.assertTrue(writer.flush())
+        lines = self._lines()
+        self.assertEqual(len(lines), 50)
+        self.assertTrue(lines[0].endswith(" - message 0"))
+        self.assertRegex(lines[-1], r"^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d - message 49$")
+        self.assertEqual(writer.written, 50)
+
+    def test_rotates_by_size(self):
+        writer = self._writer(max_bytes=200, backup_count=2, flush_policy="batch")
+        for i in range(20):
+            writer.write("x" * 40)
+            writer.flush()
+        self.assertTrue(os.path.exists(self.path + ".1"))
+        self.assertTrue(os.path.exists(self.path + ".2"))
+        self.assertFalse(os.path.exists(self.path + ".3"))
+        self.assertLessEqual(os.path.getsize(self.path), 200 + 64)
+
+    def test_rotates_by_age(self):
+        writer = self._writer(max_age=3600)
+        writer.write("old")
+        writer.flush()
+        writer._opened_at -= 7200
+        writer.write("new")
+        writer.flush()
+        self.assertTrue(self._lines(self.path + ".1")[0].endswith("old"))
+        self.assertTrue(self._lines()[0].endswith("new"))
+
+    def test_failed_rotation_keeps_writing_and_backs_off(self):
+        writer = self._writer(max_bytes=100, backup_count=1, flush_policy="batch")
+        with patch("utils.logger.os.replace", side_effect=PermissionError("in use")) as replace:
+            for i in range(20):
+                writer.write(f"line {i:02d} " + "x" * 30)
+                writer.flush()
+        self.assertEqual(writer.written, 20)
+        self.assertEqual(len(self._lines()), 20)
+        self.assertEqual(replace.call_count, 1)   # retried only after the back-off
+        self.assertIn("rotation failed", writer.last_error)
+        self.assertGreaterEqual(writer._rotate_backoff, ROTATE_RETRY_MIN_SECONDS)
+
+        writer._rotate_retry_at = 0.0
+        writer.write("after")
+        writer.flush()
+        self.assertEqual(len(self._lines(self.path + ".1")), 20)
+        self.assertTrue(self._lines()[0].endswith("after"))
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        writer = self._writer(queue_size=1)
+        for i in range(1000):
+            writer.write(f"burst {i}")
+        writer.flush()
+        self.assertEqual(writer.dropped + writer.written, 1000)
+
+    def test_unwritable_path_does_not_raise(self):
+        writer = AsyncLogWriter(os.path.join(self.tmp, "missing", "shcs.log"), console=False)
+        self.addCleanup(writer.close)
+        writer.write("lost")
+        self.assertTrue(writer.flush())
+        self.assertIsNotNone(writer.last_error)
+
+
+if __name__ == "__main__":
+    unittest.main()
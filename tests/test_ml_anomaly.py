@@ -2,6 +2,7 @@ import os
 import random
 import sys
 import tempfile
+import threading
 import unittest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -70,6 +71,7 @@ class TestAnomalyDetectorActiveMode(unittest.TestCase):
     def _fill_baseline(self, n=25):
         for _ in range(n):
             self.detector.collect(_normal_sample())
+        self.assertTrue(self.detector.wait_for_training(timeout=30))
 
     def test_status_mode_is_active_after_min_samples(self):
         self._fill_baseline()
@@ -99,6 +101,63 @@ class TestAnomalyDetectorActiveMode(unittest.TestCase):
         self.assertLessEqual(len(detector.data_buffer), 30)
 
 
+class TestAnomalyDetectorBackgroundTraining(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.detector = _make_detector(self.tmp)
+
+    def test_collect_does_not_wait_for_fit(self):
+        release = threading.Event()
+        fit = self.detector._fit
+
+        def slow_fit(X):
+            release.wait(10)
+            fit(X)
+
+        self.detector._fit = slow_fit
+        for _ in range(25):
+            self.detector.collect(_normal_sample())
+        self.assertTrue(self.detector.training)
+        self.assertTrue(self.detector.get_status()["training"])
+        # No model yet: predict answers immediately instead of blocking
+        self.assertFalse(self.detector.predict(_ANOMALY))
+        self.assertEqual(self.detector.get_status()["mode"], "learning")
+        release.set()
+        self.assertTrue(self.detector.wait_for_training(timeout=30))
+        self.assertIsNotNone(self.detector.model)
+        self.assertEqual(self.detector.get_status()["mode"], "active")
+
+    def test_fit_uses_a_snapshot_of_the_window(self):
+        seen = []
+        self.detector._fit = lambda X: seen.append(X)
+        for _ in range(20):
+            self.detector.collect(_normal_sample())
+        self.detector.wait_for_training(timeout=30)
+        self.detector.collect(_ANOMALY)
+        self.assertEqual(seen[0].shape, (20, 8))
+        self.assertNotIn(_ANOMALY[2], seen[0][:, 2])
+
+    def test_status_reports_training_time(self):
+        status = self.detector.get_status()
+        self.assertIsNone(status["last_trained"])
+        for _ in range(20):
+            self.detector.collect(_normal_sample())
+        self.detector.wait_for_training(timeout=30)
+        status = self.detector.get_status()
+        self.assertFalse(status["training"])
+        self.assertIsNotNone(status["last_trained"])
+        self.assertGreater(status["training_seconds"], 0)
+
+    def test_synchronous_mode(self):
+        detector = AnomalyDetector(
+            model_path=os.path.join(self.tmp, "sync.pkl"), min_samples=20, background=False,
+        )
+        for _ in range(20):
+            detector.collect(_normal_sample())
+        self.assertIsNotNone(detector.model)
+
+
 class TestAnomalyDetectorPersistence(unittest.TestCase):
 
     def test_model_save_and_load(self):
@@ -108,8 +167,10 @@ class TestAnomalyDetectorPersistence(unittest.TestCase):
         d1 = AnomalyDetector(model_path=model_path, min_samples=20)
         for _ in range(25):
             d1.collect(_normal_sample())
+        self.assertTrue(d1.wait_for_training(timeout=30))
         self.assertIsNotNone(d1.model)
         self.assertTrue(os.path.exists(model_path))
+        self.assertFalse(os.path.exists(model_path + ".tmp"))
 
         d2 = AnomalyDetector(model_path=model_path, min_samples=20)
         self.assertIsNotNone(d2.model)
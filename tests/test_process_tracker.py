@@ -0,0 +1,172 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from detection import rule_engine
+from monitor import process_monitor
+from monitor.process_tracker import ProcessTracker
+from utils.config import ConfigView
+
+
+class _FakeProcess:
+    """Stand-in for psutil.Process with scripted cpu readings."""
+
+    def __init__(self, pid, name, create_time=1.0, cpu=0.0, rss=1000):
+        self.pid = pid
+        self._name = name
+        self._create_time = create_time
+        self.cpu = cpu
+        self.rss = rss
+        self.alive = True
+
+    def name(self):
+        return self._name
+
+    def create_time(self):
+        return self._create_time
+
+    def is_running(self):
+        return self.alive
+
+    def oneshot(self):
+        return MagicMock(__enter__=lambda s: s, __exit__=lambda s, *a: False)
+
+    def cpu_percent(self, interval=None):
+        return self.cpu
+
+    def memory_info(self):
+        return MagicMock(rss=self.rss)
+
+
+class _FakeTable:
+
+    def __init__(self):
+        self.procs = {}
+
+    def add(self, proc):
+        self.procs[proc.pid] = proc
+
+    def pids(self):
+        return list(self.procs)
+
+    def process(self, pid):
+        return self.procs[pid]
+
+
+class _PatchedTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.table = _FakeTable()
+        patcher = patch("monitor.process_tracker.psutil")
+        mock_psutil = patcher.start()
+        self.addCleanup(patcher.stop)
+        mock_psutil.pids.side_effect = self.table.pids
+        mock_psutil.Process.side_effect = self.table.process
+        mock_psutil.NoSuchProcess = type("NoSuchProcess", (Exception,), {})
+        mock_psutil.AccessDenied = type("AccessDenied", (Exception,), {})
+        mock_psutil.ZombieProcess = type("ZombieProcess", (Exception,), {})
+
+
+class TestProcessTracker(_PatchedTestCase):
+
+    def test_diff_reports_spawned_exited_and_changed(self):
+        tracker = ProcessTracker(cpu_tolerance=5.0)
+        a = _FakeProcess(10, "a.exe")
+        b = _FakeProcess(11, "b.exe")
+        self.table.add(a)
+        self.table.add(b)
+
+        diff = tracker.update()
+        self.assertEqual({t.pid for t in diff.spawned}, {10, 11})
+
+        diff = tracker.update()
+        self.assertEqual((diff.spawned, diff.exited, diff.changed), ([], [], []))
+
+        a.cpu = 50.0
+        del self.table.procs[11]
+        self.table.add(_FakeProcess(12, "c.exe"))
+        diff = tracker.update()
+        self.assertEqual([t.pid for t in diff.spawned], [12])
+        self.assertEqual([t.pid for t in diff.exited], [11])
+        self.assertEqual([t.pid for t in diff.changed], [10])
+        self.assertEqual(diff.changed[0].cpu_delta, 50.0)
+
+    def test_slow_drift_is_eventually_reported(self):
+        tracker = ProcessTracker(cpu_tolerance=5.0)
+        proc = _FakeProcess(10, "a.exe")
+        self.table.add(proc)
+        tracker.update()
+        changed = 0
+        for cpu in (2.0, 4.0, 6.0):
+            proc.cpu = cpu
+            changed += len(tracker.update().changed)
+        self.assertEqual(changed, 1)
+
+    def test_reused_pid_is_new_process(self):
+        tracker = ProcessTracker()
+        old = _FakeProcess(10, "old.exe", create_time=1.0)
+        self.table.add(old)
+        tracker.update()
+        old.alive = False
+        self.table.add(_FakeProcess(10, "new.exe", create_time=2.0))
+        diff = tracker.update()
+        self.assertEqual([t.key for t in diff.exited], [(10, 1.0)])
+        self.assertEqual([t.key for t in diff.spawned], [(10, 2.0)])
+
+
+class TestProcessMonitor(_PatchedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        process_monitor._tracker = ProcessTracker()
+        process_monitor._signature_matches.clear()
+        process_monitor._flagged.clear()
+        process_monitor._config_version = None
+        self.config = ConfigView({"process_blacklist": ["xmrig"]})
+
+    def test_blacklisted_and_high_cpu_processes_flagged(self):
+        self.table.add(_FakeProcess(20, "XMRig.exe"))
+        busy = _FakeProcess(21, "busy.exe")
+        self.table.add(busy)
+        self.table.add(_FakeProcess(4, "System", cpu=99.0))
+        result = process_monitor.get_suspicious_processes(self.config)
+        self.assertEqual([p["pid"] for p in result], [20])
+
+        busy.cpu = 95.0
+        result = process_monitor.get_suspicious_processes(self.config)
+        self.assertEqual(sorted(p["pid"] for p in result), [20, 21])
+
+        busy.cpu = 5.0
+        result = process_monitor.get_suspicious_processes(self.config)
+        self.assertEqual([p["pid"] for p in result], [20])
+
+    def test_cpu_only_hits_are_marked_and_own_process_skipped(self):
+        busy = _FakeProcess(21, "cl.exe", cpu=95.0)
+        self.table.add(busy)
+        self.table.add(_FakeProcess(os.getpid(), "python.exe", cpu=99.0))
+        self.table.add(_FakeProcess(20, "XMRig.exe", cpu=99.0))
+        result = {p["pid"]: p for p in process_monitor.get_suspicious_processes(self.config)}
+        self.assertEqual(sorted(result), [20, 21])
+        self.assertTrue(result[21]["high_cpu"])
+        self.assertNotIn("high_cpu", result[20])
+
+        threats = {t["pid"]: t for t in rule_engine.analyze(
+            {"processes": list(result.values()), "host_state": {}}, self.config
+        )}
+        self.assertEqual(threats[21]["type"], "HIGH_CPU_PROCESS")
+        self.assertEqual(threats[21]["severity"], "MEDIUM")
+        self.assertEqual(threats[20]["type"], "MALICIOUS_PROCESS")
+
+    def test_unchanged_processes_not_rematched(self):
+        self.table.add(_FakeProcess(30, "calc.exe"))
+        process_monitor.get_suspicious_processes(self.config)
+        with patch("monitor.process_monitor._examine") as mock_examine:
+            process_monitor.get_suspicious_processes(self.config)
+        mock_examine.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
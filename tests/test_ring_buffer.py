@@ -0,0 +1,57 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from detection.ring_buffer import RingBuffer
+
+
+class TestRingBuffer(unittest.TestCase):
+
+    def test_view_is_ordered_before_and_after_wrap(self):
+        buf = RingBuffer(4, 2)
+        self.assertEqual(buf.view().shape, (0, 2))
+        for i in range(3):
+            buf.append([i, -i])
+        np.testing.assert_array_equal(buf.view()[:, 0], [0, 1, 2])
+        for i in range(3, 10):
+            buf.append([i, -i])
+        self.assertEqual(len(buf), 4)
+        np.testing.assert_array_equal(buf.view(), [[6, -6], [7, -7], [8, -8], [9, -9]])
+
+    def test_view_is_contiguous_and_not_a_copy(self):
+        buf = RingBuffer(5, 3)
+        for i in range(12):
+            buf.append([i] * 3)
+        view = buf.view()
+        self.assertTrue(view.flags.c_contiguous)
+        self.assertIs(view.base, buf._data)
+        self.assertEqual(view.dtype, np.float64)
+        with self.assertRaises(ValueError):
+            view[0, 0] = 1.0
+
+    def test_append_does_not_allocate(self):
+        buf = RingBuffer(3, 1)
+        storage = buf._data
+        for i in range(100):
+            buf.append([i])
+        self.assertIs(buf._data, storage)
+
+    def test_clear(self):
+        buf = RingBuffer(3, 1)
+        buf.append([1])
+        buf.clear()
+        self.assertEqual(len(buf), 0)
+        buf.append([2])
+        np.testing.assert_array_equal(buf.view(), [[2]])
+
+    def test_invalid_capacity(self):
+        with self.assertRaises(ValueError):
+            RingBuffer(0, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from monitor.scheduler import Collector, CollectorScheduler
+
+
+class TestCollectorScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.schedulers = []
+
+    def tearDown(self):
+        for scheduler in self.schedulers:
+            scheduler.shutdown()
+
+    def _scheduler(self, collectors, **kwargs):
+        scheduler = CollectorScheduler(collectors, **kwargs)
+        self.schedulers.append(scheduler)
+        return scheduler
+
+    def test_collectors_run_concurrently(self):
+        def slow():
+            time.sleep(0.2)
+            return 1
+
+        scheduler = self._scheduler(
+            [Collector(f"c{i}", slow, timeout=1.0) for i in range(4)], max_workers=4
+        )
+        start = time.monotonic()
+        result = scheduler.run_cycle()
+        elapsed = time.monotonic() - start
+        self.assertEqual(result, {"c0": 1, "c1": 1, "c2": 1, "c3": 1})
+        self.assertLess(elapsed, 0.6)
+
+    def test_late_collector_returns_previous_value(self):
+        release = threading.Event()
+
+        def blocked():
+            release.wait(2)
+            return "fresh"
+
+        scheduler = self._scheduler([
+            Collector("slow", blocked, timeout=0.05, default="stale"),
+            Collector("fast", lambda: "ok"),
+        ])
+        result = scheduler.run_cycle()
+        self.assertEqual(result, {"slow": "stale", "fast": "ok"})
+        self.assertEqual(scheduler.last_late, ("slow",))
+
+        release.set()
+        time.sleep(0.05)
+        result = scheduler.run_cycle()
+        self.assertEqual(result["slow"], "fresh")
+
+    def test_interval_skips_collector_until_due(self):
+        calls = []
+        now = [0.0]
+        scheduler = self._scheduler(
+            [Collector("events", lambda: calls.append(1) or len(calls), interval=10)],
+            clock=lambda: now[0],
+        )
+        scheduler.run_cycle()
+        now[0] = 5.0
+        result = scheduler.run_cycle()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(result["events"], 1)
+        now[0] = 10.0
+        scheduler.run_cycle()
+        self.assertEqual(len(calls), 2)
+
+    def test_errors_keep_previous_value(self):
+        state = {"fail": False}
+
+        def flaky():
+            if state["fail"]:
+                raise RuntimeError("boom")
+            return 42
+
+        scheduler = self._scheduler([Collector("flaky", flaky)])
+        scheduler.run_cycle()
+        state["fail"] = True
+        result = scheduler.run_cycle()
+        self.assertEqual(result["flaky"], 42)
+        self.assertIn("boom", scheduler.last_errors["flaky"])
+        self.assertEqual(scheduler.stats()["flaky"]["errors"], 1)
+
+    def test_configure_overrides_interval(self):
+        collector = Collector("c", lambda: 1)
+        scheduler = self._scheduler([collector])
+        scheduler.configure({"c": {"interval": 7, "timeout": 1.5}, "max_workers": 2})
+        self.assertEqual(collector.interval, 7)
+        self.assertEqual(collector.timeout, 1.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,6 +6,13 @@ from unittest.mock import patch, MagicMock
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from response import self_heal
+from utils.config import ConfigView
+
+ALL_THREAT_TYPES = (
+    "MALICIOUS_PROCESS", "SUSPICIOUS_IP", "HIGH_CPU", "HIGH_MEMORY", "BRUTE_FORCE",
+    "ML_ANOMALY", "PORT_SCAN", "DATA_EXFILTRATION", "SUSPICIOUS_PORT", "DNS_TAMPER",
+    "FIREWALL_DISABLED", "HIGH_CPU_PROCESS",
+)
 
 
 class TestSelfHeal(unittest.TestCase):
@@ -13,6 +20,7 @@ class TestSelfHeal(unittest.TestCase):
     def setUp(self):
         # Reset shared state before each test
         self_heal.BLOCKED_IPS.clear()
+        self_heal.shutdown()
 
     @patch("response.self_heal.subprocess.run")
     @patch("response.self_heal.log_event")
@@ -33,6 +41,7 @@ class TestSelfHeal(unittest.TestCase):
     @patch("response.self_heal.log_event")
     def test_heal_suspicious_ip(self, mock_log, mock_run):
         self_heal.heal({"type": "SUSPICIOUS_IP", "ip": "1.2.3.4"})
+        self.assertTrue(self_heal.flush_blocks(timeout=5))
         mock_run.assert_called_once()
         call_args = mock_run.call_args[0][0]
         self.assertTrue(any("1.2.3.4" in str(a) for a in call_args))
@@ -42,6 +51,7 @@ class TestSelfHeal(unittest.TestCase):
     @patch("response.self_heal.log_event")
     def test_heal_suspicious_ip_skips_safe_ip(self, mock_log, mock_run):
         self_heal.heal({"type": "SUSPICIOUS_IP", "ip": "127.0.0.1"})
+        self.assertTrue(self_heal.flush_blocks(timeout=5))
         mock_run.assert_not_called()
 
     @patch("response.self_heal.subprocess.run")
@@ -49,8 +59,27 @@ class TestSelfHeal(unittest.TestCase):
     def test_heal_suspicious_ip_no_duplicate_block(self, mock_log, mock_run):
         self_heal.heal({"type": "SUSPICIOUS_IP", "ip": "5.5.5.5"})
         self_heal.heal({"type": "SUSPICIOUS_IP", "ip": "5.5.5.5"})
+        self.assertTrue(self_heal.flush_blocks(timeout=5))
         self.assertEqual(mock_run.call_count, 1)
 
+    @patch("response.self_heal.subprocess.run")
+    @patch("response.self_heal.log_event")
+    def test_burst_coalesced_into_one_rule(self, mock_log, mock_run):
+        for i in range(1, 6):
+            self_heal.heal({"type": "PORT_SCAN", "ip": f"203.0.113.{i}"})
+        self.assertTrue(self_heal.flush_blocks(timeout=5))
+        mock_run.assert_called_once()
+        remoteip = next(a for a in mock_run.call_args[0][0] if a.startswith("remoteip="))
+        self.assertEqual(remoteip, "remoteip=" + ",".join(f"203.0.113.{i}" for i in range(1, 6)))
+        self.assertEqual(self_heal.block_stats()["queue_depth"], 0)
+
+    @patch("response.self_heal.subprocess.run")
+    @patch("response.self_heal.log_event")
+    def test_high_cpu_process_is_not_killed(self, mock_log, mock_run):
+        self_heal.heal({"type": "HIGH_CPU_PROCESS", "pid": 9999, "detail": "cl.exe (PID 9999) using 97% CPU"})
+        mock_run.assert_not_called()
+        self.assertIn("cl.exe", mock_log.call_args[0][0])
+
     @patch("response.self_heal.log_event")
     def test_heal_high_cpu(self, mock_log):
         self_heal.heal({"type": "HIGH_CPU"})
@@ -72,6 +101,87 @@ class TestSelfHeal(unittest.TestCase):
         args = mock_log.call_args[0][0]
         self.assertIn("BRUTE", args.upper())
 
+    @patch("response.self_heal.emit_event")
+    @patch("response.self_heal.subprocess.run")
+    @patch("response.self_heal.log_event")
+    def test_heal_every_threat_type(self, mock_log, mock_run, mock_emit):
+        config = ConfigView({"host_probes": {"allowed_dns_servers": ["10.0.0.53"]}})
+        block = ["netsh", "advfirewall", "firewall", "add", "rule"]
+        # threat type -> (first command run, or None; text expected in the last log line)
+        expected = {
+            "MALICIOUS_PROCESS": (["taskkill", "/PID", "9999", "/F"], "9999"),
+            "SUSPICIOUS_IP": (block, "198.51.100.7"),
+            "PORT_SCAN": (block, "198.51.100.7"),
+            "SUSPICIOUS_PORT": (block, "4444"),
+            "DNS_TAMPER": (["netsh", "interface", "ip", "set", "dns", "name=Ethernet", "static", "10.0.0.53"],
+                           "DNS"),
+            "FIREWALL_DISABLED": (["netsh", "advfirewall", "set", "allprofiles", "state", "on"], "Firewall"),
+            "HIGH_CPU": (None, "CPU"),
+            "HIGH_MEMORY": (None, "memory"),
+            "BRUTE_FORCE": (None, "Brute force"),
+            "ML_ANOMALY": (None, "ML anomaly"),
+            "DATA_EXFILTRATION": (None, "exfiltration"),
+            "HIGH_CPU_PROCESS": (None, "High CPU process"),
+        }
+        self.assertEqual(set(expected), set(ALL_THREAT_TYPES))
+        for kind, (command, logged) in expected.items():
+            with self.subTest(kind=kind), patch("response.self_heal.get_config", return_value=config):
+                self.setUp()
+                mock_run.reset_mock()
+                mock_log.reset_mock()
+                self_heal.heal({
+                    "type": kind, "pid": 9999, "ip": "198.51.100.7", "port": 4444,
+                    "interfaces": ["Ethernet"], "severity": "HIGH", "detail": "x",
+                })
+                self.assertTrue(self_heal.flush_blocks(timeout=5))
+                if command is None:
+                    mock_run.assert_not_called()
+                else:
+                    args = mock_run.call_args_list[0][0][0]
+                    self.assertEqual(args[:len(command)], command)
+                    if command is block:
+                        self.assertIn("remoteip=198.51.100.7", args)
+                logs = [c[0][0] for c in mock_log.call_args_list]
+                self.assertTrue(any(logged in line for line in logs), logs)
+
+    @patch("response.self_heal.emit_event")
+    @patch("response.self_heal.subprocess.run")
+    @patch("response.self_heal.log_event")
+    def test_dns_reset_uses_allowed_servers(self, mock_log, mock_run, mock_emit):
+        config = ConfigView({"host_probes": {"allowed_dns_servers": ["10.0.0.53", "9.9.9.9"]}})
+        with patch("response.self_heal.get_config", return_value=config):
+            self_heal.heal({"type": "DNS_TAMPER", "interfaces": ["Ethernet"]})
+        self.assertEqual([c[0][0] for c in mock_run.call_args_list], [
+            ["netsh", "interface", "ip", "set", "dns", "name=Ethernet", "static", "10.0.0.53"],
+            ["netsh", "interface", "ip", "add", "dns", "name=Ethernet", "9.9.9.9", "index=2"],
+        ])
+        self.assertEqual(mock_run.call_args.kwargs["timeout"], self_heal._REPAIR_TIMEOUT)
+        mock_emit.assert_called_once_with(
+            "heal", action="reset_dns", interface="Ethernet", servers=["10.0.0.53", "9.9.9.9"]
+        )
+
+    @patch("response.self_heal.emit_event")
+    @patch("response.self_heal.subprocess.run")
+    @patch("response.self_heal.log_event")
+    def test_repairs_emit_heal_events(self, mock_log, mock_run, mock_emit):
+        config = ConfigView({"host_probes": {"allowed_dns_servers": ["10.0.0.53"]}})
+        with patch("response.self_heal.get_config", return_value=config):
+            self_heal.heal({"type": "DNS_TAMPER", "interfaces": ["Ethernet", "Wi-Fi"]})
+        self_heal.heal({"type": "FIREWALL_DISABLED"})
+        self.assertEqual(
+            [(c[0][0], c[1]["action"], c[1].get("interface")) for c in mock_emit.call_args_list],
+            [("heal", "reset_dns", "Ethernet"), ("heal", "reset_dns", "Wi-Fi"),
+             ("heal", "enable_firewall", None)],
+        )
+
+    @patch("response.self_heal.emit_event")
+    @patch("response.self_heal.subprocess.run", side_effect=FileNotFoundError("netsh"))
+    @patch("response.self_heal.log_event")
+    def test_failed_firewall_repair_is_reported(self, mock_log, mock_run, mock_emit):
+        self_heal.heal({"type": "FIREWALL_DISABLED"})
+        self.assertEqual(mock_emit.call_args[1]["action"], "enable_firewall_failed")
+        self.assertIn("Failed", mock_log.call_args[0][0])
+
     @patch("response.self_heal.log_event")
     def test_heal_unknown_type_no_crash(self, mock_log):
         self_heal.heal({"type": "UNKNOWN_THREAT"})
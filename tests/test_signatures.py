@@ -0,0 +1,54 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from monitor.signatures import SignatureMatcher
+
+
+class TestSignatureMatcher(unittest.TestCase):
+
+    def test_name_substring_match_is_case_insensitive(self):
+        matcher = SignatureMatcher({"name": ["xmrig", "miner"]})
+        self.assertEqual(matcher.match("XMRig.exe"), [("name", "xmrig")])
+        self.assertEqual(matcher.match("notepad.exe"), [])
+
+    def test_overlapping_patterns_all_reported(self):
+        matcher = SignatureMatcher({"name": ["he", "she", "his", "hers"]})
+        self.assertEqual(
+            matcher.match("ushers"),
+            [("name", "he"), ("name", "she"), ("name", "hers")],
+        )
+
+    def test_patterns_only_match_their_own_field(self):
+        matcher = SignatureMatcher({
+            "name": ["nc.exe"],
+            "exe": ["\\temp\\"],
+            "cmdline": ["stratum+tcp://"],
+        })
+        self.assertEqual(
+            matcher.match("svchost.exe", "C:\\Windows\\svchost.exe", "nc.exe -l"),
+            [],
+        )
+        self.assertEqual(
+            matcher.match("a.exe", "C:\\Temp\\a.exe", "a.exe -o stratum+tcp://pool:3333"),
+            [("exe", "\\temp\\"), ("cmdline", "stratum+tcp://")],
+        )
+
+    def test_match_does_not_span_fields(self):
+        matcher = SignatureMatcher({"cmdline": ["exefoo"]})
+        self.assertEqual(matcher.match("a.exe", "", "foo"), [])
+
+    def test_large_signature_set(self):
+        patterns = [f"tool{i:04d}" for i in range(5000)]
+        matcher = SignatureMatcher({"name": patterns})
+        self.assertEqual(len(matcher), 5000)
+        self.assertEqual(matcher.match("x-tool4321-y.exe"), [("name", "tool4321")])
+
+    def test_empty_matcher(self):
+        self.assertEqual(SignatureMatcher({}).match("xmrig"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from dashboard.status_reader import StatusReader, is_live
+from utils.status_block import SIZE, StatusBlock
+
+
+class TestStatusBlock(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "status.bin")
+        self.block = StatusBlock(self.path)
+        self.addCleanup(self.block.close)
+        self.reader = StatusReader(self.path)
+        self.addCleanup(self.reader.close)
+
+    def test_round_trip(self):
+        self.block.publish(
+            {"updated": 123.5, "pid": 42, "running": True, "ml_mode": "learning",
+             "ml_samples": 7, "ml_min_samples": 20, "cpu": 12.5, "block_queue": 3},
+            {"PORT_SCAN": 4, "BRUTE_FORCE": 1},
+        )
+        status = self.reader.read()
+        self.assertEqual(status["pid"], 42)
+        self.assertTrue(status["running"])
+        self.assertEqual(status["ml_mode"], "learning")
+        self.assertEqual((status["ml_samples"], status["ml_min_samples"]), (7, 20))
+        self.assertEqual(status["cpu"], 12.5)
+        self.assertEqual(status["block_queue"], 3)
+        self.assertEqual(status["threats"], {"PORT_SCAN": 4, "BRUTE_FORCE": 1})
+        self.assertEqual(os.path.getsize(self.path), SIZE)
+
+    def test_reader_sees_later_updates_through_same_mapping(self):
+        self.block.publish({"cycles": 1})
+        self.assertEqual(self.reader.read()["cycles"], 1)
+        self.block.publish({"cycles": 2})
+        self.assertEqual(self.reader.read()["cycles"], 2)
+
+    def test_reopened_block_keeps_even_sequence(self):
+        self.block.publish({"cycles": 5})
+        self.block.close()
+        block = StatusBlock(self.path)
+        self.addCleanup(block.close)
+        block.publish({"cycles": 6})
+        self.assertEqual(self.reader.read()["cycles"], 6)
+
+    def test_concurrent_reads_are_consistent(self):
+        stop = threading.Event()
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                i += 1
+                self.block.publish({"cycles": i, "connections": i, "processes": i})
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(2000):
+                status = self.reader.read()
+                if status is not None:
+                    self.assertEqual(status["cycles"], status["connections"])
+                    self.assertEqual(status["cycles"], status["processes"])
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_missing_file_and_liveness(self):
+        self.assertIsNone(StatusReader(os.path.join(self.tmp, "none.bin")).read())
+        now = time.time()
+        self.assertTrue(is_live({"running": True, "updated": now - 5}, now))
+        self.assertFalse(is_live({"running": True, "updated": now - 600}, now))
+        self.assertFalse(is_live({"running": False, "updated": now}, now))
+        self.assertFalse(is_live(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
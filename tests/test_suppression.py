@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from detection.suppression import ThreatSuppressor
+from tests.helpers import FakeClock
+
+
+def _ip_threat(ip="1.2.3.4", severity="MEDIUM"):
+    return {"type": "SUSPICIOUS_IP", "severity": severity, "ip": ip}
+
+
+class TestThreatSuppressor(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock(1000.0)
+        self.suppressor = ThreatSuppressor(window=60, clock=self.clock)
+
+    def test_repeats_within_window_are_collapsed(self):
+        self.assertEqual(len(self.suppressor.filter([_ip_threat()])), 1)
+        for _ in range(10):
+            self.clock.now += 5
+            self.assertEqual(self.suppressor.filter([_ip_threat()]), [])
+        self.assertEqual(self.suppressor.stats(), {"passed": 1, "suppressed": 10, "active": 1})
+
+    def test_repeat_after_window_carries_count(self):
+        self.suppressor.filter([_ip_threat()])
+        for _ in range(12):
+            self.clock.now += 5
+            passed = self.suppressor.filter([_ip_threat()])
+        self.assertEqual(len(passed), 1)
+        self.assertEqual(passed[0]["count"], 12)
+        self.assertEqual(passed[0]["first_seen"], 1000.0)
+        self.assertEqual(passed[0]["last_seen"], 1060.0)
+
+    def test_escalation_passes_immediately(self):
+        self.suppressor.filter([_ip_threat()])
+        self.clock.now += 5
+        passed = self.suppressor.filter([_ip_threat(severity="HIGH")])
+        self.assertEqual([t["severity"] for t in passed], ["HIGH"])
+        self.clock.now += 5
+        self.assertEqual(self.suppressor.filter([_ip_threat(severity="MEDIUM")]), [])
+
+    def test_keys_distinguish_ip_pid_and_port(self):
+        threats = [
+            _ip_threat("1.1.1.1"),
+            _ip_threat("2.2.2.2"),
+            {"type": "MALICIOUS_PROCESS", "severity": "CRITICAL", "pid": 10},
+            {"type": "MALICIOUS_PROCESS", "severity": "CRITICAL", "pid": 11},
+            {"type": "SUSPICIOUS_PORT", "severity": "HIGH", "ip": "1.1.1.1", "port": 4444},
+        ]
+        self.assertEqual(len(self.suppressor.filter(threats)), 5)
+        self.assertEqual(self.suppressor.filter(threats), [])
+
+    def test_idle_keys_are_forgotten(self):
+        self.suppressor.filter([_ip_threat()])
+        self.clock.now += 61
+        self.suppressor.filter([])
+        self.assertEqual(len(self.suppressor), 0)
+
+    def test_input_threats_not_modified(self):
+        threat = _ip_threat()
+        self.suppressor.filter([threat])
+        self.assertNotIn("count", threat)
+
+
+if __name__ == "__main__":
+    unittest.main()
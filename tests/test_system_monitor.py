@@ -0,0 +1,73 @@
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from monitor.system_monitor import SystemSampler
+
+
+class TestSystemSampler(unittest.TestCase):
+
+    def _sampler(self, cpu_values, buffer_size=100):
+        cpu_iter = iter(cpu_values)
+
+        def cpu_percent(interval=None, percpu=False):
+            self.assertIsNone(interval)
+            if percpu:
+                return [1.0, 2.0]
+            return next(cpu_iter, 0.0)
+
+        patcher = patch("monitor.system_monitor.psutil")
+        mock_psutil = patcher.start()
+        self.addCleanup(patcher.stop)
+        mock_psutil.cpu_percent.side_effect = cpu_percent
+        mock_psutil.virtual_memory.return_value = MagicMock(percent=40.0)
+        # The first reading primes psutil and is discarded
+        return SystemSampler(interval=0.01, buffer_size=buffer_size)
+
+    def test_empty_sampler_returns_no_stats(self):
+        sampler = self._sampler([0.0])
+        self.assertEqual(sampler.stats(), {})
+
+    def test_stats_report_mean_max_and_p95(self):
+        values = [0.0] + [10.0] * 19 + [100.0]
+        sampler = self._sampler(values)
+        for _ in range(20):
+            sampler.sample_once()
+        stats = sampler.stats()
+        self.assertEqual(stats["samples"], 20)
+        self.assertAlmostEqual(stats["cpu"], (10.0 * 19 + 100.0) / 20)
+        self.assertEqual(stats["cpu_max"], 100.0)
+        self.assertEqual(stats["cpu_p95"], 10.0)
+        self.assertEqual(stats["cpu_latest"], 100.0)
+        self.assertEqual(stats["memory"], 40.0)
+        self.assertEqual(stats["per_core"], [1.0, 2.0])
+
+    def test_ring_buffer_is_bounded(self):
+        sampler = self._sampler([0.0] + [5.0] * 50, buffer_size=10)
+        for _ in range(50):
+            sampler.sample_once()
+        self.assertEqual(sampler.stats()["samples"], 10)
+
+    @patch("monitor.system_monitor.time.monotonic")
+    def test_window_limits_samples(self, mock_time):
+        sampler = self._sampler([0.0, 90.0, 10.0, 20.0])
+        for t in (0.0, 10.0, 11.0):
+            mock_time.return_value = t
+            sampler.sample_once()
+        stats = sampler.stats(window=5)
+        self.assertEqual(stats["samples"], 2)
+        self.assertEqual(stats["cpu_max"], 20.0)
+
+    def test_background_thread_starts_and_stops(self):
+        sampler = self._sampler([0.0] + [1.0] * 1000)
+        sampler.start()
+        self.assertTrue(sampler.running)
+        sampler.stop()
+        self.assertFalse(sampler.running)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,18 @@
 import os
 import sys
+import tempfile
 import unittest
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+from monitor.intel_feed import compile_feed
 from monitor.threat_intel import (
     KNOWN_MALICIOUS_PORTS,
     SUSPICIOUS_PORTS,
     TOR_EXIT_NODE_PREFIXES,
     check_connection_threat,
 )
+from utils.config import ConfigView
 
 
 class TestKnownMaliciousPorts(unittest.TestCase):
@@ -71,5 +74,20 @@ class TestSpecificValues(unittest.TestCase):
         self.assertEqual(check_connection_threat("203.0.113.5", 3389), "LOW")
 
 
+class TestIntelFeedLookup(unittest.TestCase):
+
+    def test_feed_listed_ip_returns_high(self):
+        tmp = tempfile.mkdtemp()
+        source = os.path.join(tmp, "iocs.txt")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write("203.0.113.0/24\n")
+        feed_path = os.path.join(tmp, "ioc.bin")
+        compile_feed([source], feed_path)
+        config = ConfigView({"threat_intel": {"feed_path": feed_path}})
+
+        self.assertEqual(check_connection_threat("203.0.113.7", 443, config), "HIGH")
+        self.assertIsNone(check_connection_threat("203.0.114.7", 443, config))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -81,6 +81,18 @@ class TestTrafficMonitor(unittest.TestCase):
         result = monitor.get_traffic_delta()
         self.assertEqual(result["total_connections"], 0)
 
+    @patch("monitor.traffic_monitor.psutil.net_io_counters")
+    @patch("monitor.traffic_monitor.psutil.net_connections")
+    @patch("monitor.traffic_monitor.time.time")
+    def test_snapshot_size_used_without_enumerating(self, mock_time, mock_conns, mock_counters):
+        mock_time.return_value = 0.0
+        mock_counters.return_value = _FakeCounters(0, 0, 0, 0)
+        monitor = TrafficMonitor()
+        mock_time.return_value = 1.0
+        result = monitor.get_traffic_delta(snapshot=[object()] * 7)
+        mock_conns.assert_not_called()
+        self.assertEqual(result["total_connections"], 7)
+
 
 if __name__ == "__main__":
     unittest.main()
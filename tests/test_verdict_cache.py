@@ -0,0 +1,95 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from monitor import threat_intel
+from monitor.intel_feed import compile_feed
+from tests.helpers import FakeClock
+from utils.config import ConfigView
+from utils.verdict_cache import VerdictCache
+
+
+class TestVerdictCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.calls = 0
+
+    def _compute(self, value="v"):
+        def compute():
+            self.calls += 1
+            return value
+        return compute
+
+    def test_hits_until_ttl_expires(self):
+        cache = VerdictCache(maxsize=8, ttl=10, clock=self.clock)
+        for _ in range(3):
+            cache.get_or_compute("k", 1, self._compute())
+        self.assertEqual(self.calls, 1)
+        self.clock.now = 11
+        cache.get_or_compute("k", 1, self._compute())
+        self.assertEqual(self.calls, 2)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["expired"]), (2, 2, 1))
+
+    def test_lru_eviction(self):
+        cache = VerdictCache(maxsize=2, ttl=0, clock=self.clock)
+        cache.get_or_compute("a", 1, self._compute())
+        cache.get_or_compute("b", 1, self._compute())
+        cache.get_or_compute("a", 1, self._compute())
+        cache.get_or_compute("c", 1, self._compute())  # evicts "b"
+        self.assertEqual(self.calls, 3)
+        cache.get_or_compute("a", 1, self._compute())
+        self.assertEqual(self.calls, 3)
+        cache.get_or_compute("b", 1, self._compute())
+        self.assertEqual(self.calls, 4)
+        self.assertEqual(cache.stats()["evictions"], 2)
+
+    def test_generation_change_invalidates(self):
+        cache = VerdictCache(maxsize=8, ttl=0, clock=self.clock)
+        self.assertEqual(cache.get_or_compute("k", 1, self._compute("old")), "old")
+        self.assertEqual(cache.get_or_compute("k", 2, self._compute("new")), "new")
+        self.assertEqual(cache.stats()["invalidations"], 1)
+
+    def test_zero_size_disables_caching(self):
+        cache = VerdictCache(maxsize=0, ttl=0, clock=self.clock)
+        cache.get_or_compute("k", 1, self._compute())
+        cache.get_or_compute("k", 1, self._compute())
+        self.assertEqual((self.calls, len(cache)), (2, 0))
+
+
+class TestCachedThreatVerdicts(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.source = os.path.join(tmp, "blocklist.txt")
+        self.out = os.path.join(tmp, "ioc.bin")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("198.51.100.0/24\n")
+        compile_feed([self.source], self.out)
+        self.config = ConfigView({"threat_intel": {"feed_path": self.out}})
+        threat_intel._verdicts.clear()
+
+    def tearDown(self):
+        threat_intel.get_feed(self.config).close()
+
+    def test_feed_reload_invalidates_verdicts(self):
+        before = threat_intel.get_verdict_stats()["hits"]
+        self.assertIsNone(threat_intel.check_connection_threat("203.0.113.5", 443, self.config))
+        self.assertIsNone(threat_intel.check_connection_threat("203.0.113.5", 443, self.config))
+        self.assertEqual(threat_intel.get_verdict_stats()["hits"], before + 1)
+
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("203.0.113.0/24\n")
+        feed = threat_intel.get_feed(self.config)
+        feed.close()
+        compile_feed([self.source], self.out)
+        self.assertTrue(threat_intel.refresh_feeds(self.config, force=True))
+        self.assertEqual(threat_intel.check_connection_threat("203.0.113.5", 443, self.config), "HIGH")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+import time
+
+import psutil
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import fcntl
+
+CONTROL_DIR = r"C:\ProgramData\SHCS"
+LOCK_FILE = "agent.lock"
+PID_FILE = "agent.pid"
+STOP_FILE = "agent.stop"
+
+
+class AgentLock:
+    """Single-instance lock plus the files the dashboard uses to find the agent.
+
+    ``agent.lock`` is held with an exclusive, non-blocking OS lock for the
+    lifetime of the agent. ``agent.pid`` holds the agent's pid and process
+    create time (so a reused pid is not mistaken for the agent) and its
+    mtime is the heartbeat. A controller asks the agent to stop by creating
+    ``agent.stop``; :meth:`watch` turns that into the agent's ``stop_event``.
+
+    Args:
+        directory: where the three files live.
+    """
+
+    def __init__(self, directory=CONTROL_DIR):
+        self.directory = directory
+        self.lock_path = os.path.join(directory, LOCK_FILE)
+        self.pid_path = os.path.join(directory, PID_FILE)
+        self.stop_path = os.path.join(directory, STOP_FILE)
+        self._file = None
+        self._watcher = None
+
+    @property
+    def held(self):
+        return self._file is not None
+
+    def acquire(self):
+        """Take the lock and write the pid file; False if another agent holds it."""
+        os.makedirs(self.directory, exist_ok=True)
+        f = open(self.lock_path, "a+")
+        try:
+            if msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+
+        # A stop request addressed to a previous instance does not apply to us
+        self._remove(self.stop_path)
+        proc = psutil.Process()
+        info = {"pid": proc.pid, "create_time": proc.create_time(), "started": time.time()}
+        tmp_path = f"{self.pid_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as pid_file:
+            json.dump(info, pid_file)
+        os.replace(tmp_path, self.pid_path)
+        return True
+
+    def heartbeat(self):
+        """Touch the pid file; its mtime tells controllers the agent loop is alive."""
+        try:
+            os.utime(self.pid_path)
+        except OSError:
+            pass
+
+    def stop_requested(self):
+        return os.path.exists(self.stop_path)
+
+    def watch(self, stop_event, interval=0.5):
+        """Set *stop_event* once a stop is requested (checked every *interval* s)."""
+        def loop():
+            while not stop_event.wait(interval):
+                if self.stop_requested():
+                    stop_event.set()
+
+        self._watcher = threading.Thread(target=loop, name="shcs-stop-watcher", daemon=True)
+        self._watcher.start()
+
+    def release(self):
+        """Remove the pid and stop files and drop the lock."""
+        if self._file is None:
+            return
+        self._remove(self.pid_path)
+        self._remove(self.stop_path)
+        try:
+            if msvcrt is not None:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        except OSError:
+            pass
+        self._file.close()
+        self._file = None
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_lock = None
+
+
+def acquire_agent_lock(directory=CONTROL_DIR):
+    """Take the shared agent lock; returns it, or None if another agent runs."""
+    global _lock
+    lock = AgentLock(directory)
+    if not lock.acquire():
+        return None
+    _lock = lock
+    return lock
+
+
+def heartbeat():
+    """Record a heartbeat if this process holds the agent lock."""
+    if _lock is not None:
+        _lock.heartbeat()
@@ -0,0 +1,447 @@
+import json
+import os
+import threading
+from types import MappingProxyType
+
+from utils.ip_index import PRIVATE_RANGES, IPClassifier, prefix_to_cidr
+
+_project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_config_path = os.path.join(_project_root, "config.json")
+
+SEVERITY_ORDER = ("INFO", "LOW", "MEDIUM", "HIGH", "CRITICAL")
+
+_DEFAULT_THRESHOLDS = {
+    "cpu_percent": 90,
+    "memory_percent": 95,
+    "failed_login_limit": 5,
+    "bandwidth_alert_mbps": 10,
+    "port_scan_threshold": 5,
+}
+_DEFAULT_ML = {
+    "enabled": True,
+    "min_training_samples": 20,
+    "retrain_interval": 50,
+    "contamination": 0.1,
+    "window_size": 100,
+    "engine": "isolation_forest",
+    "hst_trees": 25,
+    "hst_height": 10,
+    "hst_window": 250,
+}
+_ML_ENGINES = ("isolation_forest", "half_space_trees")
+_DEFAULT_NOTIFICATIONS = {
+    "enabled": True,
+    "min_severity": "MEDIUM",
+}
+_DEFAULT_BLACKLIST = ("xmrig", "miner", "hacktool")
+_DEFAULT_SUSPICIOUS_PORTS = (4444, 5555, 6666, 1337, 31337, 8443, 9001)
+_DEFAULT_TRUSTED_RANGES = (
+    "13.0.0.0/8", "15.0.0.0/8", "20.0.0.0/8", "40.0.0.0/8", "52.0.0.0/8",  # Microsoft / Azure
+    "142.250.0.0/16", "142.251.0.0/16",                                   # Google
+    "104.16.0.0/16", "104.17.0.0/16", "104.18.0.0/16",                    # Cloudflare
+)
+_DEFAULT_SAFE_IPS = ("127.0.0.1", "::1")
+_DEFAULT_INTERVAL = 5
+_DEFAULT_SAMPLER = {
+    "interval_seconds": 0.25,
+    "window_seconds": 5,
+    "buffer_size": 240,
+}
+_DEFAULT_THREAT_INTEL = {
+    "feed_path": os.path.join("feeds", "ioc.bin"),
+    "refresh_seconds": 60,
+    "verdict_cache_size": 4096,
+    "verdict_ttl_seconds": 300,
+}
+_DEFAULT_RESPONSE = {
+    "block_window_seconds": 0.5,
+    "block_batch_size": 100,
+    "block_timeout_seconds": 10,
+    "block_retries": 3,
+    "firewall_backend": "netsh",
+    "block_ttl_seconds": 86400,
+    "block_max_entries": 10000,
+    "block_registry_path": os.path.join("state", "blocked_ips.bin"),
+}
+_FIREWALL_BACKENDS = ("netsh", "nftables", "ipset", "memory")
+_DEFAULT_LOGGING = {
+    "queue_size": 10000,
+    "max_bytes": 5_000_000,
+    "max_age_hours": 24,
+    "backup_count": 5,
+    "flush_policy": "interval",
+    "flush_interval_seconds": 1,
+    "console": True,
+}
+_FLUSH_POLICIES = ("batch", "interval", "never")
+_DEFAULT_EVENTS = {
+    "enabled": True,
+    "max_bytes": 10_000_000,
+    "backup_count": 2,
+    "index_interval_seconds": 5,
+}
+_DEFAULT_SUPPRESSION = {
+    "enabled": True,
+    "window_seconds": 300,
+    "max_records": 10000,
+}
+_DEFAULT_HOST_PROBES = {
+    "firewall": {"interval": 30, "ttl": 90, "timeout": 5},
+    "dns": {"interval": 60, "ttl": 180, "timeout": 5},
+}
+_DEFAULT_COLLECTORS = {
+    "max_workers": 4,
+    "system": {"interval": 0, "timeout": 2},
+    "processes": {"interval": 2, "timeout": 3},
+    "connections": {"interval": 0, "timeout": 3},
+    "failed_logins": {"interval": 10, "timeout": 3},
+}
+
+
+def resolve_path(path):
+    """Resolve a config path relative to the project root."""
+    return os.path.join(_project_root, os.path.expandvars(path))
+
+
+def _freeze(value):
+    """Recursively convert dicts/lists into read-only mappings/tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _number(section, key, defaults, errors, prefix):
+    value = section.get(key, defaults[key])
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        errors.append(f"{prefix}.{key} must be a number, using {defaults[key]!r}")
+        return defaults[key]
+    return value
+
+
+def _section(raw, key, defaults, errors):
+    section = raw.get(key, {})
+    if not isinstance(section, dict):
+        errors.append(f"{key} must be an object, using defaults")
+        section = {}
+    merged = dict(defaults)
+    merged.update(section)
+    return merged
+
+
+def _string_list(raw, key, default, errors, lower=False):
+    value = raw.get(key, default)
+    if not isinstance(value, (list, tuple)) or not all(isinstance(v, str) for v in value):
+        errors.append(f"{key} must be a list of strings, using defaults")
+        value = default
+    if lower:
+        value = [v.lower() for v in value]
+    return tuple(dict.fromkeys(value))
+
+
+def _build_ip_classifier(raw, safe_ips, errors):
+    """Compile ``ip_ranges`` plus the legacy prefix/IP lists into one index.
+
+    Labels: ``private`` (built-in ranges plus any configured), ``trusted``,
+    ``safe``, ``tor`` and any custom label present in ``ip_ranges``.
+    """
+    ip_ranges = raw.get("ip_ranges", {})
+    if not isinstance(ip_ranges, dict):
+        errors.append("ip_ranges must be an object, ignoring it")
+        ip_ranges = {}
+    ranges = {}
+    for label in ip_ranges:
+        ranges[label] = list(_string_list(ip_ranges, label, (), errors))
+
+    ranges["private"] = list(PRIVATE_RANGES) + ranges.get("private", [])
+    ranges["safe"] = list(safe_ips) + ranges.get("safe", [])
+
+    # Legacy "trusted_ip_prefixes" ("142.250.") are converted to CIDRs
+    legacy = _string_list(raw, "trusted_ip_prefixes", (), errors)
+    trusted = ranges.get("trusted")
+    if trusted is None and not legacy:
+        trusted = list(_DEFAULT_TRUSTED_RANGES)
+    trusted = list(trusted or [])
+    for prefix in legacy:
+        cidr = prefix_to_cidr(prefix)
+        if cidr is None:
+            errors.append(f"trusted_ip_prefixes entry {prefix!r} is not an IPv4 octet prefix")
+        else:
+            trusted.append(cidr)
+    ranges["trusted"] = trusted
+
+    classifier = IPClassifier(ranges)
+    for label, cidr in classifier.invalid:
+        errors.append(f"ip_ranges.{label} entry {cidr!r} is not a valid address or CIDR")
+    return classifier
+
+
+class ConfigView:
+    """Validated, precompiled and read-only view of one version of config.json.
+
+    Lookups that used to be rebuilt on every call (port sets, safe IP sets,
+    prefix tuples, severity ranks) are computed once here and shared by every
+    module until the file changes on disk.
+    """
+
+    __slots__ = (
+        "version", "raw", "errors", "thresholds", "ml", "notifications",
+        "process_blacklist", "suspicious_ports", "ip_classifier",
+        "safe_ips", "monitoring_interval", "log_directory", "severity_rank",
+        "min_notify_rank", "collectors", "sampler", "process_signatures",
+        "threat_intel", "host_probes", "allowed_dns_servers", "response",
+        "suppression", "logging", "events",
+    )
+
+    def __init__(self, raw, version=0):
+        errors = []
+        if not isinstance(raw, dict):
+            errors.append("config root must be an object, using defaults")
+            raw = {}
+
+        thresholds = _section(raw, "thresholds", _DEFAULT_THRESHOLDS, errors)
+        for key in _DEFAULT_THRESHOLDS:
+            thresholds[key] = _number(thresholds, key, _DEFAULT_THRESHOLDS, errors, "thresholds")
+
+        ml = _section(raw, "ml", _DEFAULT_ML, errors)
+        for key in ("min_training_samples", "retrain_interval", "contamination", "window_size"):
+            ml[key] = _number(ml, key, _DEFAULT_ML, errors, "ml")
+        if ml["window_size"] < 1:
+            errors.append(f"ml.window_size must be positive, using {_DEFAULT_ML['window_size']!r}")
+            ml["window_size"] = _DEFAULT_ML["window_size"]
+        ml["window_size"] = int(ml["window_size"])
+        if ml["engine"] not in _ML_ENGINES:
+            errors.append(f"ml.engine must be one of {', '.join(_ML_ENGINES)}, using 'isolation_forest'")
+            ml["engine"] = "isolation_forest"
+        for key in ("hst_trees", "hst_height", "hst_window"):
+            ml[key] = _number(ml, key, _DEFAULT_ML, errors, "ml")
+            if ml[key] < 1:
+                errors.append(f"ml.{key} must be positive, using {_DEFAULT_ML[key]!r}")
+                ml[key] = _DEFAULT_ML[key]
+            ml[key] = int(ml[key])
+
+        notifications = _section(raw, "notifications", _DEFAULT_NOTIFICATIONS, errors)
+        if notifications.get("min_severity") not in SEVERITY_ORDER:
+            errors.append("notifications.min_severity is not a known severity, using MEDIUM")
+            notifications["min_severity"] = "MEDIUM"
+
+        ports = raw.get("suspicious_ports", _DEFAULT_SUSPICIOUS_PORTS)
+        if not isinstance(ports, (list, tuple)) or not all(
+            isinstance(p, int) and not isinstance(p, bool) for p in ports
+        ):
+            errors.append("suspicious_ports must be a list of integers, using defaults")
+            ports = _DEFAULT_SUSPICIOUS_PORTS
+
+        interval = raw.get("monitoring_interval_seconds", _DEFAULT_INTERVAL)
+        if isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval <= 0:
+            errors.append(f"monitoring_interval_seconds must be positive, using {_DEFAULT_INTERVAL}")
+            interval = _DEFAULT_INTERVAL
+
+        sampler = _section(raw, "sampler", _DEFAULT_SAMPLER, errors)
+        for key in _DEFAULT_SAMPLER:
+            sampler[key] = _number(sampler, key, _DEFAULT_SAMPLER, errors, "sampler")
+            if sampler[key] <= 0:
+                errors.append(f"sampler.{key} must be positive, using {_DEFAULT_SAMPLER[key]!r}")
+                sampler[key] = _DEFAULT_SAMPLER[key]
+
+        logging_opts = _section(raw, "logging", _DEFAULT_LOGGING, errors)
+        if logging_opts["flush_policy"] not in _FLUSH_POLICIES:
+            errors.append(
+                f"logging.flush_policy must be one of {', '.join(_FLUSH_POLICIES)}, using 'interval'"
+            )
+            logging_opts["flush_policy"] = _DEFAULT_LOGGING["flush_policy"]
+        if not isinstance(logging_opts["console"], bool):
+            errors.append("logging.console must be true or false, using true")
+            logging_opts["console"] = True
+        for key in ("queue_size", "max_bytes", "max_age_hours", "backup_count", "flush_interval_seconds"):
+            logging_opts[key] = _number(logging_opts, key, _DEFAULT_LOGGING, errors, "logging")
+            if logging_opts[key] < 0:
+                errors.append(f"logging.{key} must not be negative, using {_DEFAULT_LOGGING[key]!r}")
+                logging_opts[key] = _DEFAULT_LOGGING[key]
+        for key in ("queue_size", "max_bytes", "backup_count"):
+            logging_opts[key] = int(logging_opts[key])
+        if logging_opts["flush_interval_seconds"] <= 0:
+            logging_opts["flush_interval_seconds"] = _DEFAULT_LOGGING["flush_interval_seconds"]
+
+        events = _section(raw, "events", _DEFAULT_EVENTS, errors)
+        if not isinstance(events["enabled"], bool):
+            errors.append("events.enabled must be true or false, using true")
+            events["enabled"] = True
+        for key in ("max_bytes", "backup_count", "index_interval_seconds"):
+            events[key] = _number(events, key, _DEFAULT_EVENTS, errors, "events")
+            if events[key] < 0:
+                errors.append(f"events.{key} must not be negative, using {_DEFAULT_EVENTS[key]!r}")
+                events[key] = _DEFAULT_EVENTS[key]
+        events["max_bytes"] = int(events["max_bytes"])
+        events["backup_count"] = int(events["backup_count"])
+
+        suppression = _section(raw, "suppression", _DEFAULT_SUPPRESSION, errors)
+        if not isinstance(suppression["enabled"], bool):
+            errors.append("suppression.enabled must be true or false, using true")
+            suppression["enabled"] = True
+        for key in ("window_seconds", "max_records"):
+            suppression[key] = _number(suppression, key, _DEFAULT_SUPPRESSION, errors, "suppression")
+            if suppression[key] < 0:
+                errors.append(f"suppression.{key} must not be negative, using {_DEFAULT_SUPPRESSION[key]!r}")
+                suppression[key] = _DEFAULT_SUPPRESSION[key]
+        suppression["max_records"] = int(suppression["max_records"])
+
+        response = _section(raw, "response", _DEFAULT_RESPONSE, errors)
+        if response["firewall_backend"] not in _FIREWALL_BACKENDS:
+            errors.append(
+                f"response.firewall_backend must be one of {', '.join(_FIREWALL_BACKENDS)}, using 'netsh'"
+            )
+            response["firewall_backend"] = _DEFAULT_RESPONSE["firewall_backend"]
+        if not isinstance(response["block_registry_path"], str):
+            errors.append("response.block_registry_path must be a string, using default")
+            response["block_registry_path"] = _DEFAULT_RESPONSE["block_registry_path"]
+        response["block_registry_path"] = resolve_path(response["block_registry_path"])
+        for key in _DEFAULT_RESPONSE:
+            if key in ("firewall_backend", "block_registry_path"):
+                continue
+            response[key] = _number(response, key, _DEFAULT_RESPONSE, errors, "response")
+            if response[key] < 0:
+                errors.append(f"response.{key} must not be negative, using {_DEFAULT_RESPONSE[key]!r}")
+                response[key] = _DEFAULT_RESPONSE[key]
+        response["block_batch_size"] = max(1, int(response["block_batch_size"]))
+        response["block_retries"] = int(response["block_retries"])
+        response["block_max_entries"] = max(1, int(response["block_max_entries"]))
+
+        threat_intel = _section(raw, "threat_intel", _DEFAULT_THREAT_INTEL, errors)
+        for key in ("refresh_seconds", "verdict_cache_size", "verdict_ttl_seconds"):
+            threat_intel[key] = _number(threat_intel, key, _DEFAULT_THREAT_INTEL, errors, "threat_intel")
+            if threat_intel[key] < 0:
+                errors.append(f"threat_intel.{key} must not be negative, using {_DEFAULT_THREAT_INTEL[key]!r}")
+                threat_intel[key] = _DEFAULT_THREAT_INTEL[key]
+        threat_intel["verdict_cache_size"] = int(threat_intel["verdict_cache_size"])
+        if not isinstance(threat_intel["feed_path"], str):
+            errors.append("threat_intel.feed_path must be a string, using default")
+            threat_intel["feed_path"] = _DEFAULT_THREAT_INTEL["feed_path"]
+        threat_intel["feed_path"] = resolve_path(threat_intel["feed_path"])
+
+        collectors = _section(raw, "collectors", _DEFAULT_COLLECTORS, errors)
+        collectors["max_workers"] = int(_number(collectors, "max_workers", _DEFAULT_COLLECTORS, errors, "collectors"))
+        for name, defaults in _DEFAULT_COLLECTORS.items():
+            if name == "max_workers":
+                continue
+            opts = collectors.get(name)
+            if not isinstance(opts, dict):
+                errors.append(f"collectors.{name} must be an object, using defaults")
+                opts = {}
+            merged = dict(defaults)
+            merged.update(opts)
+            for key in defaults:
+                merged[key] = _number(merged, key, defaults, errors, f"collectors.{name}")
+            collectors[name] = merged
+
+        host_probes = _section(raw, "host_probes", _DEFAULT_HOST_PROBES, errors)
+        for name, defaults in _DEFAULT_HOST_PROBES.items():
+            opts = host_probes.get(name)
+            if not isinstance(opts, dict):
+                errors.append(f"host_probes.{name} must be an object, using defaults")
+                opts = {}
+            merged = dict(defaults)
+            merged.update(opts)
+            for key in defaults:
+                merged[key] = _number(merged, key, defaults, errors, f"host_probes.{name}")
+            host_probes[name] = merged
+        allowed_dns = _string_list(host_probes, "allowed_dns_servers", (), errors)
+        host_probes.pop("allowed_dns_servers", None)
+
+        self.version = version
+        self.raw = _freeze(raw)
+        self.thresholds = _freeze(thresholds)
+        self.ml = _freeze(ml)
+        self.notifications = _freeze(notifications)
+        self.process_blacklist = _string_list(raw, "process_blacklist", _DEFAULT_BLACKLIST, errors, lower=True)
+        signatures = raw.get("process_signatures", {})
+        if not isinstance(signatures, dict):
+            errors.append("process_signatures must be an object, ignoring it")
+            signatures = {}
+        self.process_signatures = MappingProxyType({
+            "name": self.process_blacklist,
+            "exe": _string_list(signatures, "exe", (), errors, lower=True),
+            "cmdline": _string_list(signatures, "cmdline", (), errors, lower=True),
+        })
+        self.suspicious_ports = frozenset(ports)
+        self.safe_ips = frozenset(_string_list(raw, "safe_ips", _DEFAULT_SAFE_IPS, errors))
+        self.ip_classifier = _build_ip_classifier(raw, self.safe_ips, errors)
+        self.monitoring_interval = interval
+        self.log_directory = raw.get("log_directory") if isinstance(raw.get("log_directory"), str) else None
+        self.severity_rank = MappingProxyType({s: i for i, s in enumerate(SEVERITY_ORDER)})
+        self.min_notify_rank = self.severity_rank[notifications["min_severity"]]
+        self.collectors = _freeze(collectors)
+        self.sampler = _freeze(sampler)
+        self.threat_intel = _freeze(threat_intel)
+        self.host_probes = _freeze(host_probes)
+        self.response = _freeze(response)
+        self.suppression = _freeze(suppression)
+        self.logging = _freeze(logging_opts)
+        self.events = _freeze(events)
+        # Ordered: self_heal restores them in this order (first = primary)
+        self.allowed_dns_servers = tuple(dict.fromkeys(allowed_dns))
+        self.errors = tuple(errors)
+
+    def get(self, key, default=None):
+        """Return a top-level config value (read-only) or *default*."""
+        return self.raw.get(key, default)
+
+    def should_notify(self, severity):
+        """Return True if *severity* meets the notification threshold."""
+        if not self.notifications.get("enabled", True):
+            return False
+        return self.severity_rank.get(severity, 0) >= self.min_notify_rank
+
+
+class ConfigStore:
+    """Loads config.json once and reloads it only when its mtime/size change.
+
+    Each call to :meth:`get` costs a single ``os.stat``. If the file is
+    missing the defaults are used; if it fails to parse (for example while
+    an editor is half-way through saving it) the last good view is kept.
+    """
+
+    def __init__(self, path=_config_path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._version = 0
+        self._view = None
+
+    def get(self):
+        try:
+            st = os.stat(self.path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+
+        view = self._view
+        if view is not None and stamp == self._stamp:
+            return view
+
+        with self._lock:
+            if self._view is not None and stamp == self._stamp:
+                return self._view
+            raw = {}
+            if stamp is not None:
+                try:
+                    with open(self.path, encoding="utf-8") as f:
+                        raw = json.load(f)
+                except Exception:
+                    if self._view is not None:
+                        self._stamp = stamp
+                        return self._view
+                    raw = {}
+            self._version += 1
+            self._view = ConfigView(raw, version=self._version)
+            self._stamp = stamp
+            return self._view
+
+
+_store = ConfigStore()
+
+
+def get_config():
+    """Return the current :class:`ConfigView`, reloading only if the file changed."""
+    return _store.get()
@@ -0,0 +1,186 @@
+import atexit
+import json
+import os
+import struct
+import threading
+import time
+
+from utils.config import get_config
+from utils.logger import get_writer, next_rotate_backoff
+
+EVENTS_FILE = "events.jsonl"
+EVENT_TYPES = ("heartbeat", "metrics", "ml_status", "threat", "heal")
+
+# Sidecar index entry: record time, byte offset of the record in the stream
+INDEX_ENTRY = struct.Struct("<dQ")
+
+
+def index_path(path):
+    """Return the sidecar index path for the event stream at *path*."""
+    return f"{path}.idx"
+
+
+class EventStream:
+    """Append-only JSONL stream of typed agent events.
+
+    Every record is one JSON object per line carrying ``ts`` (epoch
+    seconds) and ``type`` (one of :data:`EVENT_TYPES`) plus the event's own
+    fields. Next to the stream a sidecar index (``events.jsonl.idx``) gets a
+    fixed-size ``(ts, offset)`` entry at most every *index_interval* seconds,
+    so readers can seek straight to "the last N minutes" instead of parsing
+    the whole file. Both files rotate together once the stream reaches
+    *max_bytes* (``events.jsonl`` -> ``events.jsonl.1`` ...); a failed
+    rotation keeps appending to the current files and is retried with a
+    growing back-off.
+
+    Args:
+        path: stream file path, or None to discard events.
+        max_bytes: rotate once the stream reaches this size (0 = never).
+        backup_count: rotated streams to keep.
+        index_interval: minimum seconds between index entries.
+        clock: wall-clock time source.
+    """
+
+    def __init__(self, path, max_bytes=10_000_000, backup_count=2, index_interval=5.0, clock=time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.index_interval = index_interval
+        self.enabled = path is not None
+        self.written = 0
+        self.last_error = None
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._file = None
+        self._index = None
+        self._offset = 0
+        self._last_indexed = None
+        self._rotate_backoff = 0.0
+        self._rotate_retry_at = 0.0
+
+    def emit(self, kind, **fields):
+        """Append one *kind* record; never raises."""
+        if not self.enabled:
+            return
+        now = self._clock()
+        record = {"ts": round(now, 3), "type": kind}
+        record.update(fields)
+        line = (json.dumps(record, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._open()
+                elif self.max_bytes and self._offset >= self.max_bytes and now >= self._rotate_retry_at:
+                    self._rotate(now)
+                if self._last_indexed is None or now - self._last_indexed >= self.index_interval:
+                    self._index.write(INDEX_ENTRY.pack(now, self._offset))
+                    self._last_indexed = now
+                self._file.write(line)
+                self._offset += len(line)
+                self.written += 1
+            except (OSError, ValueError) as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                self._close()
+
+    def flush(self):
+        """Push buffered records and index entries to the files."""
+        with self._lock:
+            if self._file is not None:
+                try:
+                    # Index after stream, so no entry points past the data
+                    self._file.flush()
+                    self._index.flush()
+                except OSError as e:
+                    self.last_error = f"{type(e).__name__}: {e}"
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _open(self):
+        self._file = open(self.path, "ab")
+        self._index = open(index_path(self.path), "ab")
+        self._offset = self._file.tell()
+        self._last_indexed = None
+        # An index pointing past the end of the stream belongs to an older one
+        size = self._index.tell()
+        if size >= INDEX_ENTRY.size:
+            with open(index_path(self.path), "rb") as f:
+                f.seek(size - size % INDEX_ENTRY.size - INDEX_ENTRY.size)
+                _, last_offset = INDEX_ENTRY.unpack(f.read(INDEX_ENTRY.size))
+            if last_offset > self._offset:
+                self._index.truncate(0)
+
+    def _close(self):
+        for f in (self._file, self._index):
+            if f is not None:
+                try:
+                    f.close()
+                except OSError:
+                    pass
+        self._file = self._index = None
+
+    def _rotate(self, now):
+        self._close()
+        try:
+            # Sidecar first: a failure or crash in between leaves the
+            # stream without an index (readers scan), never with a stale one
+            for suffix in (".idx", ""):
+                for i in range(self.backup_count - 1, 0, -1):
+                    src = f"{self.path}.{i}{suffix}"
+                    if os.path.exists(src):
+                        os.replace(src, f"{self.path}.{i + 1}{suffix}")
+                if self.backup_count > 0:
+                    os.replace(self.path + suffix, f"{self.path}.1{suffix}")
+                elif os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+        except OSError as e:
+            # Keep appending to the current stream; try again later
+            self.last_error = f"rotation failed: {type(e).__name__}: {e}"
+            self._rotate_backoff = next_rotate_backoff(self._rotate_backoff)
+            self._rotate_retry_at = now + self._rotate_backoff
+        else:
+            self._rotate_backoff = 0.0
+        self._open()
+
+
+_stream = None
+_stream_lock = threading.Lock()
+
+
+def configure_events(config=None):
+    """Apply the ``events`` config section to the shared stream."""
+    stream = get_event_stream(config)
+    if config is None:
+        config = get_config()
+    opts = config.events
+    stream.enabled = opts["enabled"] and stream.path is not None
+    stream.max_bytes = opts["max_bytes"]
+    stream.backup_count = opts["backup_count"]
+    stream.index_interval = opts["index_interval_seconds"]
+    return stream
+
+
+def get_event_stream(config=None):
+    """Return the shared event stream, written next to ``shcs.log``."""
+    global _stream
+    if _stream is not None:
+        return _stream
+    with _stream_lock:
+        if _stream is not None:
+            return _stream
+        if config is None:
+            config = get_config()
+        log_path = get_writer(config).path
+        path = os.path.join(os.path.dirname(log_path), EVENTS_FILE) if log_path else None
+        _stream = EventStream(path)
+        atexit.register(_stream.close)
+    return configure_events(config)
+
+
+def emit_event(kind, **fields):
+    get_event_stream().emit(kind, **fields)
+
+
+def flush_events():
+    get_event_stream().flush()
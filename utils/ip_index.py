@@ -0,0 +1,104 @@
+import ipaddress
+from functools import lru_cache
+
+PRIVATE_RANGES = (
+    "10.0.0.0/8",
+    "172.16.0.0/12",
+    "192.168.0.0/16",
+    "127.0.0.0/8",
+    "169.254.0.0/16",
+    "::1/128",
+    "fc00::/7",
+    "fe80::/10",
+)
+
+_BITS = {4: 32, 6: 128}
+_EMPTY = frozenset()
+
+
+@lru_cache(maxsize=65536)
+def parse_ip(ip):
+    """Parse an address string into ``(version, int)``.
+
+    IPv4-mapped IPv6 addresses (``::ffff:1.2.3.4``) are treated as IPv4 and
+    any zone suffix (``fe80::1%eth0``) is ignored. Returns None if *ip* is
+    not a valid address.
+    """
+    try:
+        addr = ipaddress.ip_address(ip.split("%", 1)[0])
+    except (ValueError, AttributeError):
+        return None
+    if addr.version == 6 and addr.ipv4_mapped is not None:
+        addr = addr.ipv4_mapped
+    return addr.version, int(addr)
+
+
+def prefix_to_cidr(prefix):
+    """Convert a legacy dotted string prefix such as ``"142.250."`` to CIDR.
+
+    Returns None if the prefix is not made of 1-4 whole IPv4 octets.
+    """
+    octets = [o for o in prefix.strip().split(".") if o != ""]
+    if not 1 <= len(octets) <= 4 or not all(o.isdigit() and int(o) <= 255 for o in octets):
+        return None
+    padded = octets + ["0"] * (4 - len(octets))
+    return f"{'.'.join(padded)}/{8 * len(octets)}"
+
+
+class IPClassifier:
+    """Labels IP addresses by the CIDR ranges that contain them.
+
+    Ranges are stored per address family as one hash table per prefix
+    length, keyed by the network bits of the range. A lookup parses the
+    address once and probes one table per distinct prefix length in use,
+    returning every matching label at once; results are memoised.
+
+    Args:
+        ranges: mapping of label -> iterable of CIDR strings or addresses.
+        cache_size: number of classified addresses to remember.
+    """
+
+    def __init__(self, ranges=None, cache_size=65536):
+        self._tables = {4: {}, 6: {}}
+        self._lengths = {4: (), 6: ()}
+        self.invalid = []
+        for label, cidrs in (ranges or {}).items():
+            for cidr in cidrs:
+                self.add(label, cidr)
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def add(self, label, cidr):
+        """Add one range; invalid entries are collected in :attr:`invalid`."""
+        try:
+            net = ipaddress.ip_network(cidr, strict=False)
+        except (ValueError, TypeError):
+            self.invalid.append((label, cidr))
+            return
+        version = net.version
+        if version == 6 and net.prefixlen >= 96 and net.network_address.ipv4_mapped is not None:
+            net = ipaddress.ip_network(
+                f"{net.network_address.ipv4_mapped}/{net.prefixlen - 96}"
+            )
+            version = 4
+        plen = net.prefixlen
+        key = int(net.network_address) >> (_BITS[version] - plen)
+        table = self._tables[version].setdefault(plen, {})
+        table[key] = table.get(key, _EMPTY) | {label}
+        self._lengths[version] = tuple(sorted(self._tables[version]))
+
+    def _classify(self, ip):
+        parsed = parse_ip(ip)
+        if parsed is None:
+            return _EMPTY
+        version, value = parsed
+        bits = _BITS[version]
+        tables = self._tables[version]
+        labels = _EMPTY
+        for plen in self._lengths[version]:
+            hit = tables[plen].get(value >> (bits - plen))
+            if hit:
+                labels = labels | hit
+        return labels
+
+    def has(self, ip, label):
+        return label in self.classify(ip)
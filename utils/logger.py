@@ -1,12 +1,30 @@
+import atexit
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 
+from utils.config import get_config
+
 _PRIMARY_LOG_DIR = r"C:\ProgramData\SHCS"
 _FALLBACK_LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
 
+# A failed rotation (e.g. another process holds the file open on Windows)
+# is retried after this delay, doubling up to the maximum on each failure
+ROTATE_RETRY_MIN_SECONDS = 5.0
+ROTATE_RETRY_MAX_SECONDS = 300.0
+
+
+def next_rotate_backoff(backoff):
+    """Return the delay before the next rotation attempt after a failure."""
+    return min(max(2 * backoff, ROTATE_RETRY_MIN_SECONDS), ROTATE_RETRY_MAX_SECONDS)
 
-def _get_log_file():
-    for log_dir in [_PRIMARY_LOG_DIR, _FALLBACK_LOG_DIR]:
+
+def _get_log_file(directories=(_PRIMARY_LOG_DIR, _FALLBACK_LOG_DIR)):
+    for log_dir in directories:
+        if not log_dir:
+            continue
         try:
             os.makedirs(log_dir, exist_ok=True)
             log_path = os.path.join(log_dir, "shcs.log")
@@ -19,17 +37,238 @@ def _get_log_file():
     return None
 
 
-def log_event(message):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_line = f"{timestamp} - {message}"
+def _format(created, message):
+    return f"{datetime.fromtimestamp(created).strftime('%Y-%m-%d %H:%M:%S')} - {message}"
 
-    print(log_line)
 
-    try:
-        log_file = _get_log_file()
-        if log_file:
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(log_line + "\n")
-                f.flush()
-    except Exception as e:
-        print(f"[LOGGER ERROR] {e}")
+class AsyncLogWriter:
+    """Writes log lines to one file from a background thread.
+
+    :meth:`write` only timestamps the message and puts it on a bounded
+    queue; if the queue is full the line is dropped and counted rather than
+    blocking the caller. The worker drains the queue in batches, writes each
+    batch with a single ``write`` call and rotates the file by size or age
+    (``shcs.log`` -> ``shcs.log.1`` ... ``shcs.log.<backup_count>``). If a
+    rotation fails, lines keep going to the current file and the rotation is
+    retried with a growing back-off.
+
+    Flush policies:
+        ``batch``    — flush after every batch (lines visible immediately).
+        ``interval`` — flush at most every *flush_interval* seconds.
+        ``never``    — leave flushing to the file buffer / close.
+
+    Args:
+        path: log file path, resolved once by the caller.
+        queue_size: maximum queued lines.
+        max_bytes: rotate once the file reaches this size (0 = never).
+        max_age: rotate once the file is this many seconds old (0 = never).
+        backup_count: rotated files to keep.
+        flush_policy: ``batch``, ``interval`` or ``never``.
+        flush_interval: seconds between flushes for ``interval``.
+        console: also echo every line to stdout (from the worker thread).
+    """
+
+    def __init__(self, path, queue_size=10000, max_bytes=5_000_000, max_age=0, backup_count=5,
+                 flush_policy="interval", flush_interval=1.0, console=True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.backup_count = backup_count
+        self.flush_policy = flush_policy
+        self.flush_interval = flush_interval
+        self.console = console
+        self.dropped = 0
+        self.written = 0
+        self.last_error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._size = 0
+        self._opened_at = 0.0
+        self._last_flush = 0.0
+        self._rotate_backoff = 0.0
+        self._rotate_retry_at = 0.0
+        self._thread = threading.Thread(target=self._loop, name="shcs-logger", daemon=True)
+        self._thread.start()
+
+    def write(self, message):
+        """Queue *message*; never blocks and never raises."""
+        try:
+            self._queue.put_nowait((time.time(), message))
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout=5.0):
+        """Block until every line queued so far is written and flushed."""
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def stats(self):
+        """Return queued, written and dropped line counts."""
+        return {"queued": self._queue.qsize(), "written": self.written, "dropped": self.dropped}
+
+    def close(self, timeout=5.0):
+        self.flush(timeout)
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _open(self):
+        if self.path is None:
+            return
+        self._file = open(self.path, "a", encoding="utf-8")
+        st = os.fstat(self._file.fileno())
+        self._size = st.st_size
+        # Creation time on Windows; elsewhere the best available is mtime
+        self._opened_at = st.st_ctime if os.name == "nt" else (st.st_mtime if st.st_size else time.time())
+
+    def _rotate(self, now):
+        self._file.close()
+        self._file = None
+        try:
+            for i in range(self.backup_count - 1, 0, -1):
+                src = f"{self.path}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{self.path}.{i + 1}")
+            if self.backup_count > 0:
+                os.replace(self.path, f"{self.path}.1")
+            else:
+                os.remove(self.path)
+        except OSError as e:
+            # Keep appending to the current file; try again later
+            self.last_error = f"rotation failed: {type(e).__name__}: {e}"
+            self._rotate_backoff = next_rotate_backoff(self._rotate_backoff)
+            self._rotate_retry_at = now + self._rotate_backoff
+            self._open()
+            return
+        self._rotate_backoff = 0.0
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = 0
+        self._opened_at = now
+
+    def _should_rotate(self, now):
+        if self._size == 0 or now < self._rotate_retry_at:
+            return False
+        if self.max_bytes and self._size >= self.max_bytes:
+            return True
+        return bool(self.max_age) and now - self._opened_at >= self.max_age
+
+    def _write_batch(self, lines):
+        text = "\n".join(lines) + "\n"
+        if self.console:
+            print(text, end="")
+        if self._file is None:
+            self._open()
+            if self._file is None:
+                return
+        now = time.time()
+        if self._should_rotate(now):
+            self._rotate(now)
+        self._file.write(text)
+        self._size += len(text.encode("utf-8"))
+        self.written += len(lines)
+        if self.flush_policy == "batch" or (
+            self.flush_policy == "interval" and now - self._last_flush >= self.flush_interval
+        ):
+            self._file.flush()
+            self._last_flush = now
+
+    def _loop(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # Idle: make sure lines written under "interval" reach disk
+                if self._file is not None and self.flush_policy == "interval":
+                    self._file.flush()
+                continue
+            lines, waiters, stop = [], [], False
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    lines.append(_format(*item))
+                if len(lines) >= 1000:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                if lines:
+                    self._write_batch(lines)
+                if (waiters or stop) and self._file is not None:
+                    self._file.flush()
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"[LOGGER ERROR] {e}")
+                if self._file is not None:
+                    try:
+                        self._file.close()
+                    except OSError:
+                        pass
+                    self._file = None
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                return
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def configure_logging(config=None):
+    """Apply the ``logging`` config section to the shared writer."""
+    writer = get_writer(config)
+    if config is None:
+        config = get_config()
+    opts = config.logging
+    writer.max_bytes = opts["max_bytes"]
+    writer.max_age = opts["max_age_hours"] * 3600
+    writer.backup_count = opts["backup_count"]
+    writer.flush_policy = opts["flush_policy"]
+    writer.flush_interval = opts["flush_interval_seconds"]
+    writer.console = opts["console"]
+    return writer
+
+
+def get_writer(config=None):
+    """Return the shared log writer; the log path is resolved only once."""
+    global _writer
+    if _writer is not None:
+        return _writer
+    with _writer_lock:
+        if _writer is None:
+            if config is None:
+                config = get_config()
+            opts = config.logging
+            path = _get_log_file((config.log_directory, _PRIMARY_LOG_DIR, _FALLBACK_LOG_DIR))
+            _writer = AsyncLogWriter(
+                path,
+                queue_size=opts["queue_size"],
+                max_bytes=opts["max_bytes"],
+                max_age=opts["max_age_hours"] * 3600,
+                backup_count=opts["backup_count"],
+                flush_policy=opts["flush_policy"],
+                flush_interval=opts["flush_interval_seconds"],
+                console=opts["console"],
+            )
+            atexit.register(_writer.close)
+    return _writer
+
+
+def flush_logs(timeout=5.0):
+    """Wait until every queued log line has been written."""
+    return get_writer().flush(timeout)
+
+
+def log_event(message):
+    get_writer().write(message)
@@ -0,0 +1,124 @@
+import mmap
+import os
+import struct
+import threading
+import time
+
+from utils.config import get_config
+from utils.logger import get_writer
+
+STATUS_FILE = "status.bin"
+MAGIC = b"SHCSSTA1"
+
+# magic, layout version, reserved, sequence (odd while an update is in progress)
+HEADER = struct.Struct("<8sIIQ")
+SEQ_OFFSET = 16
+# updated, started, pid, running, ml mode, ml samples, ml min samples,
+# cpu, memory, connections, processes, sent/s, recv/s,
+# block queue, block in flight, log queue, log dropped, cycles, threats total
+BODY = struct.Struct("<ddIBBIIddIIddIIIQQQ")
+# one threat counter: type name (utf-8, NUL padded), count
+COUNTER = struct.Struct("<24sQ")
+MAX_COUNTERS = 16
+SIZE = 4096
+
+ML_MODES = ("disabled", "learning", "active")
+FIELDS = (
+    "updated", "started", "pid", "running", "ml_mode", "ml_samples", "ml_min_samples",
+    "cpu", "memory", "connections", "processes", "bytes_sent_per_sec", "bytes_recv_per_sec",
+    "block_queue", "block_in_flight", "log_queue", "log_dropped", "cycles", "threats_total",
+)
+
+
+class StatusBlock:
+    """Agent status published in a small memory-mapped file.
+
+    The file has a fixed layout (:data:`HEADER`, :data:`BODY`, then up to
+    :data:`MAX_COUNTERS` threat counters) so readers decode it with a couple
+    of ``struct`` calls and no parsing. Updates are guarded by a sequence
+    lock: the writer bumps the sequence to an odd value, rewrites the body
+    and bumps it again; a reader retries if the sequence was odd or changed
+    while it copied the block. There is a single writer, the agent loop;
+    the dashboard's reader lives in ``dashboard/status_reader.py``.
+
+    Args:
+        path: status file path; created (or reused) at :data:`SIZE` bytes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        mode = "r+b" if os.path.exists(path) else "w+b"
+        self._file = open(path, mode)
+        self._file.truncate(SIZE)
+        self._map = mmap.mmap(self._file.fileno(), SIZE)
+        _, _, _, seq = HEADER.unpack_from(self._map, 0)
+        # Continue an old sequence (even) so open readers see the change
+        self._seq = seq + (seq & 1)
+        HEADER.pack_into(self._map, 0, MAGIC, 1, 0, self._seq)
+
+    def publish(self, status, threat_counts=None):
+        """Write *status* (keys from :data:`FIELDS`) and the per-type threat counts."""
+        values = []
+        for name in FIELDS:
+            value = status.get(name, 0)
+            if name == "ml_mode":
+                value = ML_MODES.index(value) if value in ML_MODES else 0
+            elif name == "running":
+                value = 1 if value else 0
+            values.append(value)
+        counters = sorted((threat_counts or {}).items(), key=lambda kv: -kv[1])[:MAX_COUNTERS]
+
+        m = self._map
+        self._seq += 1
+        struct.pack_into("<Q", m, SEQ_OFFSET, self._seq)
+        BODY.pack_into(m, HEADER.size, *values)
+        offset = HEADER.size + BODY.size
+        struct.pack_into("<I", m, offset, len(counters))
+        offset += 4
+        for name, count in counters:
+            COUNTER.pack_into(m, offset, str(name).encode("utf-8")[:COUNTER.size - 8], count)
+            offset += COUNTER.size
+        self._seq += 1
+        struct.pack_into("<Q", m, SEQ_OFFSET, self._seq)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = None
+
+
+_block = None
+_block_lock = threading.Lock()
+
+
+def get_status_block(config=None):
+    """Return the agent's status block, created next to ``shcs.log``.
+
+    Returns None if there is no writable log directory.
+    """
+    global _block
+    with _block_lock:
+        if _block is None:
+            if config is None:
+                config = get_config()
+            log_path = get_writer(config).path
+            if log_path is None:
+                return None
+            try:
+                _block = StatusBlock(os.path.join(os.path.dirname(log_path), STATUS_FILE))
+            except (OSError, ValueError):
+                return None
+        return _block
+
+
+def publish_status(status, threat_counts=None):
+    """Publish agent status if the status block is available; never raises."""
+    block = get_status_block()
+    if block is None:
+        return
+    try:
+        status.setdefault("updated", time.time())
+        block.publish(status, threat_counts)
+    except (OSError, ValueError, struct.error):
+        pass
@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class VerdictCache:
+    """Bounded TTL + LRU cache for per-connection verdicts.
+
+    Entries are tagged with a *generation* — anything the verdict depends
+    on, such as the config view and the threat intel feed version. When a
+    lookup arrives with a different generation the whole cache is dropped,
+    so a config edit or feed reload never serves a stale verdict. Within a
+    generation, entries expire after *ttl* seconds and the least recently
+    used entry is evicted once *maxsize* is reached.
+
+    Args:
+        maxsize: maximum number of cached verdicts; 0 disables caching.
+        ttl: seconds a verdict stays valid; 0 means until invalidated.
+        clock: monotonic time source (injectable for tests).
+    """
+
+    def __init__(self, maxsize=4096, ttl=300.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generation = None
+        self._stats = dict.fromkeys(("hits", "misses", "expired", "evictions", "invalidations"), 0)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def configure(self, maxsize, ttl):
+        """Apply new limits, trimming the oldest entries if needed."""
+        with self._lock:
+            self.maxsize = maxsize
+            self.ttl = ttl
+            while len(self._entries) > max(0, maxsize):
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation = None
+
+    def get_or_compute(self, key, generation, compute):
+        """Return the cached verdict for *key*, calling ``compute()`` on a miss.
+
+        *compute* runs outside the lock; concurrent misses for the same key
+        may both compute, which is harmless for pure verdict functions.
+        """
+        now = self._clock()
+        with self._lock:
+            if generation != self._generation:
+                if self._entries:
+                    self._stats["invalidations"] += 1
+                self._entries.clear()
+                self._generation = generation
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if not expires or now < expires:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value
+                del self._entries[key]
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+
+        value = compute()
+        if self.maxsize <= 0:
+            return value
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (value, now + self.ttl if self.ttl else 0)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self._stats["evictions"] += 1
+        return value
+
+    def stats(self):
+        """Return hit / miss / eviction counters, size and hit rate."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats